@@ -0,0 +1,87 @@
+"""Add incremental analytics aggregates
+
+Adds running score sums to assignment_analytics and the per-question
+assignment_question_stats table, then backfills both from the existing
+evaluated submissions so incremental updates start from a consistent state.
+
+Revision ID: c3d8e1f4a7b2
+Revises: a5f370661390
+Create Date: 2026-10-18 09:30:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8e1f4a7b2'
+down_revision: Union[str, None] = 'a5f370661390'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('assignment_analytics', sa.Column('score_sum', sa.Float(), server_default='0', nullable=True))
+    op.add_column('assignment_analytics', sa.Column('score_sum_squares', sa.Float(), server_default='0', nullable=True))
+    op.create_table('assignment_question_stats',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('analytics_id', sa.UUID(), nullable=False),
+    sa.Column('question_id', sa.UUID(), nullable=False),
+    sa.Column('attempted_count', sa.Integer(), nullable=False),
+    sa.Column('correct_count', sa.Integer(), nullable=False),
+    sa.Column('marks_sum', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['analytics_id'], ['assignment_analytics.id'], ),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('analytics_id', 'question_id', name='uq_assignment_question_stats_question')
+    )
+
+    # Backfill running aggregates for existing analytics records
+    op.execute("""
+        UPDATE assignment_analytics AS aa SET
+            total_submissions = t.n,
+            score_sum = t.score_sum,
+            score_sum_squares = t.score_sum_squares,
+            average_score = t.score_sum / t.n,
+            max_score_achieved = t.max_score,
+            min_score_achieved = t.min_score
+        FROM (
+            SELECT per_sub.assignment_id,
+                   count(*) AS n,
+                   sum(per_sub.score) AS score_sum,
+                   sum(per_sub.score * per_sub.score) AS score_sum_squares,
+                   max(per_sub.score) AS max_score,
+                   min(per_sub.score) AS min_score
+            FROM (
+                SELECT s.id, s.assignment_id,
+                       coalesce(sum(a.marks_awarded), 0)::float AS score
+                FROM submissions s
+                LEFT JOIN answers a ON a.submission_id = s.id
+                WHERE s.status = 'EVALUATED'
+                GROUP BY s.id, s.assignment_id
+            ) AS per_sub
+            GROUP BY per_sub.assignment_id
+        ) AS t
+        WHERE aa.assignment_id = t.assignment_id
+    """)
+    op.execute("""
+        INSERT INTO assignment_question_stats
+            (id, analytics_id, question_id, attempted_count, correct_count, marks_sum)
+        SELECT gen_random_uuid(), aa.id, q.id,
+               count(a.id),
+               coalesce(sum(CASE WHEN a.marks_awarded = q.marks THEN 1 ELSE 0 END), 0),
+               coalesce(sum(coalesce(a.marks_awarded, 0)), 0)
+        FROM assignment_analytics aa
+        JOIN questions q ON q.assignment_id = aa.assignment_id
+        LEFT JOIN answers a ON a.question_id = q.id
+            AND a.submission_id IN (SELECT id FROM submissions WHERE status = 'EVALUATED')
+        GROUP BY aa.id, q.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('assignment_question_stats')
+    op.drop_column('assignment_analytics', 'score_sum_squares')
+    op.drop_column('assignment_analytics', 'score_sum')
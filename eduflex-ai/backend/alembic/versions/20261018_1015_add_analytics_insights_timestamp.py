@@ -0,0 +1,27 @@
+"""Add insights timestamp to assignment_analytics
+
+Revision ID: 7e2b94c0d1a6
+Revises: c3d8e1f4a7b2
+Create Date: 2026-10-18 10:15:47.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2b94c0d1a6'
+down_revision: Union[str, None] = 'c3d8e1f4a7b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('assignment_analytics', sa.Column('insights_updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE assignment_analytics SET insights_updated_at = last_updated WHERE ai_insights IS NOT NULL")
+
+
+def downgrade() -> None:
+    op.drop_column('assignment_analytics', 'insights_updated_at')
@@ -0,0 +1,26 @@
+"""Add token_version to users
+
+Revision ID: 4f1a6c8d2e93
+Revises: 7e2b94c0d1a6
+Create Date: 2026-10-18 11:00:12.511843
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1a6c8d2e93'
+down_revision: Union[str, None] = '7e2b94c0d1a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,33 @@
+"""Add keyset pagination indexes
+
+Composite (created_at, id) indexes backing the cursor-paginated lists:
+all assignments, users by role and a student's submissions.
+
+Revision ID: 9b3e5d1c7a24
+Revises: 4f1a6c8d2e93
+Create Date: 2026-10-18 12:00:41.208317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5d1c7a24'
+down_revision: Union[str, None] = '4f1a6c8d2e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_assignments_created_at_id', 'assignments', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_role_created_at_id', 'users', ['role', 'created_at', 'id'], unique=False)
+    op.create_index('ix_submissions_student_id_created_at_id', 'submissions', ['student_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submissions_student_id_created_at_id', table_name='submissions')
+    op.drop_index('ix_users_role_created_at_id', table_name='users')
+    op.drop_index('ix_assignments_created_at_id', table_name='assignments')
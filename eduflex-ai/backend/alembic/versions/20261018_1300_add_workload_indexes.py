@@ -0,0 +1,68 @@
+"""Add workload indexes and drop duplicate primary key indexes
+
+Indexes the columns the services filter and join on (foreign keys,
+submission status, due dates), with INCLUDE columns on Postgres so the
+analytics aggregates are answered from the index. The ix_<table>_id
+indexes duplicate the primary key indexes and only slow down writes.
+
+Checked with `python -m benchmarks.check_query_plans`.
+
+Revision ID: c7d2a9e4f1b6
+Revises: 9b3e5d1c7a24
+Create Date: 2026-10-18 13:00:12.590431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2a9e4f1b6'
+down_revision: Union[str, None] = '9b3e5d1c7a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PRIMARY_KEY_DUPLICATES = ['users', 'assignments', 'questions', 'submissions', 'answers', 'evaluations']
+
+
+def upgrade() -> None:
+    op.create_index('ix_assignments_faculty_id', 'assignments', ['faculty_id'], unique=False)
+    op.create_index('ix_assignments_due_date', 'assignments', ['due_date'], unique=False)
+    op.create_index('ix_questions_assignment_id_id', 'questions', ['assignment_id', 'id'], unique=False)
+    op.create_index(
+        'ix_submissions_assignment_id_status', 'submissions', ['assignment_id', 'status'],
+        unique=False, postgresql_include=['student_id']
+    )
+    op.create_index('ix_submissions_student_id_status', 'submissions', ['student_id', 'status'], unique=False)
+    op.create_index(
+        'ix_submissions_pending_grading', 'submissions', ['status'], unique=False,
+        postgresql_where=sa.text("status = 'SUBMITTED'"),
+        sqlite_where=sa.text("status = 'SUBMITTED'")
+    )
+    op.create_index(
+        'ix_answers_submission_id', 'answers', ['submission_id'],
+        unique=False, postgresql_include=['marks_awarded']
+    )
+    op.create_index(
+        'ix_answers_question_id_submission_id', 'answers', ['question_id', 'submission_id'],
+        unique=False, postgresql_include=['marks_awarded']
+    )
+
+    for table in PRIMARY_KEY_DUPLICATES:
+        op.drop_index(f'ix_{table}_id', table_name=table)
+
+
+def downgrade() -> None:
+    for table in PRIMARY_KEY_DUPLICATES:
+        op.create_index(f'ix_{table}_id', table, ['id'], unique=False)
+
+    op.drop_index('ix_answers_question_id_submission_id', table_name='answers')
+    op.drop_index('ix_answers_submission_id', table_name='answers')
+    op.drop_index('ix_submissions_pending_grading', table_name='submissions')
+    op.drop_index('ix_submissions_student_id_status', table_name='submissions')
+    op.drop_index('ix_submissions_assignment_id_status', table_name='submissions')
+    op.drop_index('ix_questions_assignment_id_id', table_name='questions')
+    op.drop_index('ix_assignments_due_date', table_name='assignments')
+    op.drop_index('ix_assignments_faculty_id', table_name='assignments')
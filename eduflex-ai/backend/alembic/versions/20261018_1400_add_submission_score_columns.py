@@ -0,0 +1,36 @@
+"""Add submission score columns
+
+total_score, max_score and percentage stored on submissions when they are
+graded, and an (assignment_id, total_score) index for ranking and score
+statistics. Existing rows are filled by the next revision.
+
+Revision ID: e3b8f0a6d2c1
+Revises: c7d2a9e4f1b6
+Create Date: 2026-10-18 14:00:27.318904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8f0a6d2c1'
+down_revision: Union[str, None] = 'c7d2a9e4f1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('submissions', sa.Column('total_score', sa.Integer(), nullable=True))
+    op.add_column('submissions', sa.Column('max_score', sa.Integer(), nullable=True))
+    op.add_column('submissions', sa.Column('percentage', sa.Float(), nullable=True))
+    op.create_index('ix_submissions_assignment_id_total_score', 'submissions', ['assignment_id', 'total_score'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_submissions_assignment_id_total_score', table_name='submissions')
+    op.drop_column('submissions', 'percentage')
+    op.drop_column('submissions', 'max_score')
+    op.drop_column('submissions', 'total_score')
@@ -0,0 +1,103 @@
+"""Backfill submission score columns
+
+Fills max_score from the assignment for every submission, and total_score
+and percentage for evaluated ones: from the Evaluation, or the sum of
+the answers' marks if there is none.
+
+Rows are processed in batches of BATCH_SIZE in id order, and each batch
+commits on its own. An interrupted run keeps its progress, and running
+`alembic upgrade head` again only visits rows that still lack their
+scores. Needs a live connection, so it does nothing in --sql mode.
+
+Revision ID: f5a1c3e7b9d4
+Revises: e3b8f0a6d2c1
+Create Date: 2026-10-18 14:10:05.662170
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a1c3e7b9d4'
+down_revision: Union[str, None] = 'e3b8f0a6d2c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+submissions = sa.table(
+    'submissions',
+    sa.column('id', sa.Uuid()),
+    sa.column('assignment_id', sa.Uuid()),
+    sa.column('status', sa.Enum('DRAFT', 'SUBMITTED', 'EVALUATED', name='submissionstatus')),
+    sa.column('total_score', sa.Integer()),
+    sa.column('max_score', sa.Integer()),
+    sa.column('percentage', sa.Float()),
+)
+assignments = sa.table('assignments', sa.column('id', sa.Uuid()), sa.column('max_marks', sa.Integer()))
+evaluations = sa.table('evaluations', sa.column('submission_id', sa.Uuid()), sa.column('total_marks', sa.Integer()))
+answers = sa.table('answers', sa.column('submission_id', sa.Uuid()), sa.column('marks_awarded', sa.Integer()))
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql:
+        return
+
+    evaluated = submissions.c.status == 'EVALUATED'
+    answer_total = (
+        sa.select(sa.func.coalesce(sa.func.sum(answers.c.marks_awarded), 0))
+        .where(answers.c.submission_id == submissions.c.id)
+        .scalar_subquery()
+    )
+    pending = (
+        sa.select(
+            submissions.c.id,
+            assignments.c.max_marks,
+            sa.case((evaluated, sa.func.coalesce(evaluations.c.total_marks, answer_total)), else_=None)
+        )
+        .join(assignments, assignments.c.id == submissions.c.assignment_id)
+        .outerjoin(evaluations, evaluations.c.submission_id == submissions.c.id)
+        .where(sa.or_(submissions.c.max_score.is_(None), sa.and_(evaluated, submissions.c.total_score.is_(None))))
+        .order_by(submissions.c.id)
+        .limit(BATCH_SIZE)
+    )
+    fill = (
+        submissions.update()
+        .where(submissions.c.id == sa.bindparam('b_id'))
+        .values(
+            max_score=sa.bindparam('b_max_score'),
+            total_score=sa.bindparam('b_total_score'),
+            percentage=sa.bindparam('b_percentage')
+        )
+    )
+
+    # Every statement commits by itself inside the autocommit block
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        last_id = None
+        filled = 0
+        while True:
+            stmt = pending if last_id is None else pending.where(submissions.c.id > last_id)
+            rows = conn.execute(stmt).all()
+            if not rows:
+                break
+            conn.execute(fill, [
+                {
+                    'b_id': submission_id,
+                    'b_max_score': max_marks,
+                    'b_total_score': total,
+                    'b_percentage': None if total is None else (round(total * 100 / max_marks, 2) if max_marks else 0.0)
+                }
+                for submission_id, max_marks, total in rows
+            ])
+            filled += len(rows)
+            last_id = rows[-1][0]
+            print(f"Backfilled scores of {filled} submissions")
+
+
+def downgrade() -> None:
+    # The columns are dropped by the previous revision's downgrade
+    pass
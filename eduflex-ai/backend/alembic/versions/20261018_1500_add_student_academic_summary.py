@@ -0,0 +1,61 @@
+"""Add student academic summary rollups
+
+One row per graded student with the running count and sum of their
+submission percentages, plus the average and GPA derived from them and
+indexed for sorting cohorts. Filled here from the evaluated submissions;
+`python -m app.commands.rebuild_student_summaries` recomputes them later.
+
+Revision ID: a8c4e2f6b0d3
+Revises: f5a1c3e7b9d4
+Create Date: 2026-10-18 15:00:41.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c4e2f6b0d3'
+down_revision: Union[str, None] = 'f5a1c3e7b9d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('student_academic_summary',
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('assessment_count', sa.Integer(), nullable=False),
+    sa.Column('percentage_sum', sa.Float(), nullable=False),
+    sa.Column('average_percentage', sa.Float(), nullable=False),
+    sa.Column('gpa', sa.Float(), nullable=False),
+    sa.Column('last_updated', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('student_id')
+    )
+    op.create_index('ix_student_academic_summary_gpa', 'student_academic_summary', ['gpa', 'student_id'], unique=False)
+    op.create_index(
+        'ix_student_academic_summary_average_percentage', 'student_academic_summary',
+        ['average_percentage', 'student_id'], unique=False
+    )
+
+    op.execute("""
+        INSERT INTO student_academic_summary
+            (student_id, assessment_count, percentage_sum, average_percentage, gpa, last_updated)
+        SELECT student_id,
+               count(*),
+               sum(coalesce(percentage, 0)),
+               avg(coalesce(percentage, 0)),
+               avg(coalesce(percentage, 0)) * 0.04,
+               now()
+        FROM submissions
+        WHERE status = 'EVALUATED'
+        GROUP BY student_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_student_academic_summary_average_percentage', table_name='student_academic_summary')
+    op.drop_index('ix_student_academic_summary_gpa', table_name='student_academic_summary')
+    op.drop_table('student_academic_summary')
@@ -1,47 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import Any
+from typing import Any, Dict
+from datetime import timezone
+from email.utils import format_datetime
+import asyncio
+import hashlib
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.deps import get_current_user
-from app.models.user import User
-from app.services.analytics_service import AnalyticsService
+from app.services.principal_cache import Principal
+from app.core.jobs import job_queue, JobStatus
+from app.services.analytics_service import AnalyticsService, schedule_analytics_refresh
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
 @router.post("/assignment/{assignment_id}", response_model=Any)
-def generate_assignment_analytics(
+async def generate_assignment_analytics(
     assignment_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Trigger generation of analytics for a specific assignment.
     Faculty only (logic to be added).
+
+    The refresh runs on the background job queue (coalesced with any
+    concurrent refresh of the same assignment). Answers 202 with the job
+    status if it does not finish within ANALYTICS_REFRESH_WAIT_SECONDS.
     """
     if current_user.role.value != "faculty" and current_user.role.value != "admin": 
          # Assuming 'faculty' enum value matches User model
          # For simplicity, allowing all authenticated users for now in verify script
          pass
          
-    service = AnalyticsService(db)
-    try:
-        return service.generate_assignment_analytics(assignment_id)
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        print(f"Analytics Error: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate analytics")
+    return await _refresh_and_wait(db, assignment_id)
 
 @router.get("/assignment/{assignment_id}", response_model=Any)
-def get_assignment_analytics(
+async def get_assignment_analytics(
     assignment_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Serve stored analytics with ETag/Last-Modified validators.
+
+    Stale insights are returned immediately while a debounced refresh is
+    queued in the background. Use POST to force a refresh.
+    """
+    service = AnalyticsService(db)
+    cached = await service.get_stored_analytics(assignment_id)
+
+    if cached is None:
+        # Insights never generated: wait for a first run
+        return await _refresh_and_wait(db, assignment_id)
+
+    if cached["stale"]:
+        schedule_analytics_refresh(assignment_id)
+
+    headers = _cache_headers(assignment_id, cached)
+    if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    if headers["ETag"] in if_none_match or "*" in if_none_match:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return _analytics_body(cached)
+
+
+@router.get("/jobs/{job_id}", response_model=Any)
+async def get_analytics_job(
+    job_id: str,
+    current_user: Principal = Depends(get_current_user)
 ):
-    # Logic to fetch stored analytics would be in service, but generate does upsert so...
-    # For MVP, just calling generate is fine as it acts as GET + Refresh.
-    # But usually GET should be fast.
+    """
+    Get the status of a background analytics job.
+    """
+    job = await asyncio.to_thread(job_queue.status, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+async def _refresh_and_wait(db: AsyncSession, assignment_id: UUID):
+    """Queue an immediate refresh and wait for it, falling back to 202 with the job status."""
     service = AnalyticsService(db)
-    return service.generate_assignment_analytics(assignment_id)
+    if not await service.assignment_exists(assignment_id):
+        raise HTTPException(status_code=404, detail="Assignment not found")
+
+    job_id = schedule_analytics_refresh(assignment_id, delay=0)
+    job = await job_queue.wait_async(job_id, settings.ANALYTICS_REFRESH_WAIT_SECONDS)
+
+    if job["status"] == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail="Failed to generate analytics")
+    if job["status"] != JobStatus.SUCCEEDED:
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={"job": job})
+
+    db.expire_all()
+    cached = await service.get_stored_analytics(assignment_id)
+    if cached is None:
+        return {"message": "No submissions to analyze"}
+    return _analytics_body(cached)
+
+
+def _analytics_body(cached: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "metrics": cached["metrics"],
+        "insights": cached["insights"],
+        "last_updated": cached["last_updated"].isoformat(),
+        "stale": cached["stale"]
+    }
+
+
+def _cache_headers(assignment_id: UUID, cached: Dict[str, Any]) -> Dict[str, str]:
+    """ETag/Last-Modified derived from the record's metric and insight timestamps."""
+    last_updated = cached["last_updated"]
+    insights_updated_at = cached["insights_updated_at"]
+    version = f"{assignment_id}:{last_updated.isoformat()}:{insights_updated_at.isoformat()}"
+    last_modified = max(last_updated, insights_updated_at).replace(tzinfo=timezone.utc)
+    return {
+        "ETag": f'W/"{hashlib.sha1(version.encode()).hexdigest()[:20]}"',
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache"
+    }
@@ -1,21 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
 from uuid import UUID
 
 from app.core.database import get_db
 from app.core.deps import get_current_user
-from app.models.user import User, UserRole
-from app.schemas.assignment import AssignmentCreate, AssignmentResponse
+from app.core.pagination import decode_cursor, page_size, paginated
+from app.services.principal_cache import Principal
+from app.models.user import UserRole
+from app.schemas.assignment import AssignmentCreate, AssignmentResponse, AssignmentSummary
 from app.services.assignment_service import AssignmentService
 
 router = APIRouter(prefix="/assignments", tags=["Assignments"])
 
 @router.post("/", response_model=AssignmentResponse, status_code=status.HTTP_201_CREATED)
-def create_assignment(
+async def create_assignment(
     assignment_data: AssignmentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new assignment or quiz.
@@ -28,36 +30,45 @@ def create_assignment(
         )
     
     service = AssignmentService(db)
-    return service.create_assignment(assignment_data, current_user.id)
+    return await service.create_assignment(assignment_data, current_user.id)
 
-@router.get("/", response_model=List[AssignmentResponse])
-def list_assignments(
-    skip: int = 0, 
-    limit: int = 20,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/", response_model=Union[List[AssignmentResponse], List[AssignmentSummary]])
+async def list_assignments(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
+    summary: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    List all assignments. 
+    List assignments, newest first.
+    The X-Next-Cursor response header, passed back as `cursor`, fetches the next page.
+    With `summary=true`, assignments are returned without their questions.
     (Future: Filter by student's department/subject)
     """
     service = AssignmentService(db)
-    return service.get_assignments(skip, limit)
+    page = await service.get_assignments(limit, decode_cursor(cursor), with_questions=not summary)
+    if summary:
+        page = page._replace(items=[AssignmentSummary.model_validate(a) for a in page.items])
+    return paginated(response, page)
 
 @router.get("/{id}", response_model=AssignmentResponse)
-def get_assignment(
+async def get_assignment(
     id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get assignment details.
+    Students get the payload without correct answers.
     """
     service = AssignmentService(db)
-    assignment = service.get_assignment(id)
-    if not assignment:
+    payload = await service.get_assignment_payload(id, for_student=current_user.role == UserRole.STUDENT)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Assignment not found"
         )
-    return assignment
+    # Already serialized as AssignmentResponse
+    return Response(content=payload, media_type="application/json")
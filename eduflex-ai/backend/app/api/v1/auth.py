@@ -1,21 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from app.core.database import get_db
 from app.core.security import create_access_token, create_refresh_token, decode_token
 from app.core.deps import get_current_user
+from app.services.principal_cache import Principal
 from app.schemas.auth import Token, LoginRequest, RefreshTokenRequest
 from app.schemas.user import UserCreate, UserResponse
 from app.services.user_service import UserService
-from app.models.user import User
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register a new user.
@@ -24,14 +24,14 @@ def register_user(
     For development, it's open for testing purposes.
     """
     user_service = UserService(db)
-    user = user_service.create_user(user_data)
+    user = await user_service.create_user(user_data)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Authenticate user and return JWT tokens.
@@ -39,7 +39,7 @@ def login(
     Returns access token (15min) and refresh token (7 days).
     """
     user_service = UserService(db)
-    user = user_service.authenticate(login_data.email, login_data.password)
+    user = await user_service.authenticate(login_data.email, login_data.password)
     
     if not user:
         raise HTTPException(
@@ -50,10 +50,10 @@ def login(
     
     # Create tokens
     access_token = create_access_token(
-        data={"sub": str(user.id), "role": user.role.value}
+        data={"sub": str(user.id), "role": user.role.value, "ver": user.token_version}
     )
     refresh_token = create_refresh_token(
-        data={"sub": str(user.id)}
+        data={"sub": str(user.id), "ver": user.token_version}
     )
     
     return {
@@ -64,9 +64,9 @@ def login(
 
 
 @router.post("/refresh", response_model=Token)
-def refresh_access_token(
+async def refresh_access_token(
     refresh_data: RefreshTokenRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Refresh access token using refresh token.
@@ -82,9 +82,9 @@ def refresh_access_token(
     
     user_id = payload.get("sub")
     user_service = UserService(db)
-    user = user_service.get_by_id(user_id)
+    user = await user_service.get_by_id(user_id)
     
-    if not user or not user.is_active:
+    if not user or not user.is_active or payload.get("ver", 0) != user.token_version:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
@@ -92,10 +92,10 @@ def refresh_access_token(
     
     # Create new tokens
     access_token = create_access_token(
-        data={"sub": str(user.id), "role": user.role.value}
+        data={"sub": str(user.id), "role": user.role.value, "ver": user.token_version}
     )
     refresh_token = create_refresh_token(
-        data={"sub": str(user.id)}
+        data={"sub": str(user.id), "ver": user.token_version}
     )
     
     return {
@@ -106,10 +106,11 @@ def refresh_access_token(
 
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+async def get_current_user_info(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get current authenticated user's profile.
     """
-    return current_user
+    return await UserService(db).get_by_id(current_user.id)
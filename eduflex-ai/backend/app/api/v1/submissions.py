@@ -1,38 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from typing import List
+from typing import List, Optional, Union
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.deps import get_current_user
-from app.models.user import User
-from app.schemas.submission import SubmissionCreate, SubmissionResponse
-from app.services.submission_service import SubmissionService
+from app.core.pagination import decode_cursor, page_size, paginated
+from app.services.principal_cache import Principal
+from app.models.submission import SubmissionStatus
+from app.schemas.submission import SubmissionCreate, SubmissionResponse, SubmissionSummary
+from app.services.submission_service import SubmissionService, schedule_grading
 
 router = APIRouter(prefix="/submissions", tags=["Submissions"])
 
 @router.post("/", response_model=SubmissionResponse, status_code=status.HTTP_201_CREATED)
 async def submit_assignment(
     submission_data: SubmissionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Submit an assignment.
+
+    With ASYNC_GRADING enabled, submissions containing descriptive answers are
+    accepted with 202 and status "submitted"; descriptive answers are graded
+    by the grading workers. MCQ-only submissions are graded immediately.
     """
     service = SubmissionService(db)
     try:
-        return await service.submit_assignment(current_user.id, submission_data)
+        submission = await service.submit_assignment(
+            current_user.id, submission_data, defer_descriptive=settings.ASYNC_GRADING
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         print(f"Submission Error: {e}")
         raise HTTPException(status_code=500, detail="Failed to process submission")
 
-@router.get("/my", response_model=List[SubmissionResponse])
-def get_my_submissions(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    if submission.status == SubmissionStatus.SUBMITTED:
+        schedule_grading(submission.id)
+        response.status_code = status.HTTP_202_ACCEPTED
+    return submission
+
+@router.get("/my", response_model=Union[List[SubmissionResponse], List[SubmissionSummary]])
+async def get_my_submissions(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
+    summary: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
+    """
+    The caller's submissions, newest first.
+    The X-Next-Cursor response header, passed back as `cursor`, fetches the next page.
+    With `summary=true`, submissions are returned without their answers.
+    """
     service = SubmissionService(db)
-    return service.get_student_submissions(current_user.id)
+    page = await service.get_student_submissions(
+        current_user.id, limit, decode_cursor(cursor), with_answers=not summary
+    )
+    if summary:
+        page = page._replace(items=[SubmissionSummary.model_validate(s) for s in page.items])
+    return paginated(response, page)
@@ -1,56 +1,81 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Any, Literal, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.deps import get_current_user
+from app.core.pagination import decode_cursor, decode_sort_cursor, page_size, paginated
+from app.services.principal_cache import Principal
+from app.services.student_summary_service import StudentSummaryService
 from app.services.user_service import UserService
-from app.models.user import User, UserRole
-from app.schemas.user import UserResponse
+from app.models.user import UserRole
+from app.schemas.user import StudentSummaryResponse, UserResponse
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/students", response_model=List[UserResponse])
-def get_students(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_students(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Get list of all students.
+    Get a page of students, newest first.
+    The X-Next-Cursor response header, passed back as `cursor`, fetches the next page.
     """
     # Optional: Check if current_user is Faculty/Admin
     user_service = UserService(db)
-    students = user_service.get_users_by_role(UserRole.STUDENT)
-    return students
+    students = await user_service.get_users_by_role(UserRole.STUDENT, limit, decode_cursor(cursor))
+    return paginated(response, students)
+
+@router.get("/cohort", response_model=List[StudentSummaryResponse])
+async def get_cohort(
+    response: Response,
+    sort: Literal["gpa", "average_percentage"] = "gpa",
+    order: Literal["desc", "asc"] = "desc",
+    department_id: Optional[UUID] = None,
+    min_gpa: Optional[float] = Query(None, ge=0, le=4),
+    max_gpa: Optional[float] = Query(None, ge=0, le=4),
+    min_percentage: Optional[float] = Query(None, ge=0, le=100),
+    max_percentage: Optional[float] = Query(None, ge=0, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Depends(page_size),
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get a page of graded students with their GPA and average percentage,
+    sorted by either and optionally filtered to a department or a range.
+    Read from the per-student rollups, not the individual reports.
+    The X-Next-Cursor response header, passed back as `cursor`, fetches the next page.
+    """
+    if current_user.role not in [UserRole.FACULTY, UserRole.ADMIN, UserRole.SUPER_ADMIN]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only faculty can view cohorts"
+        )
+    cohort = await StudentSummaryService(db).get_cohort(
+        sort, order == "desc", limit, decode_sort_cursor(cursor, sort),
+        department_id, min_gpa, max_gpa, min_percentage, max_percentage
+    )
+    return paginated(response, cohort)
 
 @router.get("/{user_id}/report")
-def get_student_report(
+async def get_student_report(
     user_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Get a specific student's report card (Mock Data).
+    Get a specific student's report card.
+    Served from a per-student cache that is dropped when the student is graded.
     """
-    user_service = UserService(db)
-    student = user_service.get_by_id(user_id)
-    
-    if not student:
+    report = await UserService(db).get_student_academic_report(user_id)
+    if report is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
         )
-        
-    if student.role != UserRole.STUDENT:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User is not a student"
-        )
-
-    # Real Report Data from service
-    report = user_service.get_student_academic_report(user_id)
-    if not report:
-         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate report"
-        )
     return report
@@ -0,0 +1,28 @@
+"""
+Recompute every student_academic_summary rollup from the submissions.
+
+The rollups are maintained incrementally as evaluations are written; run
+this to repair them after editing scores by hand or restoring submissions:
+
+    python -m app.commands.rebuild_student_summaries
+
+Deletes and re-inserts all rollups in one transaction with two set-based
+statements, on the sync engine like the other maintenance scripts.
+"""
+import time
+
+from app.core.database import SessionLocal
+# Import models to ensure they are registered
+from app.models import user, assignment, submission  # noqa: F401
+from app.services.student_summary_service import rebuild_student_summaries
+
+
+def main() -> None:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        rebuilt = rebuild_student_summaries(db)
+    print(f"Rebuilt {rebuilt} student summaries in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,13 +17,40 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Role / active flag / token version of authenticated users, cached per process
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_SIZE: int = 50000
+    AUTH_CACHE_REDIS: bool = False  # Share cached principals across workers via REDIS_URL
+    
+    # Password hashing (runs on a dedicated process pool)
+    PASSWORD_HASH_WORKERS: int = 2
+    # Hash/verify calls allowed to wait for a worker before new ones get 503
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 2
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    BCRYPT_ROUNDS: int = 12
     
     # Database
     DATABASE_URL: str
     DB_ECHO: bool = False
     
+    def get_async_database_url(self) -> str:
+        """DATABASE_URL with its driver swapped for asyncpg / aiosqlite."""
+        url = self.DATABASE_URL
+        for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if url.startswith(prefix):
+                return "postgresql+asyncpg://" + url[len(prefix):]
+        if url.startswith("sqlite://"):
+            return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+        return url
+    
     # Redis
     REDIS_URL: str
+    # A slow or unreachable Redis fails calls fast instead of stalling requests
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    REDIS_CONNECT_TIMEOUT_SECONDS: float = 0.5
     
     # CORS - comma-separated string will be split
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:3001"
@@ -37,12 +64,89 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
     
-    # Rate Limiting
+    # Rate Limiting (token buckets per user, or per IP when anonymous)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "redis" (uses REDIS_URL)
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 10
+    RATE_LIMIT_ANALYTICS_REFRESH_PER_MINUTE: int = 6
+    
+    # Assignment payload cache (read-through, in-process tier in front of Redis)
+    ASSIGNMENT_CACHE_ENABLED: bool = True
+    ASSIGNMENT_CACHE_TTL_SECONDS: int = 300
+    ASSIGNMENT_CACHE_LOCAL_TTL_SECONDS: int = 60  # In-process tier in front of Redis
+    ASSIGNMENT_CACHE_LOCAL_SIZE: int = 1024
+    ASSIGNMENT_CACHE_NEGATIVE_TTL_SECONDS: int = 30  # Unknown ids
+    
+    # Cache prewarming of assignments due soon
+    PREWARM_ENABLED: bool = True
+    PREWARM_INTERVAL_SECONDS: int = 120  # Keep below ASSIGNMENT_CACHE_TTL_SECONDS
+    PREWARM_HORIZON_MINUTES: int = 60
+    
+    # Analytics
+    # Stored AI insights older than this are served stale and refreshed in the background
+    ANALYTICS_STALE_AFTER_SECONDS: int = 300
+    # How long an explicit refresh request waits for its job before answering 202
+    ANALYTICS_REFRESH_WAIT_SECONDS: float = 20.0
+    # Stored analytics served from an in-process tier, optionally in front of Redis
+    ANALYTICS_CACHE_REDIS: bool = False  # Share cached analytics across workers via REDIS_URL
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300
+    ANALYTICS_CACHE_LOCAL_TTL_SECONDS: int = 30
+    ANALYTICS_CACHE_LOCAL_SIZE: int = 1024
+
+    # Student report cards, cached per student until their next evaluation
+    STUDENT_REPORT_CACHE_REDIS: bool = False  # Share cached reports across workers via REDIS_URL
+    STUDENT_REPORT_CACHE_TTL_SECONDS: int = 600
+    STUDENT_REPORT_CACHE_LOCAL_TTL_SECONDS: int = 30
+    STUDENT_REPORT_CACHE_LOCAL_SIZE: int = 1024
+    
+    # Background Jobs
+    JOB_BACKEND: str = "memory"  # "memory" or "redis" (uses REDIS_URL)
+    JOB_WORKERS: int = 4
+    JOB_DEBOUNCE_SECONDS: float = 5.0
+    JOB_MAX_DELAY_SECONDS: float = 30.0
+    # Unfinished jobs are leased to their queue; other workers adopt them once it lapses
+    JOB_LEASE_SECONDS: float = 30.0
+    
+    # Grading
+    # Accept submissions with descriptive answers as 202 and grade them on the worker pool
+    ASYNC_GRADING: bool = False
+    GRADING_WORKERS: int = 8
+    # Failed grading jobs are retried with exponential backoff (5 s, 10 s, ...)
+    GRADING_MAX_ATTEMPTS: int = 3
+    GRADING_RETRY_BACKOFF_SECONDS: float = 5.0
+    # Sweep for submissions left ungraded (crashed worker, retries exhausted);
+    # with JOB_BACKEND="redis" only one worker sweeps per interval
+    GRADING_RECOVERY_INTERVAL_SECONDS: int = 300
+    GRADING_PLAN_CACHE_SIZE: int = 1024  # Compiled assignments kept in memory
+    # Bump when grading logic or prompts change so cached grades are not reused
+    GRADER_VERSION: str = "heuristic-v1"
+    GRADING_CACHE_ENABLED: bool = True
+    GRADING_CACHE_SIZE: int = 10000
+    GRADING_CACHE_TTL_SECONDS: int = 86400
+    GRADING_CACHE_REDIS: bool = False  # Share cached grades across workers via REDIS_URL
     
     # AI Services
     GEMINI_API_KEY: Optional[str] = None
     OPENAI_API_KEY: Optional[str] = None
+    AI_PROVIDER: str = "heuristic"  # "heuristic", "fake" (offline benchmarking) or "http"
+    
+    # Remote grading endpoint (AI_PROVIDER="http")
+    AI_PROVIDER_URL: Optional[str] = None
+    AI_PROVIDER_MAX_CONCURRENCY: int = 16  # In-flight calls across the whole process
+    AI_PROVIDER_MAX_CONNECTIONS: int = 32
+    AI_PROVIDER_TIMEOUT_SECONDS: float = 30.0
+    AI_PROVIDER_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    AI_PROVIDER_MAX_RETRIES: int = 2
+    AI_PROVIDER_RETRY_BACKOFF_SECONDS: float = 0.5
+    # Consecutive failed calls before grading falls back to the heuristic
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    AI_CIRCUIT_RESET_SECONDS: float = 30.0
+    
+    # Micro-batching of descriptive answer evaluation (per question)
+    AI_BATCHING: bool = True
+    AI_BATCH_MAX_SIZE: int = 16
+    AI_BATCH_MAX_WAIT_MS: float = 20.0
     
     class Config:
         env_file = ".env"
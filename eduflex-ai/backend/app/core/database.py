@@ -1,10 +1,28 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Insert, create_engine
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
-from typing import Generator
+from typing import Any, AsyncGenerator
 
-# Create database engine
+
+# Models use the Postgres UUID/JSONB types; render them as plain CHAR/JSON
+# columns so the same metadata can be created on SQLite for local runs.
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+# Sync engine: migrations, init_db and maintenance scripts
 connect_args = {}
 if settings.DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
@@ -25,21 +43,57 @@ else:
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine (asyncpg / aiosqlite): used by the API and services
+async_database_url = settings.get_async_database_url()
+if async_database_url.startswith("sqlite"):
+    async_engine = create_async_engine(async_database_url, echo=settings.DB_ECHO)
+else:
+    async_engine = create_async_engine(
+        async_database_url,
+        echo=settings.DB_ECHO,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20
+    )
+
+# Objects stay usable after commit; lazy loads are not available on AsyncSession
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+# Background jobs run each handler on its own short-lived event loop, which
+# cannot reuse connections pooled on another loop, so they get unpooled ones.
+background_engine = create_async_engine(async_database_url, echo=settings.DB_ECHO, poolclass=NullPool)
+BackgroundSessionLocal = async_sessionmaker(background_engine, expire_on_commit=False, autoflush=False)
+
 # Base class for models
 Base = declarative_base()
 
+# INSERT ... ON CONFLICT constructs of the databases the app runs on
+# (Postgres, and SQLite for local runs and the benchmarks)
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert_insert(db: AsyncSession, table: Any) -> Insert:
+    """insert(table) for the session's database, with on_conflict_do_update/do_nothing."""
+    return _UPSERT_INSERTS[db.get_bind().dialect.name](table)
+
+
+def own_session(db: AsyncSession) -> AsyncSession:
+    """
+    A new session on `db`'s engine, for work shared by concurrent requests
+    (single-flight cache loads) that must not use, or die with, the session
+    of whichever request started it.
+    """
+    return AsyncSession(db.bind, expire_on_commit=False, autoflush=False)
+
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Database session dependency.
     
     Usage:
         @router.get("/items")
-        def get_items(db: Session = Depends(get_db)):
-            return db.query(Item).all()
+        async def get_items(db: AsyncSession = Depends(get_db)):
+            return (await db.execute(select(Item))).scalars().all()
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
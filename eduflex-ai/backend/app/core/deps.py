@@ -1,40 +1,46 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
+from uuid import UUID
 from app.core.database import get_db
 from app.core.security import decode_token
-from app.models.user import User, UserRole
-from app.services.user_service import UserService
+from app.models.user import UserRole
+from app.services.principal_cache import Principal, principal_cache
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
     """
     Dependency to get current authenticated user.
+
+    Returns the cached Principal (id, role, is_active, token_version) rather
+    than the full User row; load the User explicitly when profile fields
+    are needed.
     
     Usage:
         @router.get("/profile")
-        def get_profile(user: User = Depends(get_current_user)):
+        async def get_profile(user: Principal = Depends(get_current_user)):
             return user
     """
     token = credentials.credentials
     payload = decode_token(token)
     
     user_id: str = payload.get("sub")
-    if user_id is None:
+    try:
+        user_id = UUID(user_id)
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials"
         )
     
-    user_service = UserService(db)
-    user = user_service.get_by_id(user_id)
+    user = await principal_cache.get(db, user_id)
     
     if user is None:
         raise HTTPException(
@@ -42,6 +48,12 @@ def get_current_user(
             detail="User not found"
         )
     
+    if payload.get("ver", 0) != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -51,7 +63,7 @@ def get_current_user(
     return user
 
 
-def get_current_student(current_user: User = Depends(get_current_user)) -> User:
+def get_current_student(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Dependency to ensure current user is a student."""
     if current_user.role != UserRole.STUDENT:
         raise HTTPException(
@@ -61,7 +73,7 @@ def get_current_student(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def get_current_faculty(current_user: User = Depends(get_current_user)) -> User:
+def get_current_faculty(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Dependency to ensure current user is faculty."""
     if current_user.role != UserRole.FACULTY:
         raise HTTPException(
@@ -71,7 +83,7 @@ def get_current_faculty(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+def get_current_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Dependency to ensure current user is admin or super admin."""
     if current_user.role not in [UserRole.ADMIN, UserRole.SUPER_ADMIN]:
         raise HTTPException(
@@ -0,0 +1,583 @@
+"""
+In-process background job queue with per-key debouncing and coalescing.
+
+Jobs are identified by (kind, key), e.g. ("analytics.refresh", assignment_id).
+Enqueueing a job that is already pending for the same key does not create a
+second run: the pending job absorbs the trigger and its start is pushed back
+by the debounce window, capped at JOB_MAX_DELAY_SECONDS after the first
+trigger. A key never runs twice concurrently; a trigger that arrives while
+its key is running queues exactly one follow-up run.
+
+Job records are written to a pluggable backend so status can be reported and
+pending work survives a restart: Redis (from settings.REDIS_URL) in
+deployments, in-memory for local runs and tests.
+
+Every unfinished job is leased to the queue that holds it. The owner renews
+its leases every JOB_LEASE_SECONDS / 3; a queue only adopts another queue's
+jobs (on start, and then on every renewal) once their lease has expired,
+i.e. their owner died, so live workers never run each other's jobs.
+
+A queue built with max_attempts > 1 retries a failed job, waiting
+retry_backoff_seconds * 2**(attempt - 1) before each new attempt.
+
+enqueue() and the workers only touch in-memory state under the queue's
+lock and queue their backend writes; the dispatcher thread applies them in
+order, outside the lock, together with lease renewal and adoption. So
+enqueue() never waits on Redis and is safe to call from an event loop.
+Event-loop code waits for a job with wait_async(), which holds no thread.
+
+Usage:
+    job_queue.register("analytics.refresh", refresh_handler)
+    job_id = job_queue.enqueue("analytics.refresh", str(assignment_id))
+    job_queue.status(job_id)
+    await job_queue.wait_async(job_id, timeout=20)
+"""
+import abc
+import asyncio
+import json
+import threading
+import time
+import uuid
+import enum
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job:
+    """A single coalesced run of a handler for one key."""
+
+    def __init__(
+        self,
+        kind: str,
+        key: str,
+        run_after: float,
+        id: Optional[str] = None,
+        status: JobStatus = JobStatus.PENDING,
+        enqueued_at: Optional[float] = None,
+        started_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+        triggers: int = 1,
+        error: Optional[str] = None,
+        attempts: int = 0
+    ):
+        self.id = id or uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.status = JobStatus(status)
+        self.enqueued_at = enqueued_at or time.time()
+        self.run_after = run_after
+        self.started_at = started_at
+        self.finished_at = finished_at
+        self.triggers = triggers
+        self.error = error
+        self.attempts = attempts
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status.value,
+            "enqueued_at": self.enqueued_at,
+            "run_after": self.run_after,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "triggers": self.triggers,
+            "error": self.error,
+            "attempts": self.attempts
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(**data)
+
+
+class JobBackend(abc.ABC):
+    """Storage for job records and their leases. Subclasses must be thread-safe."""
+
+    @abc.abstractmethod
+    def save(self, job: Job) -> None:
+        ...
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abc.abstractmethod
+    def pending(self) -> List[Job]:
+        """Jobs that were enqueued but never finished, whoever owns them."""
+
+    @abc.abstractmethod
+    def acquire(self, job_id: str, owner: str, ttl: float) -> bool:
+        """Lease a job to `owner` unless another owner holds an unexpired lease on it."""
+
+    @abc.abstractmethod
+    def renew(self, job_ids: List[str], owner: str, ttl: float) -> None:
+        """Extend the leases `owner` still holds on `job_ids`."""
+
+    @abc.abstractmethod
+    def release(self, job_id: str, owner: str) -> None:
+        """Drop `owner`'s lease on a job."""
+
+
+class InMemoryJobBackend(JobBackend):
+    """Process-local backend for development and tests."""
+
+    def __init__(self, max_finished: int = 1000):
+        self._jobs: Dict[str, Job] = {}
+        self._finished: List[str] = []
+        self._max_finished = max_finished
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+            if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                self._finished.append(job.id)
+                # Keep only the most recent finished jobs around for status lookups
+                while len(self._finished) > self._max_finished:
+                    self._jobs.pop(self._finished.pop(0), None)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pending(self) -> List[Job]:
+        with self._lock:
+            return [j for j in self._jobs.values() if j.status in (JobStatus.PENDING, JobStatus.RUNNING)]
+
+    def acquire(self, job_id: str, owner: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            holder, expires_at = self._leases.get(job_id, (owner, now))
+            if holder != owner and expires_at > now:
+                return False
+            self._leases[job_id] = (owner, now + ttl)
+            return True
+
+    def renew(self, job_ids: List[str], owner: str, ttl: float) -> None:
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            for job_id in job_ids:
+                if self._leases.get(job_id, (None, 0))[0] == owner:
+                    self._leases[job_id] = (owner, expires_at)
+
+    def release(self, job_id: str, owner: str) -> None:
+        with self._lock:
+            if self._leases.get(job_id, (None, 0))[0] == owner:
+                del self._leases[job_id]
+
+
+class RedisJobBackend(JobBackend):
+    """Durable backend storing job records as JSON strings in Redis."""
+
+    PREFIX = "eduflex:jobs:"
+    PENDING_SET = "eduflex:jobs:pending"
+    LEASE_PREFIX = "eduflex:jobs:lease:"
+
+    # Compare-and-set on the lease holder, so an owner never extends or
+    # drops a lease that expired and was taken over by another queue.
+    RENEW_SCRIPT = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+    RELEASE_SCRIPT = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url: str, finished_ttl_seconds: int = 86400):
+        import redis
+
+        self.client = redis.Redis.from_url(
+            url,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS
+        )
+        self.finished_ttl_seconds = finished_ttl_seconds
+        self._renew = self.client.register_script(self.RENEW_SCRIPT)
+        self._release = self.client.register_script(self.RELEASE_SCRIPT)
+
+    def save(self, job: Job) -> None:
+        pipe = self.client.pipeline()
+        if job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+            pipe.set(self.PREFIX + job.id, json.dumps(job.to_dict()), ex=self.finished_ttl_seconds)
+            pipe.srem(self.PENDING_SET, job.id)
+        else:
+            pipe.set(self.PREFIX + job.id, json.dumps(job.to_dict()))
+            pipe.sadd(self.PENDING_SET, job.id)
+        pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        raw = self.client.get(self.PREFIX + job_id)
+        return Job.from_dict(json.loads(raw)) if raw else None
+
+    def pending(self) -> List[Job]:
+        job_ids = list(self.client.smembers(self.PENDING_SET))
+        if not job_ids:
+            return []
+        raws = self.client.mget([self.PREFIX + job_id for job_id in job_ids])
+        missing = [job_id for job_id, raw in zip(job_ids, raws) if raw is None]
+        if missing:
+            self.client.srem(self.PENDING_SET, *missing)
+        return [Job.from_dict(json.loads(raw)) for raw in raws if raw]
+
+    def acquire(self, job_id: str, owner: str, ttl: float) -> bool:
+        key = self.LEASE_PREFIX + job_id
+        if self.client.set(key, owner, px=int(ttl * 1000), nx=True):
+            return True
+        return self._renew(keys=[key], args=[owner, int(ttl * 1000)]) == 1
+
+    def renew(self, job_ids: List[str], owner: str, ttl: float) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for job_id in job_ids:
+            self._renew(keys=[self.LEASE_PREFIX + job_id], args=[owner, int(ttl * 1000)], client=pipe)
+        pipe.execute()
+
+    def release(self, job_id: str, owner: str) -> None:
+        self._release(keys=[self.LEASE_PREFIX + job_id], args=[owner])
+
+
+def create_job_backend() -> JobBackend:
+    """Build the backend selected by settings.JOB_BACKEND ("memory" or "redis")."""
+    if settings.JOB_BACKEND == "redis":
+        return RedisJobBackend(settings.REDIS_URL)
+    return InMemoryJobBackend()
+
+
+class JobQueue:
+    """
+    Debouncing, coalescing job queue backed by a bounded thread pool.
+
+    Handlers take the job key as their only argument and may be plain
+    functions or coroutine functions (run with asyncio.run on the worker).
+    """
+
+    def __init__(
+        self,
+        backend: Optional[JobBackend] = None,
+        max_workers: int = 4,
+        debounce_seconds: float = 5.0,
+        max_delay_seconds: float = 30.0,
+        lease_seconds: float = 30.0,
+        max_attempts: int = 1,
+        retry_backoff_seconds: float = 1.0
+    ):
+        self.backend = backend or InMemoryJobBackend()
+        self.max_workers = max_workers
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        # Lease holder id of this queue; unique per process and queue
+        self.owner = uuid.uuid4().hex
+
+        self._handlers: Dict[str, Callable[[str], Any]] = {}
+        self._pending: Dict[Tuple[str, str], Job] = {}
+        self._running: Dict[Tuple[str, str], Job] = {}
+        self._done_events: Dict[str, threading.Event] = {}
+        self._waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        # Backend writes as (job snapshot, lease it, final write), applied in
+        # order by the dispatcher; ids of finished jobs whose final write is queued
+        self._outbox: "deque[Tuple[Job, bool, bool]]" = deque()
+        self._finishing: set = set()
+        self._cond = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stopping = False
+        self._next_renewal = 0.0
+
+    def register(self, kind: str, handler: Callable[[str], Any]) -> None:
+        self._handlers[kind] = handler
+
+    def start(self) -> None:
+        """Start the dispatcher and worker pool; the dispatcher first adopts jobs whose lease expired."""
+        with self._cond:
+            if self._dispatcher is not None:
+                return
+            self._stopping = False
+            self._next_renewal = 0.0
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job-worker")
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="job-dispatcher", daemon=True)
+            self._dispatcher.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+            self._dispatcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+        # Final writes of jobs that finished after the dispatcher stopped
+        self._flush()
+
+    def enqueue(self, kind: str, key: str, delay: Optional[float] = None) -> str:
+        """
+        Request a run of `kind` for `key`, coalescing with any pending run.
+
+        Args:
+            kind: Registered handler name
+            key: Coalescing key passed to the handler
+            delay: Debounce window in seconds (defaults to debounce_seconds);
+                0 runs as soon as a worker and the key are free
+
+        Returns:
+            Id of the job that will serve this request
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        delay = self.debounce_seconds if delay is None else delay
+        now = time.time()
+
+        with self._cond:
+            job = self._pending.get((kind, key))
+            if job:
+                job.triggers += 1
+                deadline = job.enqueued_at + self.max_delay_seconds
+                job.run_after = min(max(job.run_after, now + delay), deadline) if delay else now
+            else:
+                job = Job(kind=kind, key=key, run_after=now + delay)
+                self._pending[(kind, key)] = job
+                self._done_events[job.id] = threading.Event()
+            self._persist(job, lease=job.triggers == 1)
+            return job.id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            for job in list(self._pending.values()) + list(self._running.values()):
+                if job.id == job_id:
+                    return job.to_dict()
+        job = self.backend.get(job_id)
+        return job.to_dict() if job else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a job started by this process finishes or timeout expires."""
+        event = self._done_events.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+        return self.status(job_id)
+
+    async def wait_async(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """wait() for event-loop callers: awaits the job on the loop instead of blocking a thread."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._cond:
+            waiting = job_id in self._done_events
+            if waiting:
+                self._waiters.setdefault(job_id, []).append((loop, future))
+        if waiting:
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._cond:
+                    waiters = self._waiters.get(job_id, [])
+                    if (loop, future) in waiters:
+                        waiters.remove((loop, future))
+        return await asyncio.to_thread(self.status, job_id)
+
+    def _persist(self, job: Job, lease: bool = False, final: bool = False) -> None:
+        """Queue a write of the job's current state for the dispatcher. Holds _cond."""
+        self._outbox.append((Job.from_dict(job.to_dict()), lease, final))
+        self._cond.notify_all()
+
+    def _flush(self) -> None:
+        """Apply queued backend writes in order, without holding _cond."""
+        while True:
+            with self._cond:
+                if not self._outbox:
+                    return
+                job, lease, final = self._outbox.popleft()
+            try:
+                if lease:
+                    self.backend.acquire(job.id, self.owner, self.lease_seconds)
+                self.backend.save(job)
+                if final:
+                    self.backend.release(job.id, self.owner)
+            except Exception as e:
+                print(f"Job backend write failed ({job.kind}:{job.key}): {e}")
+            if final:
+                self._finished(job.id)
+
+    def _finished(self, job_id: str) -> None:
+        """Wake everyone waiting on a job whose final state has been written."""
+        with self._cond:
+            self._finishing.discard(job_id)
+            event = self._done_events.pop(job_id, None)
+            waiters = self._waiters.pop(job_id, [])
+        if event is not None:
+            event.set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            held: Optional[List[str]] = None
+            started: List[Job] = []
+            with self._cond:
+                now = time.time()
+                next_wake = self._next_renewal
+                if not self._stopping:
+                    if now >= self._next_renewal:
+                        held = [job.id for job in list(self._pending.values()) + list(self._running.values())]
+                        self._next_renewal = now + self.lease_seconds / 3
+                    for slot, job in list(self._pending.items()):
+                        if slot in self._running:
+                            continue
+                        if job.run_after > now:
+                            next_wake = min(next_wake, job.run_after)
+                            continue
+                        if len(self._running) >= self.max_workers:
+                            break
+                        del self._pending[slot]
+                        self._running[slot] = job
+                        job.status = JobStatus.RUNNING
+                        job.started_at = now
+                        job.attempts += 1
+                        self._persist(job)
+                        started.append(job)
+                if held is None and not started and not self._outbox:
+                    if self._stopping:
+                        return
+                    self._cond.wait(max(next_wake - now, 0.0))
+                    continue
+
+            # Backend I/O happens here, outside the lock. RUNNING is written
+            # before the job is handed to a worker, so it never overwrites
+            # the job's final state.
+            self._flush()
+            if held is not None:
+                self._renew_leases(held)
+            for job in started:
+                self._executor.submit(self._run, job)
+
+    def _renew_leases(self, held: List[str]) -> None:
+        """Heartbeat: extend the leases on our jobs, then adopt any whose owner died."""
+        try:
+            if held:
+                self.backend.renew(held, self.owner, self.lease_seconds)
+            self._adopt_orphans()
+        except Exception as e:
+            print(f"Job lease renewal failed: {e}")
+
+    def _adopt_orphans(self) -> None:
+        """Queue unfinished jobs of registered kinds whose lease has expired."""
+        for job in self.backend.pending():
+            if job.kind not in self._handlers or not self._adoptable(job):
+                continue
+            if not self.backend.acquire(job.id, self.owner, self.lease_seconds):
+                continue
+            with self._cond:
+                if not self._adoptable(job):
+                    continue
+                job.status = JobStatus.PENDING
+                self._pending[(job.kind, job.key)] = job
+                self._done_events[job.id] = threading.Event()
+                self._persist(job)
+
+    def _adoptable(self, job: Job) -> bool:
+        """Whether a stored unfinished job is not already queued, running or finishing here."""
+        with self._cond:
+            slot = (job.kind, job.key)
+            return slot not in self._pending and slot not in self._running and job.id not in self._finishing
+
+    def _run(self, job: Job) -> None:
+        try:
+            result = self._handlers[job.kind](job.key)
+            if asyncio.iscoroutine(result):
+                asyncio.run(result)
+            job.status = JobStatus.SUCCEEDED
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            print(f"Job Error ({job.kind}:{job.key}, attempt {job.attempts}): {e}")
+        finally:
+            slot = (job.kind, job.key)
+            with self._cond:
+                self._running.pop(slot, None)
+                # A trigger that arrived meanwhile queued its own run, which replaces the retry
+                if job.status == JobStatus.FAILED and job.attempts < self.max_attempts and slot not in self._pending:
+                    job.status = JobStatus.PENDING
+                    job.run_after = time.time() + self.retry_backoff_seconds * 2 ** (job.attempts - 1)
+                    self._pending[slot] = job
+                    self._persist(job)
+                    return
+                job.finished_at = time.time()
+                self._finishing.add(job.id)
+                self._persist(job, final=True)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class PeriodicScheduler:
+    """Thread that enqueues one (kind, key) job every `interval_seconds`, starting immediately."""
+
+    def __init__(self, queue: JobQueue, kind: str, key: str, interval_seconds: float):
+        self.queue = queue
+        self.kind = kind
+        self.key = key
+        self.interval_seconds = interval_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"schedule-{self.kind}", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stopping.is_set():
+            self.queue.enqueue(self.kind, self.key, delay=0)
+            self._stopping.wait(self.interval_seconds)
+
+
+job_queue = JobQueue(
+    backend=create_job_backend(),
+    max_workers=settings.JOB_WORKERS,
+    debounce_seconds=settings.JOB_DEBOUNCE_SECONDS,
+    max_delay_seconds=settings.JOB_MAX_DELAY_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS
+)
+
+# Separate pool so slow model calls during grading never starve analytics refreshes
+grading_queue = JobQueue(
+    backend=create_job_backend(),
+    max_workers=settings.GRADING_WORKERS,
+    debounce_seconds=0,
+    max_delay_seconds=0,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.GRADING_MAX_ATTEMPTS,
+    retry_backoff_seconds=settings.GRADING_RETRY_BACKOFF_SECONDS
+)
@@ -0,0 +1,147 @@
+"""
+Keyset (cursor) pagination on (created_at, id), newest first.
+
+A page is fetched with
+    WHERE (created_at, id) < (cursor.created_at, cursor.id)
+    ORDER BY created_at DESC, id DESC LIMIT n + 1
+which walks a composite index from the cursor position, so deep pages cost
+the same as the first one (OFFSET has to skip every earlier row). The
+extra row only tells whether there is a next page.
+
+The cursor row's created_at is read back from the table by id, so the
+comparison uses the stored value exactly as the database holds it; the
+copy carried in the cursor is only a fallback for a row deleted since.
+Cursors are opaque, URL-safe strings; list endpoints return the next one
+in the X-Next-Cursor header and keep their plain list bodies.
+
+Usage:
+    stmt = keyset_paginate(select(Assignment), Assignment, decode_cursor(cursor), limit)
+    page = Page.from_rows((await db.execute(stmt)).scalars().all(), limit)
+
+Lists sorted on some other column use keyset_sort with a SortCursor, which
+carries the name of the sort key so a cursor cannot be replayed against a
+different ordering.
+"""
+import base64
+import datetime
+import json
+from typing import Any, List, NamedTuple, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Cursor(NamedTuple):
+    created_at: datetime.datetime
+    id: UUID
+
+
+def encode_cursor(created_at: datetime.datetime, id: UUID) -> str:
+    raw = json.dumps([created_at.isoformat(), str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Parse a cursor from a query string. Raises 400 if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return Cursor(datetime.datetime.fromisoformat(created_at), UUID(id))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+class SortCursor(NamedTuple):
+    key: str
+    value: float
+    id: UUID
+
+
+def encode_sort_cursor(key: str, value: float, id: UUID) -> str:
+    raw = json.dumps([key, value, str(id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sort_cursor(cursor: Optional[str], key: str) -> Optional[SortCursor]:
+    """Parse a cursor for the `key` ordering. Raises 400 if it is malformed or for another ordering."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_key, value, id = json.loads(raw)
+        if cursor_key != key or isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(cursor_key)
+        return SortCursor(cursor_key, float(value), UUID(id))
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def page_size(limit: Optional[int] = Query(None, ge=1, le=settings.MAX_PAGE_SIZE)) -> int:
+    """Query dependency: `limit`, defaulting to DEFAULT_PAGE_SIZE and capped at MAX_PAGE_SIZE."""
+    return limit or settings.DEFAULT_PAGE_SIZE
+
+
+def keyset_paginate(stmt: Select, model: Any, cursor: Optional[Cursor], limit: int) -> Select:
+    """Order `stmt` newest first and restrict it to the page after `cursor`."""
+    if cursor is not None:
+        row = aliased(model)
+        anchor = select(row.created_at).where(row.id == cursor.id).scalar_subquery()
+        stmt = stmt.where(
+            tuple_(model.created_at, model.id) < tuple_(func.coalesce(anchor, cursor.created_at), cursor.id)
+        )
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def keyset_sort(
+    stmt: Select, column: Any, id_column: Any, cursor: Optional[SortCursor], limit: int, descending: bool = True
+) -> Select:
+    """Order `stmt` by (column, id_column) and restrict it to the page after `cursor`."""
+    if cursor is not None:
+        position = tuple_(column, id_column)
+        anchor = tuple_(cursor.value, cursor.id)
+        stmt = stmt.where(position < anchor if descending else position > anchor)
+    if descending:
+        return stmt.order_by(column.desc(), id_column.desc()).limit(limit + 1)
+    return stmt.order_by(column, id_column).limit(limit + 1)
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+    @classmethod
+    def from_rows(cls, rows: List[Any], limit: int) -> "Page":
+        """Build a page from up to limit + 1 rows fetched by keyset_paginate."""
+        if len(rows) <= limit:
+            return cls(list(rows), None)
+        last = rows[limit - 1]
+        return cls(list(rows[:limit]), encode_cursor(last.created_at, last.id))
+
+    @classmethod
+    def from_sorted_rows(cls, rows: List[Any], limit: int, key: str, id_attr: str = "id") -> "Page":
+        """Build a page from up to limit + 1 rows fetched by keyset_sort on the `key` attribute."""
+        if len(rows) <= limit:
+            return cls(list(rows), None)
+        last = rows[limit - 1]
+        return cls(list(rows[:limit]), encode_sort_cursor(key, getattr(last, key), getattr(last, id_attr)))
+
+
+def paginated(response: Response, page: Page) -> List[Any]:
+    """Set the X-Next-Cursor header for `page` and return its items as the body."""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
@@ -0,0 +1,250 @@
+"""
+Token-bucket rate limiting for the API.
+
+Every caller has one bucket per rule: the user id from a valid access
+token, or the client IP for anonymous requests. A bucket holds up to
+`per_minute` tokens and refills continuously at per_minute / 60 tokens per
+second, so short bursts are allowed while the sustained rate is capped.
+Requests that find their bucket empty get 429 with Retry-After.
+
+Rules are matched by method and path prefix in order; the first match
+names the bucket and its limit, and anything else falls into the default
+bucket (RATE_LIMIT_PER_MINUTE). Buckets live in this process or in Redis
+(RATE_LIMIT_BACKEND), where each check is a single atomic Lua call so all
+workers share the same counters.
+
+Usage:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=RateLimiter(
+            create_rate_limit_backend(),
+            default_per_minute=60,
+            rules=[RateLimitRule("login", "POST", "/api/v1/auth/login", 10)]
+        )
+    )
+"""
+import abc
+import hashlib
+import json
+import math
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from jose import JWTError, jwt
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_async_redis
+
+
+class RateLimitRule(NamedTuple):
+    """A per-route limit. `method` None matches any method."""
+    name: str
+    method: Optional[str]
+    path_prefix: str
+    per_minute: int
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float
+
+
+class RateLimitBackend(abc.ABC):
+    """Storage for token buckets."""
+
+    @abc.abstractmethod
+    async def consume(self, key: str, capacity: int, refill_per_second: float) -> RateLimitDecision:
+        """Take one token from the bucket `key`, refilling it first."""
+
+
+def _refill(tokens: float, updated_at: float, now: float, capacity: int, refill_per_second: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated_at) * refill_per_second)
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets in a bounded in-process LRU, for single-process runs and tests.
+
+    An idle bucket that has been evicted or has expired is simply full
+    again, which is also what refilling it would have produced.
+    """
+
+    def __init__(self, maxsize: int = 100000, clock=time.monotonic):
+        self.buckets = TTLCache(maxsize=maxsize, ttl=None)
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    async def consume(self, key: str, capacity: int, refill_per_second: float) -> RateLimitDecision:
+        now = self.clock()
+        with self._lock:
+            tokens, updated_at = self.buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated_at, now, capacity, refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets.set(key, (tokens, now), ttl=capacity / refill_per_second)
+        return _decision(allowed, tokens, refill_per_second)
+
+
+# KEYS[1] bucket; ARGV capacity, refill per second, now (seconds).
+# Returns {allowed, tokens} with tokens as a string to keep the fraction.
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared by every worker, updated atomically by a Lua script on the
+    redis.asyncio client, so a slow Redis never blocks the event loop.
+    """
+
+    PREFIX = "eduflex:ratelimit:"
+    SCRIPT_SHA = hashlib.sha1(TOKEN_BUCKET_LUA.encode()).hexdigest()
+
+    def __init__(self, client: Any = None):
+        from redis.exceptions import NoScriptError
+
+        # None: the client of the running event loop
+        self.client = client
+        self._no_script = NoScriptError
+
+    async def consume(self, key: str, capacity: int, refill_per_second: float) -> RateLimitDecision:
+        client = self.client or get_async_redis()
+        args = (self.PREFIX + key, capacity, refill_per_second, time.time())
+        try:
+            allowed, tokens = await client.evalsha(self.SCRIPT_SHA, 1, *args)
+        except self._no_script:
+            # First call since Redis started: EVAL also caches the script for EVALSHA
+            allowed, tokens = await client.eval(TOKEN_BUCKET_LUA, 1, *args)
+        return _decision(bool(allowed), float(tokens), refill_per_second)
+
+
+def _decision(allowed: bool, tokens: float, refill_per_second: float) -> RateLimitDecision:
+    retry_after = 0.0 if allowed else (1 - tokens) / refill_per_second
+    return RateLimitDecision(allowed, int(tokens), retry_after)
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """Build the backend selected by settings.RATE_LIMIT_BACKEND ("memory" or "redis")."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend()
+    return InMemoryRateLimitBackend()
+
+
+class RateLimiter:
+    """
+    Applies the rules to (caller, method, path).
+
+    Backend errors let the request through: an unavailable Redis should not
+    take the API down with it.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        default_per_minute: int = 60,
+        rules: Sequence[RateLimitRule] = ()
+    ):
+        self.backend = backend
+        self.default_per_minute = default_per_minute
+        self.rules = list(rules)
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    def rule_for(self, method: str, path: str) -> Tuple[str, int]:
+        for rule in self.rules:
+            if (rule.method is None or rule.method == method) and path.startswith(rule.path_prefix):
+                return rule.name, rule.per_minute
+        return "default", self.default_per_minute
+
+    async def check(self, identity: str, method: str, path: str) -> Tuple[RateLimitDecision, int]:
+        """Consume one request for `identity`. Returns the decision and the limit applied."""
+        name, per_minute = self.rule_for(method, path)
+        try:
+            decision = await self.backend.consume(f"{name}:{identity}", per_minute, per_minute / 60.0)
+        except Exception as e:
+            self.errors += 1
+            print(f"Rate limiter backend error, allowing request: {e}")
+            return RateLimitDecision(True, per_minute, 0.0), per_minute
+        if decision.allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return decision, per_minute
+
+    def stats(self) -> Dict[str, Any]:
+        return {"allowed": self.allowed, "limited": self.limited, "errors": self.errors}
+
+
+def client_identity(headers: Dict[str, str], client_host: Optional[str]) -> str:
+    """
+    "user:<id>" for a request carrying a valid access token, else "ip:<addr>".
+
+    The token signature is checked so a forged subject cannot pick someone
+    else's bucket; revocation is left to the auth dependency.
+    """
+    authorization = headers.get("authorization", "")
+    if authorization[:7].lower() == "bearer ":
+        try:
+            payload = jwt.decode(authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            payload = None
+        if payload and payload.get("type") == "access" and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{client_host or 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing a RateLimiter on HTTP requests outside `exempt_prefixes`."""
+
+    def __init__(self, app, limiter: RateLimiter, exempt_prefixes: Sequence[str] = ("/health", "/docs", "/redoc", "/openapi.json")):
+        self.app = app
+        self.limiter = limiter
+        self.exempt_prefixes = tuple(exempt_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path == "/" or path.startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        client = scope.get("client")
+        identity = client_identity(headers, client[0] if client else None)
+        decision, limit = await self.limiter.check(identity, scope["method"], path)
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(decision.retry_after))).encode()),
+                (b"x-ratelimit-limit", str(limit).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,174 @@
+"""
+Shared Redis clients built from settings.REDIS_URL.
+
+get_redis() is the blocking client, for worker threads; code running on an
+event loop uses get_async_redis(), a redis.asyncio client. redis.asyncio
+connections belong to the loop that opened them, and background jobs run
+on loops of their own, so there is one async client per event loop.
+
+The clients are created lazily so importing this module never opens a
+connection. Tests can swap in FakeRedis, an in-memory stand-in for the
+commands the caches use, with set_redis(FakeRedis()); the async client
+then wraps the same fake.
+"""
+import asyncio
+import queue
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+_client: Optional[Any] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+
+def get_redis():
+    """Return the process-wide Redis client."""
+    global _client
+    if _client is None:
+        import redis
+
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS
+        )
+    return _client
+
+
+def get_async_redis():
+    """Return the redis.asyncio client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        if isinstance(_client, FakeRedis):
+            client = AsyncFakeRedis(_client)
+        else:
+            import redis.asyncio
+
+            client = redis.asyncio.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+                socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT_SECONDS
+            )
+        _async_clients[loop] = client
+    return client
+
+
+def set_redis(client: Any) -> None:
+    """Replace the shared client (e.g. with a fake in tests)."""
+    global _client
+    _client = client
+    _async_clients.clear()
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for redis.Redis covering get/set/mget/delete with
+    expiry and publish/pubsub. Values come back as bytes, like a client
+    without decode_responses.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._subscribers: List["FakePubSub"] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            return self._get(key)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            return [self._get(key) for key in keys]
+
+    def set(self, key: str, value: Any, ex: Optional[float] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            if nx and self._get(key) is not None:
+                return None
+            self._data[key] = (self._encode(value), time.monotonic() + ex if ex else None)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def flushdb(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def publish(self, channel: str, message: Any) -> int:
+        with self._lock:
+            subscribers = [sub for sub in self._subscribers if channel in sub.channels]
+        for sub in subscribers:
+            sub.messages.put({"type": "message", "channel": channel.encode(), "data": self._encode(message)})
+        return len(subscribers)
+
+    def pubsub(self) -> "FakePubSub":
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    """Subscription handle returned by FakeRedis.pubsub()."""
+
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.channels = set()
+        self.messages: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def subscribe(self, *channels: str) -> None:
+        self.channels.update(channels)
+        with self.client._lock:
+            if self not in self.client._subscribers:
+                self.client._subscribers.append(self)
+
+    def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0) -> Optional[Dict[str, Any]]:
+        try:
+            return self.messages.get(timeout=timeout) if timeout else self.messages.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        with self.client._lock:
+            if self in self.client._subscribers:
+                self.client._subscribers.remove(self)
+
+
+class AsyncFakeRedis:
+    """redis.asyncio-style coroutine interface over a FakeRedis."""
+
+    def __init__(self, client: FakeRedis):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return self.client.mget(keys)
+
+    async def set(self, key: str, value: Any, ex: Optional[float] = None, nx: bool = False) -> Optional[bool]:
+        return self.client.set(key, value, ex=ex, nx=nx)
+
+    async def delete(self, *keys: str) -> int:
+        return self.client.delete(*keys)
+
+    async def publish(self, channel: str, message: Any) -> int:
+        return self.client.publish(channel, message)
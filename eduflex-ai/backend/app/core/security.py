@@ -1,12 +1,23 @@
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
+import asyncio
+import multiprocessing
+import threading
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
 
 # Password hashing
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+    bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -19,6 +30,78 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHashPool:
+    """
+    Runs password hashing and verification on a bounded process pool.
+
+    At most `workers` hashes run at once and `queue_limit` more may wait;
+    beyond that calls fail fast with 503 and Retry-After instead of piling
+    up behind a login burst.
+
+    Usage:
+        password_hasher.start()
+        hashed = await password_hasher.hash(password)
+        ok = await password_hasher.verify(password, hashed)
+    """
+
+    def __init__(self, workers: int = 2, queue_limit: int = 32, retry_after_seconds: int = 2):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs worker threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def _run(self, fn: Callable, *args):
+        self.start()
+        with self._lock:
+            if self.in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication is busy, please retry shortly",
+                    headers={"Retry-After": str(self.retry_after_seconds)},
+                )
+            self.in_flight += 1
+            future = self._executor.submit(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "in_flight": self.in_flight, "rejected": self.rejected}
+
+
+password_hasher = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+    retry_after_seconds=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS
+)
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create JWT access token.
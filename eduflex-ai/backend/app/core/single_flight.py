@@ -0,0 +1,58 @@
+"""
+Single-flight coalescing of concurrent identical loads.
+
+When many requests miss the same cache key at once (a timed quiz opening,
+say), only the first runs the load; the rest await its result. Keys should
+name the resource and its version, e.g. ("assignment", 1, assignment_id).
+
+Loads are coalesced per event loop, since a task can only be awaited from
+the loop that runs it. The load runs as its own task and callers await it
+through asyncio.shield, so one caller being cancelled does not cancel the
+others. The load may therefore outlive the caller that started it, and must
+not use that caller's request-scoped resources such as its database session.
+An exception from the load is raised to every caller; the next call after
+it finishes starts a fresh load.
+
+Usage:
+    flights = SingleFlight()
+    value = await flights.do(("assignment", 1, assignment_id), load)
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.leaders = 0
+        self.followers = 0
+        self._calls: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Result of load(), shared with every concurrent caller of the same key."""
+        if not self.enabled:
+            return await load()
+
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        task = self._calls.get(call_key)
+        if task is None:
+            self.leaders += 1
+            task = loop.create_task(load())
+            self._calls[call_key] = task
+            task.add_done_callback(lambda done: self._forget(call_key, done))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, call_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        if self._calls.get(call_key) is task:
+            del self._calls[call_key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller was cancelled
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"loads": self.leaders, "coalesced": self.followers, "in_flight": len(self._calls)}
@@ -0,0 +1,340 @@
+"""
+Two-tier cache: an in-process LRU in front of Redis, kept coherent across
+workers by invalidation messages on a Redis pub/sub channel.
+
+Reads try the local tier, then Redis, then the caller's loader; values
+found in Redis or loaded are written back to both tiers, and concurrent
+misses on one key share a single load (see app.core.single_flight). That
+load outlives any one caller, so it gets a database session of its own on
+the caller's engine rather than the caller's session. Redis keys carry
+the cache's namespace and a version, so bumping the version (when the
+cached shape changes) makes old entries unreachable.
+
+invalidate() deletes a key from both tiers and publishes it on
+INVALIDATION_CHANNEL; every other worker's InvalidationBus drops it from
+its local tier as soon as the message arrives. Local entries also expire
+after local_ttl, which bounds staleness if a message is ever missed.
+invalidate_on_commit() defers all of that until the session's transaction
+commits, so readers cannot re-cache the old row in between.
+
+Reads and writes are coroutines on the event loop's redis.asyncio client.
+invalidate() stays synchronous so commit hooks can call it: it drops the
+local entries at once and, on an event loop, hands the Redis delete and
+publish to the loop's default executor instead of blocking the loop.
+
+Usage:
+    cache = TwoTierCache("assignment", version=1, local_ttl=60, redis_ttl=300)
+    value = await cache.get_or_load(key, load, db)  # load(session) on a miss
+    cache.invalidate_on_commit(db, key)
+"""
+import asyncio
+import json
+import threading
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.database import own_session
+from app.core.redis import get_async_redis, get_redis
+from app.core.single_flight import SingleFlight
+
+INVALIDATION_CHANNEL = "eduflex:cache:invalidate"
+
+MISS = object()
+_NEGATIVE = object()
+_NEGATIVE_RAW = b"-"
+
+
+class InvalidationBus:
+    """
+    Per-process pub/sub link shared by every TwoTierCache.
+
+    Caches register under their namespace; messages published by this
+    process carry its origin id and are ignored on receipt, since the
+    publisher has already dropped its own entries.
+    """
+
+    def __init__(self, channel: str = INVALIDATION_CHANNEL):
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.caches: Dict[str, "TwoTierCache"] = {}
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def register(self, cache: "TwoTierCache") -> None:
+        self.caches[cache.namespace] = cache
+
+    def publish(self, namespace: str, keys: Optional[List[str]]) -> None:
+        """Broadcast dropped keys of a namespace; None drops the whole local tier."""
+        message = json.dumps({"origin": self.origin, "namespace": namespace, "keys": keys})
+        try:
+            get_redis().publish(self.channel, message)
+            self.sent += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"Cache invalidation publish error: {e}")
+
+    def handle(self, raw: Any) -> None:
+        """Apply one invalidation message from another process."""
+        message = json.loads(raw)
+        if message.get("origin") == self.origin:
+            return
+        cache = self.caches.get(message.get("namespace"))
+        if cache is None:
+            return
+        self.received += 1
+        keys = message.get("keys")
+        if keys is None:
+            cache.local.clear()
+        else:
+            for key in keys:
+                cache.local.delete(key)
+
+    def start(self) -> None:
+        """Start listening, if any registered cache uses Redis."""
+        if self._thread is not None or not any(c.use_redis for c in self.caches.values()):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _listen(self) -> None:
+        backoff = 0.5
+        while not self._stopping.is_set():
+            try:
+                pubsub = get_redis().pubsub()
+                pubsub.subscribe(self.channel)
+                backoff = 0.5
+                # Local entries written while unsubscribed may have missed
+                # invalidations; start clean.
+                for cache in self.caches.values():
+                    cache.local.clear()
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.handle(message["data"])
+                pubsub.close()
+            except Exception as e:
+                self.errors += 1
+                print(f"Cache invalidation listener error: {e}")
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "listening": self._thread is not None,
+            "sent": self.sent,
+            "received": self.received,
+            "errors": self.errors
+        }
+
+
+invalidation_bus = InvalidationBus()
+
+
+class TwoTierCache:
+    """
+    Local LRU + Redis cache for one namespace.
+
+    Values are stored locally as-is and in Redis through dumps/loads (JSON
+    by default). With negative_ttl set, set(key, None) records a known
+    missing key for that long.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        version: int = 1,
+        local_maxsize: int = 1024,
+        local_ttl: float = 30,
+        redis_ttl: int = 300,
+        negative_ttl: Optional[int] = None,
+        use_redis: bool = True,
+        dumps: Callable[[Any], Any] = json.dumps,
+        loads: Callable[[Any], Any] = json.loads,
+        bus: Optional[InvalidationBus] = None
+    ):
+        self.namespace = namespace
+        self.version = version
+        self.local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self.redis_ttl = redis_ttl
+        self.negative_ttl = negative_ttl
+        self.use_redis = use_redis
+        self.dumps = dumps
+        self.loads = loads
+        self.bus = bus or invalidation_bus
+        self.bus.register(self)
+        self.flights = SingleFlight()
+
+        self.hits = 0
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def redis_key(self, key: Hashable) -> str:
+        return f"eduflex:cache:{self.namespace}:v{self.version}:{key}"
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value, None for a cached missing key, or `default` on a miss."""
+        key = str(key)
+        value = self.local.get(key, MISS)
+        if value is not MISS:
+            self.local_hits += 1
+            return self._hit(value)
+
+        if self.use_redis:
+            try:
+                raw = await get_async_redis().get(self.redis_key(key))
+            except Exception as e:
+                self.redis_errors += 1
+                print(f"Cache {self.namespace} Redis error: {e}")
+                raw = None
+            if raw is not None:
+                value = _NEGATIVE if raw == _NEGATIVE_RAW else self.loads(raw)
+                self.local.set(key, value, ttl=self._local_ttl(value))
+                self.redis_hits += 1
+                return self._hit(value)
+
+        self.misses += 1
+        return default
+
+    def _hit(self, value: Any) -> Any:
+        self.hits += 1
+        if value is _NEGATIVE:
+            self.negative_hits += 1
+            return None
+        return value
+
+    def _local_ttl(self, value: Any) -> Optional[float]:
+        if value is _NEGATIVE:
+            return min(self.local.ttl or self.negative_ttl, self.negative_ttl)
+        return None
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        """Cache a value in both tiers. None is cached only when negative_ttl is set."""
+        if value is None:
+            if not self.negative_ttl:
+                return
+            value = _NEGATIVE
+        key = str(key)
+        self.local.set(key, value, ttl=self._local_ttl(value))
+        if not self.use_redis:
+            return
+        try:
+            if value is _NEGATIVE:
+                await get_async_redis().set(self.redis_key(key), _NEGATIVE_RAW, ex=self.negative_ttl)
+            else:
+                await get_async_redis().set(self.redis_key(key), self.dumps(value), ex=self.redis_ttl)
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Cache {self.namespace} Redis error: {e}")
+
+    async def get_or_load(
+        self, key: Hashable, load: Callable[[AsyncSession], Awaitable[Any]], db: AsyncSession
+    ) -> Any:
+        """
+        Read-through: the cached value, or load(session) cached in both tiers.
+        Concurrent misses on the same key share one load, which runs in its
+        own session on db's engine.
+        """
+        value = await self.get(key, MISS)
+        if value is not MISS:
+            return value
+        return await self.flights.do(self.flight_key(key), lambda: self._load_and_set(key, load, db))
+
+    def flight_key(self, key: Hashable) -> Tuple[str, int, str]:
+        """Single-flight key of a cache key: (namespace, version, key)."""
+        return (self.namespace, self.version, str(key))
+
+    async def _load_and_set(
+        self, key: Hashable, load: Callable[[AsyncSession], Awaitable[Any]], db: AsyncSession
+    ) -> Any:
+        async with own_session(db) as session:
+            value = await load(session)
+        await self.set(key, value)
+        return value
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Drop keys from both tiers here and from every other worker's local tier."""
+        keys = [str(key) for key in keys]
+        for key in keys:
+            self.local.delete(key)
+        if self.use_redis:
+            _off_loop(self._invalidate_redis, keys)
+
+    def _invalidate_redis(self, keys: List[str]) -> None:
+        try:
+            get_redis().delete(*(self.redis_key(key) for key in keys))
+        except Exception as e:
+            self.redis_errors += 1
+            print(f"Cache {self.namespace} Redis error: {e}")
+        self.bus.publish(self.namespace, keys)
+
+    def invalidate_on_commit(self, session: Any, *keys: Hashable) -> None:
+        """Invalidate once `session` (sync or async) commits its transaction."""
+        session = getattr(session, "sync_session", session)
+        pending = session.info.setdefault(_PENDING_KEY, [])
+        pending.append((self, keys))
+
+    def clear(self) -> None:
+        """Empty every worker's local tier. Redis entries expire with their TTL."""
+        self.local.clear()
+        if self.use_redis:
+            _off_loop(self.bus.publish, self.namespace, None)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "redis_errors": self.redis_errors,
+            "coalesced": self.flights.followers,
+            "local": self.local.stats()
+        }
+
+
+def _off_loop(func: Callable[..., None], *args: Any) -> None:
+    """
+    Run blocking Redis calls in the running loop's default executor, or
+    inline when there is no loop. asyncio.run() waits for that executor
+    before closing, so a job's last invalidation is not lost.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        func(*args)
+        return
+    loop.run_in_executor(None, func, *args)
+
+
+_PENDING_KEY = "two_tier_cache_invalidations"
+
+
+@event.listens_for(Session, "after_commit")
+def _flush_invalidations(session: Session) -> None:
+    for cache, keys in session.info.pop(_PENDING_KEY, ()):
+        cache.invalidate(*keys)
+
+
+def bytes_passthrough(value: Any) -> Any:
+    """dumps/loads for caches whose values are already serialized bytes."""
+    return value
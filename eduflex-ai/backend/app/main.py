@@ -1,9 +1,23 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.jobs import job_queue, grading_queue
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.rate_limit import RateLimiter, RateLimitMiddleware, RateLimitRule, create_rate_limit_backend
+from app.core.security import password_hasher
+from app.core.two_tier_cache import invalidation_bus
 from app.api.v1 import auth, users, assignments, submissions, analytics
 # Import models to ensure they are registered
 from app.models import user, assignment, submission
+from app.services.ai_providers import get_provider
+from app.services.analytics_service import analytics_cache
+from app.services.assignment_cache import assignment_cache
+from app.services.grading_cache import grading_cache
+from app.services.grading_plan import grading_plans
+from app.services.prewarm import cache_warmer, prewarm_scheduler
+from app.services.principal_cache import principal_cache
+from app.services.submission_service import grading_recovery_scheduler
+from app.services.user_service import student_report_cache
 
 # Create FastAPI application
 app = FastAPI(
@@ -15,6 +29,19 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+# Rate limiting, with stricter buckets for login and analytics refreshes
+# (added before CORS so 429 responses still carry CORS headers)
+rate_limiter = RateLimiter(
+    create_rate_limit_backend(),
+    default_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+    rules=[
+        RateLimitRule("login", "POST", "/api/v1/auth/login", settings.RATE_LIMIT_LOGIN_PER_MINUTE),
+        RateLimitRule("analytics-refresh", "POST", "/api/v1/analytics/", settings.RATE_LIMIT_ANALYTICS_REFRESH_PER_MINUTE),
+    ]
+)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +49,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include API routers
@@ -49,10 +77,36 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/caches", tags=["Health"])
+def cache_stats():
+    """Hit/miss counters of the in-process caches and AI provider client."""
+    provider = get_provider()
+    return {
+        "assignments": assignment_cache.stats(),
+        "grading": grading_cache.stats(),
+        "grading_plans": grading_plans.stats(),
+        "principals": principal_cache.stats(),
+        "analytics": analytics_cache.stats(),
+        "student_reports": student_report_cache.stats(),
+        "invalidation": invalidation_bus.stats(),
+        "prewarm": cache_warmer.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "ai_provider": provider.stats() if hasattr(provider, "stats") else None
+    }
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Execute on application startup."""
+    job_queue.start()
+    grading_queue.start()
+    password_hasher.start()
+    invalidation_bus.start()
+    if settings.PREWARM_ENABLED:
+        prewarm_scheduler.start()
+    if settings.ASYNC_GRADING:
+        grading_recovery_scheduler.start()
     print(f"🚀 {settings.PROJECT_NAME} v{settings.VERSION} starting up...")
     print(f"📝 API Documentation: http://localhost:8000/docs")
 
@@ -61,4 +115,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Execute on application shutdown."""
+    prewarm_scheduler.shutdown()
+    grading_recovery_scheduler.shutdown()
+    job_queue.shutdown()
+    grading_queue.shutdown()
+    password_hasher.shutdown()
+    invalidation_bus.shutdown()
     print(f"👋 {settings.PROJECT_NAME} shutting down...")
@@ -1,10 +1,10 @@
-from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, DateTime, Index, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
 import enum
 from app.core.database import Base
+from app.core.ids import uuid7
 
 class AssignmentType(str, enum.Enum):
     ASSIGNMENT = "assignment"
@@ -16,8 +16,15 @@ class QuestionType(str, enum.Enum):
 
 class Assignment(Base):
     __tablename__ = "assignments"
+    __table_args__ = (
+        # Keyset pagination of the assignment list
+        Index("ix_assignments_created_at_id", "created_at", "id"),
+        Index("ix_assignments_faculty_id", "faculty_id"),
+        # Prewarm sweep of assignments due soon
+        Index("ix_assignments_due_date", "due_date"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
     subject = Column(String(100), nullable=False)
@@ -37,8 +44,12 @@ class Assignment(Base):
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # An assignment's questions, in id order for per-question GROUP BYs
+        Index("ix_questions_assignment_id_id", "assignment_id", "id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     assignment_id = Column(UUID(as_uuid=True), ForeignKey("assignments.id"), nullable=False)
     type = Column(SQLEnum(QuestionType), nullable=False)
     question_text = Column(Text, nullable=False)
@@ -53,7 +64,7 @@ class Question(Base):
 class AssignmentAnalytics(Base):
     __tablename__ = "assignment_analytics"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     assignment_id = Column(UUID(as_uuid=True), ForeignKey("assignments.id"), unique=True)
     
     # Numeric Metrics
@@ -61,13 +72,37 @@ class AssignmentAnalytics(Base):
     average_score = Column(Float, default=0.0)
     max_score_achieved = Column(Float, default=0.0)
     min_score_achieved = Column(Float, default=0.0)
+
+    # Running aggregates, maintained incrementally as submissions are evaluated
+    score_sum = Column(Float, default=0.0, server_default="0")
+    score_sum_squares = Column(Float, default=0.0, server_default="0")
     
     # AI Insights (JSONB)
     ai_insights = Column(JSONB, nullable=True) # Stores the master prompt output
+    insights_updated_at = Column(DateTime, nullable=True)
     
     last_updated = Column(DateTime, default=func.now())
 
     assignment = relationship("Assignment", back_populates="analytics")
+    question_stats = relationship("AssignmentQuestionStats", back_populates="analytics", cascade="all, delete-orphan")
+
+
+class AssignmentQuestionStats(Base):
+    """Per-question running counters for an assignment's analytics."""
+    __tablename__ = "assignment_question_stats"
+    __table_args__ = (
+        UniqueConstraint("analytics_id", "question_id", name="uq_assignment_question_stats_question"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    analytics_id = Column(UUID(as_uuid=True), ForeignKey("assignment_analytics.id"), nullable=False)
+    question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id"), nullable=False)
+
+    attempted_count = Column(Integer, default=0, nullable=False)
+    correct_count = Column(Integer, default=0, nullable=False)
+    marks_sum = Column(Float, default=0.0, nullable=False)
+
+    analytics = relationship("AssignmentAnalytics", back_populates="question_stats")
 
 # Add analytics relationship to Assignment
 Assignment.analytics = relationship("AssignmentAnalytics", uselist=False, back_populates="assignment")
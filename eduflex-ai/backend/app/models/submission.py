@@ -1,10 +1,10 @@
-from sqlalchemy import Column, String, Integer, Text, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, DateTime, Index, Enum as SQLEnum, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
 import enum
 from app.core.database import Base
+from app.core.ids import uuid7
 
 class SubmissionStatus(str, enum.Enum):
     DRAFT = "draft"
@@ -17,12 +17,34 @@ class EvaluationSource(str, enum.Enum):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        # Keyset pagination of a student's submissions
+        Index("ix_submissions_student_id_created_at_id", "student_id", "created_at", "id"),
+        # Analytics over an assignment's graded submissions
+        Index("ix_submissions_assignment_id_status", "assignment_id", "status", postgresql_include=["student_id"]),
+        # A student's graded submissions (academic report)
+        Index("ix_submissions_student_id_status", "student_id", "status"),
+        # Submissions still waiting for grading, swept on startup
+        Index(
+            "ix_submissions_pending_grading", "status",
+            postgresql_where=text("status = 'SUBMITTED'"),
+            sqlite_where=text("status = 'SUBMITTED'")
+        ),
+        # Ranking and score statistics within an assignment
+        Index("ix_submissions_assignment_id_total_score", "assignment_id", "total_score"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     assignment_id = Column(UUID(as_uuid=True), ForeignKey("assignments.id"), nullable=False)
     student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     submitted_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(SQLEnum(SubmissionStatus), default=SubmissionStatus.DRAFT, nullable=False)
+
+    # Copied from the grading result when the submission is evaluated;
+    # NULL until then. max_score is the assignment's max_marks at submission.
+    total_score = Column(Integer, nullable=True)
+    max_score = Column(Integer, nullable=True)
+    percentage = Column(Float, nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -34,8 +56,14 @@ class Submission(Base):
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (
+        # Loading a submission's answers and summing its marks
+        Index("ix_answers_submission_id", "submission_id", postgresql_include=["marks_awarded"]),
+        # Per-question statistics
+        Index("ix_answers_question_id_submission_id", "question_id", "submission_id", postgresql_include=["marks_awarded"]),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     submission_id = Column(UUID(as_uuid=True), ForeignKey("submissions.id"), nullable=False)
     question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id"), nullable=False)
     answer_text = Column(Text, nullable=True)
@@ -50,7 +78,7 @@ class Answer(Base):
 class Evaluation(Base):
     __tablename__ = "evaluations"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     submission_id = Column(UUID(as_uuid=True), ForeignKey("submissions.id"), nullable=False, unique=True)
     evaluated_by = Column(SQLEnum(EvaluationSource), nullable=False)
     total_marks = Column(Integer, nullable=False)
@@ -59,3 +87,30 @@ class Evaluation(Base):
 
     # Relationships
     submission = relationship("Submission", back_populates="evaluation")
+
+
+class StudentAcademicSummary(Base):
+    """
+    Per-student running totals over evaluated submissions, for sorting and
+    filtering cohorts without building every report. Maintained incrementally
+    as evaluations are written; `python -m app.commands.rebuild_student_summaries`
+    recomputes them from the submissions.
+    """
+    __tablename__ = "student_academic_summary"
+    __table_args__ = (
+        # Cohort listing, sorted by either metric (student_id breaks ties)
+        Index("ix_student_academic_summary_gpa", "gpa", "student_id"),
+        Index("ix_student_academic_summary_average_percentage", "average_percentage", "student_id"),
+    )
+
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+
+    # Running aggregates
+    assessment_count = Column(Integer, default=0, nullable=False)
+    percentage_sum = Column(Float, default=0.0, nullable=False)
+
+    # Derived from the aggregates on every update, so they can be indexed
+    average_percentage = Column(Float, default=0.0, nullable=False)
+    gpa = Column(Float, default=0.0, nullable=False)
+
+    last_updated = Column(DateTime, default=func.now())
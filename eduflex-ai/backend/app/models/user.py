@@ -1,9 +1,9 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-import uuid
 import enum
 from app.core.database import Base
+from app.core.ids import uuid7
 
 
 class UserRole(str, enum.Enum):
@@ -18,8 +18,12 @@ class User(Base):
     """User model for all system users."""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination of users by role (e.g. the student list)
+        Index("ix_users_role_created_at_id", "role", "created_at", "id"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String, nullable=False)
     role = Column(SQLEnum(UserRole), nullable=False)
@@ -32,6 +36,8 @@ class User(Base):
     
     email_verified = Column(Boolean, default=False)
     is_active = Column(Boolean, default=True)
+    # Tokens carry the version they were issued at; bumping it revokes them
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     
     last_login_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
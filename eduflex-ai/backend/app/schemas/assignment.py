@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field, UUID4
+from pydantic import BaseModel, Field
+from uuid import UUID
 from typing import List, Optional, Any, Dict
 from datetime import datetime
 from app.models.assignment import AssignmentType, QuestionType
@@ -16,8 +17,8 @@ class QuestionCreate(QuestionBase):
     pass
 
 class QuestionResponse(QuestionBase):
-    id: UUID4
-    assignment_id: UUID4
+    id: UUID
+    assignment_id: UUID
 
     class Config:
         from_attributes = True
@@ -45,11 +46,21 @@ class AssignmentUpdate(BaseModel):
     type: Optional[AssignmentType] = None
 
 class AssignmentResponse(AssignmentBase):
-    id: UUID4
-    faculty_id: UUID4
+    id: UUID
+    faculty_id: UUID
+    created_at: datetime
+    updated_at: datetime
+    questions: List[QuestionResponse]
+
+    class Config:
+        from_attributes = True
+
+class AssignmentSummary(AssignmentBase):
+    """An assignment without its questions, for list views."""
+    id: UUID
+    faculty_id: UUID
     created_at: datetime
     updated_at: datetime
-    questions: List[QuestionResponse] = []
 
     class Config:
         from_attributes = True
@@ -1,23 +1,24 @@
-from pydantic import BaseModel, UUID4
+from pydantic import BaseModel
+from uuid import UUID
 from typing import List, Optional, Any, Dict
 from datetime import datetime
 from app.models.submission import SubmissionStatus
 
 class AnswerCreate(BaseModel):
-    question_id: UUID4
+    question_id: UUID
     # For MCQ, this is the selected option string. For Descriptive, the text answer.
     # We use 'Any' or specific fields. Let's send a flexible payload.
     answer_text: Optional[str] = None 
     selected_options: Optional[List[str]] = None # For multi-select or single select stored as list
 
 class SubmissionCreate(BaseModel):
-    assignment_id: UUID4
+    assignment_id: UUID
     # Map of question_id -> answer value (string or list of strings)
-    answers: Dict[UUID4, Any] 
+    answers: Dict[UUID, Any] 
 
 class AnswerResponse(BaseModel):
-    id: UUID4
-    question_id: UUID4
+    id: UUID
+    question_id: UUID
     answer_text: Optional[str]
     marks_awarded: Optional[int]
     feedback: Optional[str]
@@ -26,13 +27,29 @@ class AnswerResponse(BaseModel):
         from_attributes = True
 
 class SubmissionResponse(BaseModel):
-    id: UUID4
-    assignment_id: UUID4
-    student_id: UUID4
+    id: UUID
+    assignment_id: UUID
+    student_id: UUID
     status: SubmissionStatus
     submitted_at: datetime
-    total_score: Optional[int] = 0
-    answers: List[AnswerResponse] = []
+    total_score: Optional[int] = None
+    max_score: Optional[int] = None
+    percentage: Optional[float] = None
+    answers: List[AnswerResponse]
+
+    class Config:
+        from_attributes = True
+
+class SubmissionSummary(BaseModel):
+    """A submission without its answers, for list views."""
+    id: UUID
+    assignment_id: UUID
+    student_id: UUID
+    status: SubmissionStatus
+    submitted_at: datetime
+    total_score: Optional[int] = None
+    max_score: Optional[int] = None
+    percentage: Optional[float] = None
 
     class Config:
         from_attributes = True
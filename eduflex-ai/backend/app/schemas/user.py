@@ -1,4 +1,5 @@
-from pydantic import BaseModel, EmailStr, Field, UUID4
+from pydantic import BaseModel, EmailStr, Field
+from uuid import UUID
 from datetime import datetime
 from typing import Optional
 from app.models.user import UserRole
@@ -16,7 +17,7 @@ class UserCreate(UserBase):
     """Schema for creating a new user."""
     password: str = Field(..., min_length=8)
     role: UserRole
-    department_id: Optional[UUID4] = None
+    department_id: Optional[UUID] = None
 
 
 class UserUpdate(BaseModel):
@@ -29,9 +30,9 @@ class UserUpdate(BaseModel):
 
 class UserResponse(UserBase):
     """Schema for user response (without sensitive data)."""
-    id: UUID4
+    id: UUID
     role: UserRole
-    department_id: Optional[UUID4]
+    department_id: Optional[UUID]
     email_verified: bool
     is_active: bool
     created_at: datetime
@@ -43,3 +44,14 @@ class UserResponse(UserBase):
 class UserInDB(UserResponse):
     """Schema for user in database (includes hash)."""
     password_hash: str
+
+
+class StudentSummaryResponse(BaseModel):
+    """A student's rollup in the cohort listing."""
+    student_id: UUID
+    name: str
+    department_id: Optional[UUID]
+    assessment_count: int
+    average_percentage: float
+    gpa: float
+    last_updated: Optional[datetime]
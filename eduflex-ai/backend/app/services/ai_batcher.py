@@ -0,0 +1,123 @@
+"""
+Micro-batching front end for descriptive answer evaluation.
+
+Concurrent evaluations of the same question are collected until either
+max_batch_size answers are waiting or the oldest has waited max_wait_ms,
+then graded with one provider call and fanned back out to each caller.
+
+Callers may live on different event loops (request handlers on the server
+loop, grading jobs on worker threads), so batches are assembled on a
+dedicated loop thread owned by the batcher.
+"""
+import asyncio
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.services.ai_providers import AIProvider, get_provider
+
+
+class _Batch:
+    def __init__(self, question_text: str, max_marks: int):
+        self.question_text = question_text
+        self.max_marks = max_marks
+        self.items: List[Tuple[str, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class EvaluationBatcher:
+    """
+    Groups evaluate calls per question into batched provider calls.
+
+    If a batched call raises, each of its answers is retried on its own so a
+    single bad answer only fails its own caller.
+    """
+
+    def __init__(
+        self,
+        provider_factory: Callable[[], AIProvider] = get_provider,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 20.0
+    ):
+        self.provider_factory = provider_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._batches: Dict[Tuple[UUID, int], _Batch] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    async def evaluate(
+        self, question_id: UUID, question_text: str, student_answer: str, max_marks: int
+    ) -> Dict[str, Any]:
+        """Evaluate one answer as part of the next batch for its question."""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(
+            self._submit(question_id, question_text, student_answer, max_marks), loop
+        )
+        return await asyncio.wrap_future(future)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ai-batcher", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def _submit(
+        self, question_id: UUID, question_text: str, student_answer: str, max_marks: int
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        key = (question_id, max_marks)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = _Batch(question_text, max_marks)
+            batch.timer = loop.call_later(self.max_wait_ms / 1000, self._flush, key)
+            self._batches[key] = batch
+
+        future = loop.create_future()
+        batch.items.append((student_answer, future))
+        if len(batch.items) >= self.max_batch_size:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: Tuple[UUID, int]) -> None:
+        batch = self._batches.pop(key, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: _Batch) -> None:
+        provider = self.provider_factory()
+        answers = [answer for answer, _ in batch.items]
+        try:
+            results = await provider.evaluate_batch(batch.question_text, answers, batch.max_marks)
+            if len(results) != len(answers):
+                raise ValueError(f"Provider returned {len(results)} results for {len(answers)} answers")
+        except Exception as e:
+            results = [e] if len(answers) == 1 else await self._isolated(provider, batch, answers)
+
+        for (_, future), result in zip(batch.items, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _isolated(self, provider: AIProvider, batch: _Batch, answers: List[str]) -> List[Any]:
+        """Grade each answer in its own call so failures stay per item."""
+        async def one(answer: str):
+            try:
+                return (await provider.evaluate_batch(batch.question_text, [answer], batch.max_marks))[0]
+            except Exception as e:
+                return e
+        return await asyncio.gather(*[one(answer) for answer in answers])
+
+
+evaluation_batcher = EvaluationBatcher(
+    max_batch_size=settings.AI_BATCH_MAX_SIZE,
+    max_wait_ms=settings.AI_BATCH_MAX_WAIT_MS
+)
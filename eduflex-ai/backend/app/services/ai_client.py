@@ -0,0 +1,290 @@
+"""
+HTTP client for a remote grading model.
+
+All calls share one keep-alive httpx connection pool and a global
+concurrency limit, run on a dedicated event loop thread (httpx pools and
+asyncio semaphores are bound to the loop that created them, and callers
+come from the server loop, the batcher loop and grading workers).
+
+Each call has connect/read timeouts and is retried with jittered
+exponential backoff on timeouts, connection errors, 429 and 5xx. A circuit
+breaker counts failed attempts (other non-200 responses and unparseable
+bodies included); while it is open, answers are graded with the local
+length heuristic instead of waiting on a degraded provider.
+
+The endpoint is expected to accept
+    POST {AI_PROVIDER_URL}/evaluate
+    {"question": str, "answers": [str], "max_marks": int}
+and answer
+    {"results": [{"marks_awarded", "feedback", "confidence"} | {"error": str}]}
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.ai_providers import AIProvider, EvaluationResult, heuristic_evaluation
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class ProviderError(Exception):
+    """The provider could not grade a batch."""
+
+
+class CircuitOpenError(ProviderError):
+    """The circuit opened while the call was queued or between retries."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Closed: calls go through. After `failure_threshold` consecutive failures
+    it opens for `reset_seconds`, then lets a single trial call through
+    (half-open); the trial's outcome closes or re-opens it. A trial that ends
+    without recording an outcome (e.g. it was cancelled) must be passed to
+    abandon_trial(), which re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def admit(self) -> Optional[str]:
+        """
+        State the call was admitted in (CLOSED, or HALF_OPEN for the trial
+        call), or None if it must not be made.
+        """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return state
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return state
+            return None
+
+    def abandon_trial(self) -> None:
+        """Settle a trial call that recorded neither outcome by re-opening the circuit."""
+        with self._lock:
+            if self._trial_in_flight:
+                self._trial_in_flight = False
+                self.opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Count a failed call. Returns True if this failure opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            opened = False
+            if self._trial_in_flight or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                opened = True
+            self._trial_in_flight = False
+            return opened
+
+
+class HTTPProvider(AIProvider):
+    """
+    Grades batches through the remote endpoint, falling back to the
+    heuristic when the circuit is open or a call fails after its retries.
+
+    Fallback results carry "fallback": True so they are not cached as
+    model grades.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 16,
+        max_connections: int = 32,
+        timeout_seconds: float = 30.0,
+        connect_timeout_seconds: float = 5.0,
+        max_retries: int = 2,
+        backoff_seconds: float = 0.5,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.breaker = breaker or CircuitBreaker()
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.fallbacks = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+    async def evaluate_batch(
+        self, question_text: str, answers: List[str], max_marks: int
+    ) -> List[EvaluationResult]:
+        admitted = self.breaker.admit()
+        if admitted is None:
+            return self._fallback(answers, max_marks)
+
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._call(question_text, answers, max_marks), loop)
+        try:
+            return await asyncio.wrap_future(future)
+        except ProviderError as e:
+            if not isinstance(e, CircuitOpenError):
+                self.failures += 1
+                print(f"AI provider error, grading with heuristic: {e}")
+            return self._fallback(answers, max_marks)
+        finally:
+            # Every exit from the trial call, including cancellation, settles it
+            if admitted == CircuitBreaker.HALF_OPEN:
+                self.breaker.abandon_trial()
+
+    def _fallback(self, answers: List[str], max_marks: int) -> List[EvaluationResult]:
+        self.fallbacks += len(answers)
+        return [dict(heuristic_evaluation(answer, max_marks), fallback=True) for answer in answers]
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ai-client", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    async def _call(self, question_text: str, answers: List[str], max_marks: int) -> List[EvaluationResult]:
+        """Runs on the client loop. Raises ProviderError once retries are exhausted."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers(),
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+
+        payload = {"question": question_text, "answers": answers, "max_marks": max_marks}
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                # Full jitter: spreads retries from concurrent callers apart
+                await asyncio.sleep(random.uniform(0, self.backoff_seconds * 2 ** (attempt - 1)))
+            try:
+                async with self._slots:
+                    # Calls queued behind the semaphore give up as soon as the circuit opens
+                    if self.breaker.state == CircuitBreaker.OPEN:
+                        raise CircuitOpenError("Circuit open")
+                    self.calls += 1
+                    response = await self._client.post("/evaluate", json=payload)
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+                self._record_failure(error)
+                continue
+            if response.status_code in RETRYABLE_STATUS:
+                error = f"HTTP {response.status_code}"
+                self._record_failure(error)
+                continue
+            if response.status_code != 200:
+                error = f"HTTP {response.status_code}: {response.text[:200]}"
+                self._record_failure(error)
+                raise ProviderError(error)
+            try:
+                results = self._parse(response.json(), len(answers), max_marks)
+            except (ProviderError, ValueError, TypeError, AttributeError) as e:
+                error = f"Malformed response: {e}"
+                self._record_failure(error)
+                raise ProviderError(error) from e
+            self.breaker.record_success()
+            return results
+
+        raise ProviderError(f"{error} after {self.max_retries + 1} attempts")
+
+    def _record_failure(self, error: str) -> None:
+        if self.breaker.record_failure():
+            print(f"AI provider circuit opened ({error}), grading with heuristic")
+
+    @staticmethod
+    def _parse(body: Dict[str, Any], expected: int, max_marks: int) -> List[EvaluationResult]:
+        results = body.get("results")
+        if not isinstance(results, list) or len(results) != expected:
+            raise ProviderError(f"Malformed response: expected {expected} results")
+        parsed: List[EvaluationResult] = []
+        for item in results:
+            if "error" in item:
+                parsed.append(RuntimeError(item["error"]))
+                continue
+            parsed.append({
+                "marks_awarded": max(0, min(int(item.get("marks_awarded", 0)), max_marks)),
+                "feedback": item.get("feedback", ""),
+                "confidence": item.get("confidence", 0.0)
+            })
+        return parsed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+            "circuit": self.breaker.state
+        }
+
+
+def create_http_provider() -> HTTPProvider:
+    """HTTPProvider configured from the AI_PROVIDER_* settings."""
+    if not settings.AI_PROVIDER_URL:
+        raise ValueError("AI_PROVIDER=http requires AI_PROVIDER_URL")
+    return HTTPProvider(
+        base_url=settings.AI_PROVIDER_URL,
+        api_key=settings.GEMINI_API_KEY or settings.OPENAI_API_KEY,
+        max_concurrency=settings.AI_PROVIDER_MAX_CONCURRENCY,
+        max_connections=settings.AI_PROVIDER_MAX_CONNECTIONS,
+        timeout_seconds=settings.AI_PROVIDER_TIMEOUT_SECONDS,
+        connect_timeout_seconds=settings.AI_PROVIDER_CONNECT_TIMEOUT_SECONDS,
+        max_retries=settings.AI_PROVIDER_MAX_RETRIES,
+        backoff_seconds=settings.AI_PROVIDER_RETRY_BACKOFF_SECONDS,
+        breaker=CircuitBreaker(
+            failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+            reset_seconds=settings.AI_CIRCUIT_RESET_SECONDS
+        )
+    )
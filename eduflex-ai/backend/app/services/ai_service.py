@@ -1,6 +1,10 @@
 import json
 from typing import Dict, Any, Optional
+from uuid import UUID
 from app.core.config import settings
+from app.services.ai_batcher import evaluation_batcher
+from app.services.ai_providers import get_provider
+from app.services.grading_cache import grading_cache
 
 class AIService:
     """
@@ -9,47 +13,72 @@ class AIService:
     """
     
     @staticmethod
-    async def evaluate_answer(question_text: str, student_answer: str, max_marks: int) -> Dict[str, Any]:
+    async def evaluate_answer(
+        question_text: str,
+        student_answer: str,
+        max_marks: int,
+        question_id: Optional[UUID] = None
+    ) -> Dict[str, Any]:
         """
         Evaluates a descriptive answer.
+
+        When question_id is given and AI_BATCHING is enabled, the call joins
+        the micro-batch for that question instead of calling the provider alone.
+        Answers already graded for the same question (after normalization) are
+        served from the grading cache without a provider call.
         """
         if not student_answer:
             return {"marks_awarded": 0, "feedback": "No answer provided.", "confidence": 1.0}
 
-        # If API keys are available, real AI call would go here.
-        # For now, let's use a "Smart HEURISTIC" that simulates AI evaluation.
-        
-        # Heuristic Logic (Simulation):
-        # 1. Length-based check (very basic)
-        # 2. Keyword matching (simulated)
-        
-        length = len(student_answer.split())
-        score = 0
-        feedback = ""
-        
-        if length < 5:
-            score = 1 if max_marks > 2 else 0
-            feedback = "Answer is too brief to be informative."
-        elif length < 20:
-            score = max_marks // 2
-            feedback = "Good start, but needs more depth and specific examples."
+        cache_key = None
+        if question_id is not None and settings.GRADING_CACHE_ENABLED:
+            cache_key = grading_cache.key(question_id, question_text, max_marks, student_answer)
+            cached = await grading_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if question_id is not None and settings.AI_BATCHING:
+            result = await evaluation_batcher.evaluate(question_id, question_text, student_answer, max_marks)
         else:
-            score = int(max_marks * 0.85) # High score for long answers in mock
-            feedback = "Comprehensive answer covering key aspects of the topic. Well structured."
+            result = (await get_provider().evaluate_batch(question_text, [student_answer], max_marks))[0]
+            if isinstance(result, Exception):
+                raise result
 
-        # Simulate some randomness/uncertainty
-        return {
-            "marks_awarded": min(score, max_marks),
-            "feedback": feedback,
-            "confidence": 0.8 # Simulated confidence
-        }
+        # Heuristic fallbacks from a degraded provider are not worth keeping
+        if cache_key is not None and not result.get("fallback"):
+            await grading_cache.set(cache_key, result)
+        return result
 
     @staticmethod
     async def generate_analytics_summary(payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Implementation of the MASTER PROMPT for bulk analytics.
+
+        Runs on the background job queue, never on a request thread.
+        Until a model is wired in, returns a deterministic JSON structure
+        based on the numbers.
         """
-        # This mirrors the logic in analytics_service.py 
-        # but encapsulated here for clean architecture.
-        # Refer to User's Master Prompt in prompt.
-        pass
+        avg = payload["average_score"]
+        maxx = payload["max_marks"]
+        
+        difficulty = "Medium"
+        if avg / maxx > 0.8:
+            difficulty = "Easy"
+        elif avg / maxx < 0.4:
+            difficulty = "Hard"
+
+        return {
+            "assignment_difficulty": difficulty,
+            "overall_summary": f"The assignment '{difficulty}' difficulty. Average score is {avg}/{maxx}.",
+            "student_insights": {
+                "high_performers": [s["student_id"] for s in payload["student_scores"] if s["score"] > maxx * 0.9],
+                "at_risk_students": [s["student_id"] for s in payload["student_scores"] if s["score"] < maxx * 0.4],
+                "improvement_trend": "Stable"
+            },
+            "question_insights": [], 
+            "teaching_recommendations": [
+                "Review the concepts covered in the questions with low correct rates.",
+                "Provide more practice examples for descriptive questions."
+            ],
+            "confidence_score": 0.95
+        }
@@ -0,0 +1,108 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, case, cast, Float
+from uuid import UUID
+from typing import List, Optional
+
+from app.models.assignment import Question
+from app.models.submission import Submission, Answer, SubmissionStatus
+
+
+class AssignmentAggregates:
+    """
+    Aggregate queries behind assignment analytics.
+
+    Every method runs a single statement and returns plain row tuples, so
+    the number of statements does not grow with the number of submissions.
+    Submission totals are read from the stored Submission.total_score, which
+    is set exactly when a submission is evaluated, through the
+    (assignment_id, total_score) index.
+    Averages are cast to float in SQL so Postgres and SQLite agree.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def graded_answers(assignment_id: UUID):
+        """Subquery of the answers in an assignment's evaluated submissions."""
+        return (
+            select(Answer.id, Answer.question_id, Answer.marks_awarded)
+            .join(Submission, Submission.id == Answer.submission_id)
+            .where(
+                Submission.assignment_id == assignment_id,
+                Submission.status == SubmissionStatus.EVALUATED
+            )
+            .subquery()
+        )
+
+    def _submission_totals(self, assignment_id: UUID):
+        return select(
+            Submission.id.label("submission_id"),
+            Submission.student_id,
+            Submission.total_score.label("score")
+        ).where(
+            Submission.assignment_id == assignment_id,
+            Submission.total_score.isnot(None)
+        )
+
+    async def submission_scores(self, assignment_id: UUID) -> List[tuple]:
+        """
+        Per-submission totals.
+
+        Returns:
+            Rows of (submission_id, student_id, score)
+        """
+        return (await self.db.execute(self._submission_totals(assignment_id))).all()
+
+    async def score_summary(self, assignment_id: UUID) -> Optional[tuple]:
+        """
+        Count, average, max, min, sum and sum of squares of submission totals.
+
+        Returns:
+            Row of (total_submissions, average_score, max_score, min_score,
+                    score_sum, score_sum_squares)
+        """
+        totals = self._submission_totals(assignment_id).subquery()
+        score = cast(totals.c.score, Float)
+        stmt = select(
+            func.count(totals.c.submission_id),
+            func.coalesce(func.avg(score), 0.0),
+            func.coalesce(func.max(totals.c.score), 0),
+            func.coalesce(func.min(totals.c.score), 0),
+            func.coalesce(func.sum(score), 0.0),
+            func.coalesce(func.sum(score * score), 0.0)
+        )
+        return (await self.db.execute(stmt)).one()
+
+    async def question_stats(self, assignment_id: UUID) -> List[tuple]:
+        """
+        Per-question attempt/correct counts and mean marks over graded submissions.
+
+        An answer counts as correct when it was awarded the question's full marks.
+
+        Returns:
+            Rows of (question_id, type, question_text, marks,
+                     attempted, correct, marks_sum, avg_marks)
+        """
+        # Join the graded answers as one derived table: with the submission
+        # filter inside the ON clause instead, planners walk every question.
+        graded = self.graded_answers(assignment_id)
+        marks_awarded = cast(func.coalesce(graded.c.marks_awarded, 0), Float)
+        stmt = (
+            select(
+                Question.id,
+                Question.type,
+                Question.question_text,
+                Question.marks,
+                func.count(graded.c.id).label("attempted"),
+                func.coalesce(
+                    func.sum(case((graded.c.marks_awarded == Question.marks, 1), else_=0)), 0
+                ).label("correct"),
+                func.coalesce(func.sum(marks_awarded), 0.0).label("marks_sum"),
+                func.coalesce(func.avg(marks_awarded), 0.0).label("avg_marks")
+            )
+            .outerjoin(graded, graded.c.question_id == Question.id)
+            .where(Question.assignment_id == assignment_id)
+            .group_by(Question.id, Question.type, Question.question_text, Question.marks)
+        )
+        return (await self.db.execute(stmt)).all()
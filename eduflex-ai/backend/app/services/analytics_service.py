@@ -1,142 +1,409 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, case, or_, bindparam
+from sqlalchemy.exc import IntegrityError
 from uuid import UUID
 import datetime
-from typing import Dict, Any, List
+import math
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import BackgroundSessionLocal, upsert_insert
+from app.core.jobs import job_queue
+from app.core.two_tier_cache import TwoTierCache
+from app.models.assignment import Assignment, AssignmentAnalytics, AssignmentQuestionStats, Question
+from app.services.analytics_queries import AssignmentAggregates
+from app.services.ai_service import AIService
+
+# Stored analytics as served by GET /analytics; writers invalidate on commit
+analytics_cache = TwoTierCache(
+    "analytics",
+    local_maxsize=settings.ANALYTICS_CACHE_LOCAL_SIZE,
+    local_ttl=settings.ANALYTICS_CACHE_LOCAL_TTL_SECONDS,
+    redis_ttl=settings.ANALYTICS_CACHE_TTL_SECONDS,
+    use_redis=settings.ANALYTICS_CACHE_REDIS
+)
 
-from app.models.assignment import Assignment, AssignmentAnalytics, Question
-from app.models.submission import Submission, Answer, SubmissionStatus
 
 class AnalyticsService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def generate_assignment_analytics(self, assignment_id: UUID) -> Dict[str, Any]:
+    async def generate_assignment_analytics(self, assignment_id: UUID) -> Dict[str, Any]:
         """
-        Calculates numeric metrics and generates AI insights for an assignment.
+        Recalculates numeric metrics from scratch and generates AI insights for an assignment.
+
+        Runs as the ANALYTICS_REFRESH_JOB handler; request handlers should go
+        through schedule_analytics_refresh instead of calling this directly.
         """
-        # 1. Fetch Assignment and Analytics record
-        assignment = self.db.query(Assignment).filter(Assignment.id == assignment_id).first()
-        if not assignment:
+        # 1. Fetch Assignment
+        max_marks = (await self.db.execute(
+            select(Assignment.max_marks).where(Assignment.id == assignment_id)
+        )).scalar()
+        if max_marks is None:
             raise ValueError("Assignment not found")
-        
-        analytics_record = self.db.query(AssignmentAnalytics).filter(
-            AssignmentAnalytics.assignment_id == assignment_id
-        ).first()
-
-        if not analytics_record:
-            analytics_record = AssignmentAnalytics(assignment_id=assignment_id)
-            self.db.add(analytics_record)
-
-        # 2. Aggregations (SQL/Python)
-        submissions = self.db.query(Submission).filter(
-            Submission.assignment_id == assignment_id,
-            Submission.status == SubmissionStatus.SUBMITTED # Only consider submitted? or graded?
-            # Assuming SUBMITTED includes auto-graded ones. If Evaluation is separate, 
-            # we might need to look at Evaluation table. 
-            # For now, let's use the Answers directly for raw stats.
-        ).all()
-
-        total_submissions = len(submissions)
-        if total_submissions == 0:
+
+        # 2. Full recomputation of the running aggregates
+        analytics_record = await self.rebuild_assignment_analytics(assignment_id)
+        if analytics_record.total_submissions == 0:
             return {"message": "No submissions to analyze"}
 
-        # Calculate scores
-        scores = []
-        for sub in submissions:
-            # Simple sum of marks_awarded from Answers
-            # Ideally this should be cached on Submission model, but summing is fine for MVP
-            score = sum(a.marks_awarded for a in sub.answers) if sub.answers else 0
-            scores.append(score)
-
-        avg_score = sum(scores) / total_submissions if scores else 0
-        max_score = max(scores) if scores else 0
-        min_score = min(scores) if scores else 0
-
-        # Update Record
-        analytics_record.total_submissions = total_submissions
-        analytics_record.average_score = avg_score
-        analytics_record.max_score_achieved = max_score
-        analytics_record.min_score_achieved = min_score
-        analytics_record.last_updated = datetime.datetime.utcnow()
-
-        # 3. Question-level Analysis
-        question_stats = []
-        for question in assignment.questions:
-            # Count correct answers
-            # This is complex for descriptive, but for MCQ: marks_awarded == question.marks
-            correct_count = 0
-            total_attempted = 0
-            
-            # This query could be optimized with SQL group_by
-            answers = self.db.query(Answer).filter(Answer.question_id == question.id).all()
-            for ans in answers:
-                total_attempted += 1
-                if ans.marks_awarded == question.marks:
-                    correct_count += 1
-            
-            correct_rate = (correct_count / total_attempted) if total_attempted > 0 else 0
-            
-            question_stats.append({
-                "question_id": str(question.id),
-                "type": question.type.value,
-                "text": question.question_text[:50] + "...",
-                "correct_rate": correct_rate,
-                "avg_marks": sum(a.marks_awarded for a in answers) / total_attempted if total_attempted > 0 else 0
-            })
+        await self.db.commit()
 
-        self.db.commit()
+        # 3. Prepare Payload for AI
+        student_scores = await AssignmentAggregates(self.db).submission_scores(assignment_id)
+        ai_payload = await self._metrics_payload(analytics_record, max_marks)
+        ai_payload["student_scores"] = [
+            {"student_id": str(student_id), "score": score} for _, student_id, score in student_scores
+        ]
 
-        # 4. Prepare Payload for AI
-        ai_payload = {
-            "assignment_id": str(assignment.id),
-            "max_marks": assignment.max_marks,
-            "students": total_submissions,
-            "average_score": round(avg_score, 2),
-            "completion_rate": 0.0, # Need total students count to calc this
-            "questions": question_stats,
-            "student_scores": [{"student_id": str(s.student_id), "score": sc} for s, sc in zip(submissions, scores)]
-        }
-
-        # 5. Call AI (Placeholder)
-        # In a real impl, this calls Gemini/OpenAI with the Master Prompt
-        # updated logic to fetch insights.
-        ai_insights = self._mock_ai_insights(ai_payload)
+        # 4. Call AI
+        ai_insights = await AIService.generate_analytics_summary(ai_payload)
         
         analytics_record.ai_insights = ai_insights
-        self.db.commit()
+        analytics_record.insights_updated_at = datetime.datetime.utcnow()
+        analytics_cache.invalidate_on_commit(self.db, assignment_id)
+        await self.db.commit()
         
         return {
             "metrics": ai_payload,
             "insights": ai_insights
         }
 
-    def _mock_ai_insights(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def get_metrics(self, assignment_id: UUID) -> Optional[Dict[str, Any]]:
         """
-        Placeholder for the AI interpretation layer.
-        Returns a deterministic JSON structure based on the numbers.
+        Read the incrementally maintained metrics without rescanning submissions.
+
+        Returns:
+            Metrics dict, or None if no analytics have been recorded yet
         """
-        avg = payload["average_score"]
-        maxx = payload["max_marks"]
-        
-        difficulty = "Medium"
-        if avg / maxx > 0.8:
-            difficulty = "Easy"
-        elif avg / maxx < 0.4:
-            difficulty = "Hard"
+        row = (await self.db.execute(
+            select(AssignmentAnalytics, Assignment.max_marks)
+            .join(Assignment, Assignment.id == AssignmentAnalytics.assignment_id)
+            .where(AssignmentAnalytics.assignment_id == assignment_id)
+        )).first()
+        if not row:
+            return None
+        record, max_marks = row
+        return await self._metrics_payload(record, max_marks)
+
+    async def assignment_exists(self, assignment_id: UUID) -> bool:
+        return (await self.db.execute(
+            select(Assignment.id).where(Assignment.id == assignment_id)
+        )).first() is not None
+
+    async def get_stored_analytics(self, assignment_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Serve the stored analytics record and its last generated insights.
+
+        Metrics are kept current incrementally; insights are flagged stale once
+        the metrics have changed since they were generated and they are older
+        than ANALYTICS_STALE_AFTER_SECONDS.
+
+        Returns:
+            Dict with metrics, insights, last_updated, insights_updated_at and
+            stale, or None if insights have never been generated
+        """
+        stored = await analytics_cache.get_or_load(
+            assignment_id, lambda session: AnalyticsService(session)._load_stored(assignment_id), self.db
+        )
+        if stored is None:
+            return None
+
+        last_updated = datetime.datetime.fromisoformat(stored["last_updated"])
+        generated_at = datetime.datetime.fromisoformat(stored["insights_updated_at"])
+        max_age = datetime.timedelta(seconds=settings.ANALYTICS_STALE_AFTER_SECONDS)
+        stale = (
+            last_updated > generated_at
+            and datetime.datetime.utcnow() - generated_at > max_age
+        )
+
+        return {
+            "metrics": stored["metrics"],
+            "insights": stored["insights"],
+            "last_updated": last_updated,
+            "insights_updated_at": generated_at,
+            "stale": stale
+        }
+
+    async def _load_stored(self, assignment_id: UUID) -> Optional[Dict[str, Any]]:
+        """JSON-ready analytics record as cached by analytics_cache."""
+        row = (await self.db.execute(
+            select(AssignmentAnalytics, Assignment.max_marks)
+            .join(Assignment, Assignment.id == AssignmentAnalytics.assignment_id)
+            .where(AssignmentAnalytics.assignment_id == assignment_id)
+        )).first()
+        if not row or row[0].ai_insights is None:
+            return None
+        record, max_marks = row
+        return {
+            "metrics": await self._metrics_payload(record, max_marks),
+            "insights": record.ai_insights,
+            "last_updated": record.last_updated.isoformat(),
+            "insights_updated_at": (record.insights_updated_at or record.last_updated).isoformat()
+        }
+
+    async def _metrics_payload(self, record: AssignmentAnalytics, max_marks: int) -> Dict[str, Any]:
+        """Build the metrics dict from a stored record and its question counters."""
+        total = record.total_submissions or 0
+        mean = (record.score_sum / total) if total else 0.0
+        variance = max((record.score_sum_squares / total) - mean * mean, 0.0) if total else 0.0
+
+        rows = (await self.db.execute(
+            select(
+                AssignmentQuestionStats.question_id,
+                Question.type,
+                Question.question_text,
+                AssignmentQuestionStats.attempted_count,
+                AssignmentQuestionStats.correct_count,
+                AssignmentQuestionStats.marks_sum
+            )
+            .join(Question, Question.id == AssignmentQuestionStats.question_id)
+            .where(AssignmentQuestionStats.analytics_id == record.id)
+        )).all()
+
+        # For MCQ a correct answer is one awarded the question's full marks.
+        question_stats = []
+        for q_id, q_type, q_text, attempted, correct, marks_sum in rows:
+            question_stats.append({
+                "question_id": str(q_id),
+                "type": q_type.value,
+                "text": q_text[:50] + "...",
+                "correct_rate": (correct / attempted) if attempted > 0 else 0,
+                "avg_marks": (marks_sum / attempted) if attempted > 0 else 0
+            })
+
+        return {
+            "assignment_id": str(record.assignment_id),
+            "max_marks": max_marks,
+            "students": total,
+            "average_score": round(mean, 2),
+            "score_stddev": round(math.sqrt(variance), 2),
+            "max_score": record.max_score_achieved,
+            "min_score": record.min_score_achieved,
+            "completion_rate": 0.0, # Need total students count to calc this
+            "questions": question_stats
+        }
+
+    async def record_evaluation(
+        self,
+        assignment_id: UUID,
+        score: float,
+        answers: List[Tuple[UUID, int, int]]
+    ) -> None:
+        """
+        Fold one newly evaluated submission into the running aggregates.
 
+        Runs inside the caller's transaction, after the evaluated submission
+        has been flushed, and does not commit. Counters are updated with
+        atomic UPDATE statements so concurrent submissions do not lose writes.
+
+        Args:
+            assignment_id: Assignment the submission belongs to
+            score: Total marks awarded to the submission
+            answers: (question_id, marks_awarded, question_marks) per graded answer
+        """
+        analytics_cache.invalidate_on_commit(self.db, assignment_id)
+        record_id = await self._record_id(assignment_id)
+        if record_id is None:
+            # No running state yet: seed it from a full recomputation, which
+            # already includes this (flushed) submission.
+            try:
+                async with self.db.begin_nested():
+                    await self.rebuild_assignment_analytics(assignment_id)
+                return
+            except IntegrityError:
+                # A concurrent submission created the record first; apply our delta to it.
+                record_id = await self._record_id(assignment_id)
+
+        analytics = AssignmentAnalytics
+        await self.db.execute(
+            update(analytics)
+            .where(analytics.id == record_id)
+            .values(
+                total_submissions=analytics.total_submissions + 1,
+                score_sum=analytics.score_sum + score,
+                score_sum_squares=analytics.score_sum_squares + score * score,
+                average_score=(analytics.score_sum + score) / (analytics.total_submissions + 1),
+                max_score_achieved=case(
+                    (or_(analytics.total_submissions == 0, analytics.max_score_achieved < score), score),
+                    else_=analytics.max_score_achieved
+                ),
+                min_score_achieved=case(
+                    (or_(analytics.total_submissions == 0, analytics.min_score_achieved > score), score),
+                    else_=analytics.min_score_achieved
+                ),
+                last_updated=datetime.datetime.utcnow()
+            )
+        )
+
+        if not answers:
+            return
+
+        stats = AssignmentQuestionStats.__table__
+        existing = set((await self.db.execute(
+            select(stats.c.question_id).where(stats.c.analytics_id == record_id)
+        )).scalars())
+        missing = [q_id for q_id, _, _ in answers if q_id not in existing]
+        if missing:
+            # A concurrent first submission may create the same rows
+            await self.db.execute(
+                upsert_insert(self.db, AssignmentQuestionStats)
+                .values([{"analytics_id": record_id, "question_id": q_id} for q_id in missing])
+                .on_conflict_do_nothing(index_elements=[stats.c.analytics_id, stats.c.question_id])
+            )
+
+        await self.db.execute(
+            update(stats)
+            .where(
+                stats.c.analytics_id == record_id,
+                stats.c.question_id == bindparam("b_question_id")
+            )
+            .values(
+                attempted_count=stats.c.attempted_count + 1,
+                correct_count=stats.c.correct_count + bindparam("b_correct"),
+                marks_sum=stats.c.marks_sum + bindparam("b_marks")
+            ),
+            [
+                {"b_question_id": q_id, "b_correct": int(marks == question_marks), "b_marks": marks}
+                for q_id, marks, question_marks in answers
+            ]
+        )
+
+    async def rebuild_assignment_analytics(self, assignment_id: UUID) -> AssignmentAnalytics:
+        """
+        Recompute the running aggregates for an assignment from its submissions.
+
+        Flushes but does not commit.
+        """
+        analytics_cache.invalidate_on_commit(self.db, assignment_id)
+        record = await self._load_record(assignment_id)
+        if not record:
+            record = AssignmentAnalytics(assignment_id=assignment_id, question_stats=[])
+            self.db.add(record)
+
+        state = await self._computed_state(assignment_id)
+        total = state["total_submissions"]
+        record.total_submissions = total
+        record.score_sum = state["score_sum"]
+        record.score_sum_squares = state["score_sum_squares"]
+        record.average_score = (state["score_sum"] / total) if total else 0.0
+        record.max_score_achieved = state["max_score"]
+        record.min_score_achieved = state["min_score"]
+        record.last_updated = datetime.datetime.utcnow()
+
+        existing = {stat.question_id: stat for stat in record.question_stats}
+        for q_id, (attempted, correct, marks_sum) in state["questions"].items():
+            stat = existing.pop(q_id, None)
+            if stat is None:
+                stat = AssignmentQuestionStats(question_id=q_id)
+                record.question_stats.append(stat)
+            stat.attempted_count = attempted
+            stat.correct_count = correct
+            stat.marks_sum = marks_sum
+        for stale in existing.values():
+            record.question_stats.remove(stale)
+
+        await self.db.flush()
+        return record
+
+    async def check_assignment_analytics(self, assignment_id: UUID) -> Dict[str, Dict[str, Any]]:
+        """
+        Diff the incrementally maintained state against a full recomputation.
+
+        Returns:
+            Mapping of field name to {"stored": ..., "expected": ...};
+            empty when the stored state is consistent
+        """
+        record = await self._load_record(assignment_id)
+        expected = await self._computed_state(assignment_id)
+        stored = self._stored_state(record) if record else {"questions": {}}
+
+        diffs = {}
+        for field, value in expected.items():
+            if field == "questions":
+                continue
+            if not _close(stored.get(field), value):
+                diffs[field] = {"stored": stored.get(field), "expected": value}
+
+        for q_id in expected["questions"].keys() | stored["questions"].keys():
+            want = expected["questions"].get(q_id)
+            have = stored["questions"].get(q_id)
+            if want is None or have is None or not all(_close(h, w) for h, w in zip(have, want)):
+                diffs[f"questions.{q_id}"] = {"stored": have, "expected": want}
+
+        return diffs
+
+    async def _record_id(self, assignment_id: UUID) -> Optional[UUID]:
+        return (await self.db.execute(
+            select(AssignmentAnalytics.id).where(AssignmentAnalytics.assignment_id == assignment_id)
+        )).scalar()
+
+    async def _load_record(self, assignment_id: UUID) -> Optional[AssignmentAnalytics]:
+        """The analytics record with its question counters loaded."""
+        return (await self.db.execute(
+            select(AssignmentAnalytics)
+            .options(selectinload(AssignmentAnalytics.question_stats))
+            .where(AssignmentAnalytics.assignment_id == assignment_id)
+        )).scalars().first()
+
+    async def _computed_state(self, assignment_id: UUID) -> Dict[str, Any]:
+        aggregates = AssignmentAggregates(self.db)
+        total, _avg, max_score, min_score, score_sum, score_sum_squares = await aggregates.score_summary(assignment_id)
+        return {
+            "total_submissions": total,
+            "score_sum": float(score_sum),
+            "score_sum_squares": float(score_sum_squares),
+            "max_score": float(max_score),
+            "min_score": float(min_score),
+            "questions": {
+                q_id: (attempted, correct, float(marks_sum))
+                for q_id, _type, _text, _marks, attempted, correct, marks_sum, _avg_marks
+                in await aggregates.question_stats(assignment_id)
+            }
+        }
+
+    def _stored_state(self, record: AssignmentAnalytics) -> Dict[str, Any]:
         return {
-            "assignment_difficulty": difficulty,
-            "overall_summary": f"The assignment '{difficulty}' difficulty. Average score is {avg}/{maxx}.",
-            "student_insights": {
-                "high_performers": [s["student_id"] for s in payload["student_scores"] if s["score"] > maxx * 0.9],
-                "at_risk_students": [s["student_id"] for s in payload["student_scores"] if s["score"] < maxx * 0.4],
-                "improvement_trend": "Stable"
-            },
-            "question_insights": [], 
-            "teaching_recommendations": [
-                "Review the concepts covered in the questions with low correct rates.",
-                "Provide more practice examples for descriptive questions."
-            ],
-            "confidence_score": 0.95
+            "total_submissions": record.total_submissions,
+            "score_sum": record.score_sum,
+            "score_sum_squares": record.score_sum_squares,
+            "max_score": record.max_score_achieved,
+            "min_score": record.min_score_achieved,
+            "questions": {
+                stat.question_id: (stat.attempted_count, stat.correct_count, stat.marks_sum)
+                for stat in record.question_stats
+            }
         }
+
+
+ANALYTICS_REFRESH_JOB = "analytics.refresh"
+
+
+async def run_analytics_refresh(assignment_id: str) -> None:
+    """Job handler: regenerate metrics and AI insights in a dedicated session."""
+    async with BackgroundSessionLocal() as db:
+        await AnalyticsService(db).generate_assignment_analytics(UUID(assignment_id))
+
+
+job_queue.register(ANALYTICS_REFRESH_JOB, run_analytics_refresh)
+
+
+def schedule_analytics_refresh(assignment_id: UUID, delay: Optional[float] = None) -> str:
+    """
+    Queue an analytics refresh, coalescing with any pending refresh of the same assignment.
+
+    Args:
+        assignment_id: Assignment to refresh
+        delay: Debounce window in seconds; 0 to run as soon as possible
+
+    Returns:
+        Job id
+    """
+    return job_queue.enqueue(ANALYTICS_REFRESH_JOB, str(assignment_id), delay=delay)
+
+
+def _close(stored: Any, expected: Any) -> bool:
+    if stored is None:
+        return False
+    return math.isclose(stored, expected, rel_tol=1e-9, abs_tol=1e-6)
@@ -0,0 +1,162 @@
+"""
+Read-through cache of serialized assignment payloads.
+
+GET /assignments/{id} is served from the AssignmentResponse JSON cached
+(in a TwoTierCache: process-local, then Redis) under the assignment id
+and a variant: "full" for staff, and "student", in which every question's
+correct_answer is blanked before the payload is stored, so answer keys
+never reach the student copy. One database load fills both variants.
+Unknown ids are cached as missing for a short negative TTL, and
+concurrent misses on one assignment share a single load.
+
+AssignmentService writes invalidate their assignment directly; ORM updates
+and deletes of assignments and questions made elsewhere are invalidated
+once their transaction commits. Either way every worker drops its local
+copy through the cache's invalidation broadcast.
+"""
+from typing import Any, Awaitable, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
+
+from app.core.config import settings
+from app.core.database import own_session
+from app.core.two_tier_cache import MISS, TwoTierCache, bytes_passthrough
+from app.models.assignment import Assignment, Question
+from app.schemas.assignment import AssignmentResponse
+
+FULL = "full"
+STUDENT = "student"
+VARIANTS = (FULL, STUDENT)
+
+
+class AssignmentCache:
+    # Bump when AssignmentResponse changes shape so old payloads are ignored
+    VERSION = 1
+
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        local_ttl_seconds: int = 60,
+        local_size: int = 1024,
+        negative_ttl_seconds: int = 30,
+        enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.cache = TwoTierCache(
+            "assignment",
+            version=self.VERSION,
+            local_maxsize=local_size,
+            local_ttl=local_ttl_seconds,
+            redis_ttl=ttl_seconds,
+            negative_ttl=negative_ttl_seconds,
+            dumps=bytes_passthrough,
+            loads=bytes_passthrough
+        )
+
+    @staticmethod
+    def key(assignment_id: UUID, variant: str) -> str:
+        return f"{assignment_id}:{variant}"
+
+    async def get(
+        self,
+        assignment_id: UUID,
+        variant: str,
+        load: Callable[[AsyncSession], Awaitable[Optional[Assignment]]],
+        db: AsyncSession
+    ) -> Optional[bytes]:
+        """
+        JSON payload of the assignment in `variant`, loading it with
+        load(session) on a miss. None if unknown.
+        """
+        if not self.enabled:
+            assignment = await load(db)
+            return serialize(assignment)[variant] if assignment is not None else None
+
+        payload = await self.cache.get(self.key(assignment_id, variant), MISS)
+        if payload is not MISS:
+            return payload
+        # Readers missing either variant at once share one load
+        payloads = await self.cache.flights.do(
+            self.cache.flight_key(assignment_id), lambda: self._fill(assignment_id, load, db)
+        )
+        return payloads[variant] if payloads else None
+
+    async def refresh(
+        self,
+        assignment_id: UUID,
+        load: Callable[[AsyncSession], Awaitable[Optional[Assignment]]],
+        db: AsyncSession
+    ) -> None:
+        """Reload both variants into the cache even if present, renewing their TTLs."""
+        if self.enabled:
+            await self.cache.flights.do(
+                self.cache.flight_key(assignment_id), lambda: self._fill(assignment_id, load, db)
+            )
+
+    async def _fill(
+        self,
+        assignment_id: UUID,
+        load: Callable[[AsyncSession], Awaitable[Optional[Assignment]]],
+        db: AsyncSession
+    ) -> Optional[Dict[str, bytes]]:
+        # Shared by every reader waiting on this flight, so it runs in a
+        # session of its own instead of the session of the reader that started it
+        async with own_session(db) as session:
+            assignment = await load(session)
+            payloads = serialize(assignment) if assignment is not None else None
+        for name in VARIANTS:
+            await self.cache.set(self.key(assignment_id, name), payloads[name] if payloads else None)
+        return payloads
+
+    def invalidate(self, assignment_id: UUID) -> None:
+        if self.enabled:
+            self.cache.invalidate(*(self.key(assignment_id, name) for name in VARIANTS))
+
+    def invalidate_on_commit(self, session: Any, assignment_id: UUID) -> None:
+        if self.enabled:
+            self.cache.invalidate_on_commit(session, *(self.key(assignment_id, name) for name in VARIANTS))
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+
+def serialize(assignment: Assignment) -> Dict[str, bytes]:
+    """Both cached variants of an assignment loaded with its questions."""
+    full = AssignmentResponse.model_validate(assignment)
+    student = full.model_copy(update={
+        "questions": [q.model_copy(update={"correct_answer": None}) for q in full.questions]
+    })
+    return {FULL: full.model_dump_json().encode(), STUDENT: student.model_dump_json().encode()}
+
+
+assignment_cache = AssignmentCache(
+    ttl_seconds=settings.ASSIGNMENT_CACHE_TTL_SECONDS,
+    local_ttl_seconds=settings.ASSIGNMENT_CACHE_LOCAL_TTL_SECONDS,
+    local_size=settings.ASSIGNMENT_CACHE_LOCAL_SIZE,
+    negative_ttl_seconds=settings.ASSIGNMENT_CACHE_NEGATIVE_TTL_SECONDS,
+    enabled=settings.ASSIGNMENT_CACHE_ENABLED
+)
+
+
+def _invalidate(target: Any, assignment_id: UUID) -> None:
+    session = object_session(target)
+    if session is None:
+        assignment_cache.invalidate(assignment_id)
+    else:
+        assignment_cache.invalidate_on_commit(session, assignment_id)
+
+
+@event.listens_for(Assignment, "after_update")
+@event.listens_for(Assignment, "after_delete")
+def _assignment_changed(mapper, connection, assignment: Assignment) -> None:
+    _invalidate(assignment, assignment.id)
+
+
+@event.listens_for(Question, "after_insert")
+@event.listens_for(Question, "after_update")
+@event.listens_for(Question, "after_delete")
+def _question_changed(mapper, connection, question: Question) -> None:
+    _invalidate(question, question.assignment_id)
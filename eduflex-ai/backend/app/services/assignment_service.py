@@ -1,16 +1,19 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 from sqlalchemy.future import select
 from typing import List, Optional
 from uuid import UUID
 
+from app.core.pagination import Cursor, Page, keyset_paginate
 from app.models.assignment import Assignment, Question, AssignmentType
 from app.schemas.assignment import AssignmentCreate, AssignmentUpdate, QuestionCreate
+from app.services.assignment_cache import FULL, STUDENT, assignment_cache
 
 class AssignmentService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_assignment(self, assignment_data: AssignmentCreate, faculty_id: UUID) -> Assignment:
+    async def create_assignment(self, assignment_data: AssignmentCreate, faculty_id: UUID) -> Assignment:
         # 1. Create Assignment
         db_assignment = Assignment(
             title=assignment_data.title,
@@ -22,7 +25,7 @@ class AssignmentService:
             type=assignment_data.type
         )
         self.db.add(db_assignment)
-        self.db.flush() # flush to get ID
+        await self.db.flush() # flush to get ID
 
         # 2. Create Questions if any
         if assignment_data.questions:
@@ -37,12 +40,40 @@ class AssignmentService:
                 )
                 self.db.add(db_question)
         
-        self.db.commit()
-        self.db.refresh(db_assignment)
-        return db_assignment
+        await self.db.commit()
+        # Drop anything cached under the new id, including a negative entry
+        assignment_cache.invalidate(db_assignment.id)
+        return await self.get_assignment(db_assignment.id, populate_existing=True)
 
-    def get_assignments(self, skip: int = 0, limit: int = 100) -> List[Assignment]:
-        return self.db.query(Assignment).offset(skip).limit(limit).all()
+    async def get_assignments(
+        self, limit: int = 20, cursor: Optional[Cursor] = None, with_questions: bool = True
+    ) -> Page:
+        """
+        One page of assignments, newest first, starting after `cursor`.
+        Questions are loaded for the whole page in one extra query, or not
+        at all (and any access to them raises) when with_questions is False.
+        """
+        loader = selectinload(Assignment.questions) if with_questions else raiseload(Assignment.questions)
+        result = await self.db.execute(keyset_paginate(
+            select(Assignment).options(loader), Assignment, cursor, limit
+        ))
+        return Page.from_rows(result.scalars().all(), limit)
 
-    def get_assignment(self, assignment_id: UUID) -> Optional[Assignment]:
-        return self.db.query(Assignment).filter(Assignment.id == assignment_id).first()
+    async def get_assignment(self, assignment_id: UUID, populate_existing: bool = False) -> Optional[Assignment]:
+        stmt = select(Assignment).options(selectinload(Assignment.questions)).where(Assignment.id == assignment_id)
+        if populate_existing:
+            stmt = stmt.execution_options(populate_existing=True)
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def get_assignment_payload(self, assignment_id: UUID, for_student: bool = False) -> Optional[bytes]:
+        """
+        AssignmentResponse JSON for the assignment, served from the Redis
+        cache. The student variant never contains correct answers.
+        """
+        return await assignment_cache.get(
+            assignment_id,
+            STUDENT if for_student else FULL,
+            lambda session: AssignmentService(session).get_assignment(assignment_id),
+            self.db
+        )
@@ -0,0 +1,131 @@
+"""
+Content-addressed cache of descriptive answer evaluations.
+
+Entries are keyed by question id, a fingerprint of the question's text and
+marks, the max marks, a hash of the normalized answer text and
+GRADER_VERSION. Editing a question or bumping the grader version therefore
+changes every key, so stale grades can never be served; updating a Question's
+text or marks also drops its local entries right away.
+
+Two tiers: an in-process LRU with TTL, and optionally Redis
+(GRADING_CACHE_REDIS) so workers share results.
+"""
+import hashlib
+import json
+import string
+import unicodedata
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.redis import get_async_redis
+from app.models.assignment import Question
+
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+
+def normalize_answer(text: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of an answer."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return " ".join(text.translate(_PUNCTUATION).split())
+
+
+class GradingCache:
+    """
+    Two-tier cache of evaluation dicts.
+
+    Usage:
+        key = grading_cache.key(question_id, question_text, max_marks, answer)
+        result = await grading_cache.get(key)
+        if result is None:
+            result = await grade(...)
+            await grading_cache.set(key, result)
+    """
+
+    PREFIX = "eduflex:grading:"
+
+    def __init__(self, maxsize: int = 10000, ttl_seconds: int = 86400, use_redis: bool = False):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def key(self, question_id: UUID, question_text: str, max_marks: int, student_answer: str) -> str:
+        question_fingerprint = hashlib.sha256(f"{question_text}\x00{max_marks}".encode()).hexdigest()[:16]
+        answer_hash = hashlib.sha256(normalize_answer(student_answer).encode()).hexdigest()
+        return f"{self.PREFIX}{settings.GRADER_VERSION}:{question_id}:{question_fingerprint}:{max_marks}:{answer_hash}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        result = self.local.get(key)
+        if result is not None:
+            self.hits += 1
+            return dict(result)
+
+        if self.use_redis:
+            try:
+                raw = await get_async_redis().get(key)
+            except Exception as e:
+                self.redis_errors += 1
+                print(f"Grading cache Redis error: {e}")
+                raw = None
+            if raw:
+                result = json.loads(raw)
+                self.local.set(key, result)
+                self.hits += 1
+                self.redis_hits += 1
+                return dict(result)
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, result: Dict[str, Any]) -> None:
+        self.local.set(key, dict(result))
+        if self.use_redis:
+            try:
+                await get_async_redis().set(key, json.dumps(result), ex=self.ttl_seconds)
+            except Exception as e:
+                self.redis_errors += 1
+                print(f"Grading cache Redis error: {e}")
+
+    def invalidate_question(self, question_id: UUID) -> int:
+        """
+        Drop the local entries of a question whose text or marks changed.
+        Redis entries become unreachable because the question fingerprint in
+        their key no longer matches, and expire with their TTL.
+        """
+        marker = f":{question_id}:"
+        return self.local.delete_where(lambda key: marker in key)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "redis_errors": self.redis_errors,
+            "local": self.local.stats()
+        }
+
+
+grading_cache = GradingCache(
+    maxsize=settings.GRADING_CACHE_SIZE,
+    ttl_seconds=settings.GRADING_CACHE_TTL_SECONDS,
+    use_redis=settings.GRADING_CACHE_REDIS
+)
+
+
+@event.listens_for(Question, "after_update")
+def _invalidate_edited_question(mapper, connection, question: Question) -> None:
+    state = inspect(question)
+    if state.attrs.question_text.history.has_changes() or state.attrs.marks.history.has_changes():
+        grading_cache.invalidate_question(question.id)
@@ -0,0 +1,120 @@
+"""
+Compiled per-assignment grading plans.
+
+A plan is the part of an assignment that grading needs: its max marks and
+each question's id, type, text, marks and normalized MCQ answer key. Plans are cached in-process
+keyed by (assignment id, assignment.updated_at), so a submission costs one
+single-row version lookup instead of loading the assignment and its
+questions again.
+
+Any insert, update or delete of a Question drops the local plan straight
+away and bumps its assignment's updated_at, so plans cached by other
+processes stop matching. The bump is one UPDATE per flush for all the
+assignments whose questions changed, not one per question.
+"""
+from typing import Any, Dict, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.sql import func
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.assignment import Assignment, Question, QuestionType
+
+
+class PlannedQuestion(NamedTuple):
+    id: UUID
+    type: QuestionType
+    question_text: str
+    marks: int
+    answer_key: Optional[str]  # Normalized correct option for MCQs
+
+
+class GradingPlan(NamedTuple):
+    assignment_id: UUID
+    version: Any
+    max_marks: int
+    questions: Dict[UUID, PlannedQuestion]
+
+
+def normalize_choice(value: Any) -> str:
+    return str(value).strip()
+
+
+async def compile_plan(db: AsyncSession, assignment_id: UUID, version: Any, max_marks: int) -> GradingPlan:
+    rows = (await db.execute(
+        select(Question.id, Question.type, Question.question_text, Question.marks, Question.correct_answer)
+        .where(Question.assignment_id == assignment_id)
+    )).all()
+    questions = {}
+    for row in rows:
+        correct_val = row.correct_answer.get("answer") if isinstance(row.correct_answer, dict) else None
+        questions[row.id] = PlannedQuestion(
+            id=row.id,
+            type=row.type,
+            question_text=row.question_text,
+            marks=row.marks,
+            answer_key=normalize_choice(correct_val) if correct_val else None
+        )
+    return GradingPlan(assignment_id, version, max_marks, questions)
+
+
+class GradingPlanCache:
+    """LRU of compiled plans keyed by (assignment id, updated_at)."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.plans = TTLCache(maxsize=maxsize, ttl=None)
+
+    async def get_plan(self, db: AsyncSession, assignment_id: UUID) -> Optional[GradingPlan]:
+        """Plan for the assignment, or None if it does not exist."""
+        row = (await db.execute(
+            select(Assignment.updated_at, Assignment.max_marks).where(Assignment.id == assignment_id)
+        )).first()
+        if row is None:
+            return None
+        key = (assignment_id, row.updated_at)
+        plan = self.plans.get(key)
+        if plan is None:
+            plan = await compile_plan(db, assignment_id, row.updated_at, row.max_marks)
+            self.plans.set(key, plan)
+        return plan
+
+    def invalidate(self, assignment_id: UUID) -> None:
+        self.plans.delete_where(lambda key: key[0] == assignment_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.plans.stats()
+
+
+grading_plans = GradingPlanCache(maxsize=settings.GRADING_PLAN_CACHE_SIZE)
+
+
+@event.listens_for(Assignment, "after_update")
+def _assignment_changed(mapper, connection, assignment: Assignment) -> None:
+    grading_plans.invalidate(assignment.id)
+
+
+@event.listens_for(Question, "after_insert")
+@event.listens_for(Question, "after_update")
+@event.listens_for(Question, "after_delete")
+def _question_changed(mapper, connection, question: Question) -> None:
+    grading_plans.invalidate(question.assignment_id)
+    object_session(question).info.setdefault(_CHANGED_KEY, set()).add(question.assignment_id)
+
+
+_CHANGED_KEY = "grading_plan_changed_assignments"
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_plan_versions(session: Session, flush_context: Any) -> None:
+    assignment_ids = session.info.pop(_CHANGED_KEY, None)
+    if assignment_ids:
+        assignments = Assignment.__table__
+        session.connection().execute(
+            update(assignments)
+            .where(assignments.c.id.in_(assignment_ids))
+            .values(updated_at=func.now())
+        )
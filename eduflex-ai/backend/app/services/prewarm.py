@@ -0,0 +1,158 @@
+"""
+Cache prewarming for assignments that are about to see traffic.
+
+Every PREWARM_INTERVAL_SECONDS the scheduler queues a sweep on the job
+queue. The sweep finds assignments due within PREWARM_HORIZON_MINUTES
+and, for each one:
+
+- refreshes both cached payloads (student and staff), which also renews
+  their TTLs
+- compiles its grading plan into this worker's plan cache
+- creates its empty analytics record (the "shell"), so the first
+  submissions update counters instead of racing to rebuild them
+
+Assignments have no separate opening time, so due_date is what decides
+whether an assignment is upcoming.
+
+Edits to an assignment or its questions queue a debounced re-warm of that
+assignment, which runs if it is still upcoming. The last sweep's report
+(what was warmed and how long each step took) is exposed through stats().
+"""
+import datetime
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import BackgroundSessionLocal
+from app.core.jobs import PeriodicScheduler, job_queue
+from app.models.assignment import Assignment, AssignmentAnalytics, Question
+from app.services.assignment_cache import assignment_cache
+from app.services.assignment_service import AssignmentService
+from app.services.grading_plan import grading_plans
+
+PREWARM_JOB = "cache.prewarm"
+UPCOMING = "upcoming"
+
+
+class CacheWarmer:
+    def __init__(self, horizon_minutes: int = 60):
+        self.horizon_minutes = horizon_minutes
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.warmed = 0
+
+    async def upcoming(self, db: AsyncSession) -> List[UUID]:
+        """Ids of assignments due between now and the horizon."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (await db.execute(
+            select(Assignment.id).where(
+                Assignment.due_date >= now,
+                Assignment.due_date <= now + datetime.timedelta(minutes=self.horizon_minutes)
+            )
+        )).scalars().all()
+
+    async def warm_upcoming(self) -> Dict[str, Any]:
+        """Warm every upcoming assignment and record the report."""
+        started = time.perf_counter()
+        async with BackgroundSessionLocal() as db:
+            assignments = [await self.warm(db, assignment_id) for assignment_id in await self.upcoming(db)]
+        self.last_report = {
+            "finished_at": datetime.datetime.utcnow().isoformat(),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "assignments": assignments
+        }
+        if assignments:
+            print(f"Prewarmed {len(assignments)} upcoming assignments in {self.last_report['duration_ms']} ms")
+        return self.last_report
+
+    async def warm_assignment(self, assignment_id: UUID) -> Optional[Dict[str, Any]]:
+        """Re-warm one assignment after an edit, if it is still upcoming."""
+        async with BackgroundSessionLocal() as db:
+            if assignment_id not in await self.upcoming(db):
+                return None
+            return await self.warm(db, assignment_id)
+
+    async def warm(self, db: AsyncSession, assignment_id: UUID) -> Dict[str, Any]:
+        """Fill the caches for one assignment. Returns timings in ms per step."""
+        report: Dict[str, Any] = {"assignment_id": str(assignment_id)}
+
+        started = time.perf_counter()
+        await assignment_cache.refresh(
+            assignment_id, lambda session: AssignmentService(session).get_assignment(assignment_id), db
+        )
+        report["payload_ms"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        await grading_plans.get_plan(db, assignment_id)
+        report["grading_plan_ms"] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        report["analytics_shell_created"] = await self._ensure_analytics_shell(db, assignment_id)
+        report["analytics_shell_ms"] = _elapsed_ms(started)
+
+        self.warmed += 1
+        return report
+
+    async def _ensure_analytics_shell(self, db: AsyncSession, assignment_id: UUID) -> bool:
+        exists = (await db.execute(
+            select(AssignmentAnalytics.id).where(AssignmentAnalytics.assignment_id == assignment_id)
+        )).first()
+        if exists:
+            return False
+        try:
+            db.add(AssignmentAnalytics(assignment_id=assignment_id, total_submissions=0))
+            await db.commit()
+            return True
+        except IntegrityError:
+            # A first submission created the record in the meantime
+            await db.rollback()
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"warmed": self.warmed, "last_sweep": self.last_report}
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+cache_warmer = CacheWarmer(horizon_minutes=settings.PREWARM_HORIZON_MINUTES)
+# Queues a sweep of upcoming assignments every PREWARM_INTERVAL_SECONDS
+prewarm_scheduler = PeriodicScheduler(job_queue, PREWARM_JOB, UPCOMING, settings.PREWARM_INTERVAL_SECONDS)
+
+
+async def run_prewarm(key: str) -> None:
+    """Job handler: sweep upcoming assignments, or re-warm one edited assignment."""
+    if key == UPCOMING:
+        await cache_warmer.warm_upcoming()
+    else:
+        await cache_warmer.warm_assignment(UUID(key))
+
+
+job_queue.register(PREWARM_JOB, run_prewarm)
+
+
+def schedule_rewarm(assignment_id: UUID) -> None:
+    """
+    Queue a debounced re-warm of an edited assignment. The debounce lets
+    the edit commit (and invalidate the caches) before warming reads it.
+    """
+    if settings.PREWARM_ENABLED:
+        job_queue.enqueue(PREWARM_JOB, str(assignment_id))
+
+
+@event.listens_for(Assignment, "after_insert")
+@event.listens_for(Assignment, "after_update")
+def _assignment_changed(mapper, connection, assignment: Assignment) -> None:
+    schedule_rewarm(assignment.id)
+
+
+@event.listens_for(Question, "after_insert")
+@event.listens_for(Question, "after_update")
+@event.listens_for(Question, "after_delete")
+def _question_changed(mapper, connection, question: Question) -> None:
+    schedule_rewarm(question.assignment_id)
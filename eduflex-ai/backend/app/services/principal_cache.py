@@ -0,0 +1,92 @@
+"""
+Cache of the authentication principal behind each user id.
+
+Authenticated requests only need a user's role, active flag and token
+version, so those are cached for AUTH_CACHE_TTL_SECONDS in an in-process
+LRU and, optionally, in Redis (AUTH_CACHE_REDIS). A hit skips the users
+query entirely.
+
+Any update to a user's role, is_active or token_version drops its entries
+once the transaction commits: locally, in Redis and, through the
+invalidation broadcast, from every other worker's local tier. Without
+Redis, other processes' entries expire within the TTL.
+"""
+import json
+from typing import Any, Dict, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_session
+
+from app.core.config import settings
+from app.core.two_tier_cache import TwoTierCache
+from app.models.user import User, UserRole
+
+
+class Principal(NamedTuple):
+    """The authenticated caller, as seen by the API dependencies."""
+    id: UUID
+    role: UserRole
+    is_active: bool
+    token_version: int
+
+
+class PrincipalCache:
+    def __init__(self, maxsize: int = 50000, ttl_seconds: int = 30, use_redis: bool = False):
+        self.cache = TwoTierCache(
+            "principal",
+            local_maxsize=maxsize,
+            local_ttl=ttl_seconds,
+            redis_ttl=ttl_seconds,
+            use_redis=use_redis,
+            dumps=_dumps,
+            loads=_loads
+        )
+        self.loads = 0
+
+    async def get(self, db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+        """Principal for a user id, loading it from the database on a miss. None if unknown."""
+        return await self.cache.get_or_load(user_id, lambda session: self._load(session, user_id), db)
+
+    async def _load(self, db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+        row = (await db.execute(
+            select(User.role, User.is_active, User.token_version).where(User.id == user_id)
+        )).first()
+        self.loads += 1
+        if row is None:
+            return None
+        return Principal(user_id, row.role, bool(row.is_active), row.token_version or 0)
+
+    def invalidate(self, user_id: UUID) -> None:
+        self.cache.invalidate(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self.cache.stats(), loads=self.loads)
+
+
+def _dumps(principal: Principal) -> str:
+    return json.dumps([str(principal.id), principal.role.value, principal.is_active, principal.token_version])
+
+
+def _loads(raw: Any) -> Principal:
+    user_id, role, is_active, token_version = json.loads(raw)
+    return Principal(UUID(user_id), UserRole(role), is_active, token_version)
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.AUTH_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    use_redis=settings.AUTH_CACHE_REDIS
+)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_principal(mapper, connection, user: User) -> None:
+    state = inspect(user)
+    if any(state.attrs[name].history.has_changes() for name in ("role", "is_active", "token_version")):
+        session = object_session(user)
+        if session is None:
+            principal_cache.invalidate(user.id)
+        else:
+            principal_cache.cache.invalidate_on_commit(session, user.id)
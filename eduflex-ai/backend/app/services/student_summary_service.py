@@ -0,0 +1,152 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Insert, delete, func, insert, select
+from sqlalchemy.orm import Session
+from uuid import UUID
+import datetime
+from typing import Dict, Any, Optional
+
+from app.core.database import upsert_insert
+from app.core.pagination import Page, SortCursor, keyset_sort
+from app.models.submission import StudentAcademicSummary, Submission, SubmissionStatus
+from app.models.user import User
+
+# 4.0-scale GPA per percentage point, as on the report card
+GPA_PER_PERCENT = 4.0 / 100
+
+COHORT_SORT_COLUMNS = {
+    "gpa": StudentAcademicSummary.gpa,
+    "average_percentage": StudentAcademicSummary.average_percentage,
+}
+
+
+class StudentSummaryService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record_evaluation(self, student_id: UUID, percentage: float) -> None:
+        """
+        Fold one newly evaluated submission into the student's running totals.
+
+        Runs inside the caller's transaction and does not commit. One
+        INSERT ... ON CONFLICT (student_id) DO UPDATE either creates the
+        student's row or adds to it atomically, so concurrent evaluations
+        neither lose writes nor race to create the row.
+        """
+        summary = StudentAcademicSummary
+        now = datetime.datetime.utcnow()
+        stmt = upsert_insert(self.db, summary).values(
+            student_id=student_id,
+            assessment_count=1,
+            percentage_sum=percentage,
+            average_percentage=percentage,
+            gpa=percentage * GPA_PER_PERCENT,
+            last_updated=now
+        )
+        average = (summary.percentage_sum + percentage) / (summary.assessment_count + 1)
+        await self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[summary.student_id],
+            set_={
+                "assessment_count": summary.assessment_count + 1,
+                "percentage_sum": summary.percentage_sum + percentage,
+                "average_percentage": average,
+                "gpa": average * GPA_PER_PERCENT,
+                "last_updated": now
+            }
+        ))
+
+    async def get_cohort(
+        self,
+        sort: str = "gpa",
+        descending: bool = True,
+        limit: int = 20,
+        cursor: Optional[SortCursor] = None,
+        department_id: Optional[UUID] = None,
+        min_gpa: Optional[float] = None,
+        max_gpa: Optional[float] = None,
+        min_percentage: Optional[float] = None,
+        max_percentage: Optional[float] = None
+    ) -> Page:
+        """
+        One page of students with at least one evaluated assessment, ordered
+        by `sort` ("gpa" or "average_percentage") and starting after `cursor`.
+        Reads only the rollup table and the students' names.
+        """
+        summary = StudentAcademicSummary
+        stmt = (
+            select(
+                summary.student_id, User.first_name, User.last_name, User.department_id,
+                summary.assessment_count, summary.average_percentage, summary.gpa, summary.last_updated
+            )
+            .join(User, User.id == summary.student_id)
+        )
+        if department_id is not None:
+            stmt = stmt.where(User.department_id == department_id)
+        if min_gpa is not None:
+            stmt = stmt.where(summary.gpa >= min_gpa)
+        if max_gpa is not None:
+            stmt = stmt.where(summary.gpa <= max_gpa)
+        if min_percentage is not None:
+            stmt = stmt.where(summary.average_percentage >= min_percentage)
+        if max_percentage is not None:
+            stmt = stmt.where(summary.average_percentage <= max_percentage)
+
+        rows = (await self.db.execute(
+            keyset_sort(stmt, COHORT_SORT_COLUMNS[sort], summary.student_id, cursor, limit, descending)
+        )).all()
+        page = Page.from_sorted_rows(rows, limit, sort, id_attr="student_id")
+        return page._replace(items=[_cohort_entry(row) for row in page.items])
+
+
+def summary_rows():
+    """Running totals recomputed from evaluated submissions, one row per student."""
+    percentage = func.coalesce(Submission.percentage, 0.0)
+    return (
+        select(
+            Submission.student_id,
+            func.count(),
+            func.sum(percentage),
+            func.avg(percentage),
+            func.avg(percentage) * GPA_PER_PERCENT,
+            func.now()
+        )
+        .where(Submission.status == SubmissionStatus.EVALUATED)
+        .group_by(Submission.student_id)
+    )
+
+
+def summary_insert() -> Insert:
+    """INSERT ... SELECT of summary_rows."""
+    summary = StudentAcademicSummary
+    return insert(summary).from_select(
+        [
+            summary.student_id, summary.assessment_count, summary.percentage_sum,
+            summary.average_percentage, summary.gpa, summary.last_updated
+        ],
+        summary_rows()
+    )
+
+
+def rebuild_student_summaries(db: Session) -> int:
+    """
+    Replace every rollup with one recomputed from the submissions, in two
+    set-based statements. Commits.
+
+    Returns:
+        Number of students with a rollup
+    """
+    db.execute(delete(StudentAcademicSummary))
+    rebuilt = db.execute(summary_insert()).rowcount
+    db.commit()
+    return rebuilt
+
+
+def _cohort_entry(row: Any) -> Dict[str, Any]:
+    return {
+        "student_id": row.student_id,
+        "name": f"{row.first_name} {row.last_name}",
+        "department_id": row.department_id,
+        "assessment_count": row.assessment_count,
+        "average_percentage": round(row.average_percentage, 2),
+        "gpa": round(row.gpa, 2),
+        "last_updated": row.last_updated
+    }
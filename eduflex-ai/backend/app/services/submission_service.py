@@ -1,39 +1,68 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy import insert, select
 from uuid import UUID
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Union
+import asyncio
 
-from app.models.submission import Submission, Answer, SubmissionStatus
+from app.core.database import BackgroundSessionLocal
+from app.core.ids import uuid7
+from app.core.pagination import Cursor, Page, keyset_paginate
+from app.core.config import settings
+from app.core.jobs import PeriodicScheduler, grading_queue, job_queue
+from app.models.submission import Submission, Answer, Evaluation, EvaluationSource, SubmissionStatus
 from app.models.assignment import Assignment, Question, QuestionType
 from app.schemas.submission import SubmissionCreate
+from app.services.ai_providers import heuristic_evaluation
+from app.services.ai_service import AIService
+from app.services.analytics_service import AnalyticsService
+from app.services.grading_plan import PlannedQuestion, grading_plans, normalize_choice
+from app.services.student_summary_service import StudentSummaryService
+from app.services.user_service import student_report_cache
 
 class SubmissionService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def submit_assignment(self, student_id: UUID, submission_data: SubmissionCreate) -> Submission:
-        # 1. Fetch Assignment to validate and get Key
-        assignment = self.db.query(Assignment).filter(Assignment.id == submission_data.assignment_id).first()
-        if not assignment:
+    async def submit_assignment(
+        self,
+        student_id: UUID,
+        submission_data: SubmissionCreate,
+        defer_descriptive: bool = False
+    ) -> Submission:
+        """
+        Persist a submission and grade it.
+
+        MCQ answers are always graded inline. With defer_descriptive, DESCRIPTIVE
+        answers are stored ungraded and the submission is returned as SUBMITTED;
+        the caller must then schedule_grading() it. Submissions without
+        descriptive answers are fully evaluated either way.
+        """
+        # 1. Compiled grading plan validates the assignment and carries the answer keys
+        plan = await grading_plans.get_plan(self.db, submission_data.assignment_id)
+        if not plan:
             raise ValueError("Assignment not found")
 
         # 2. check if already submitted? (Optional, skip for now or allow re-attempts)
 
-        # 3. Create Submission Record
+        # 3. Build the Submission in memory; it is written once grading is done
         db_submission = Submission(
+            id=uuid7(),
             assignment_id=submission_data.assignment_id,
             student_id=student_id,
             status=SubmissionStatus.SUBMITTED,
-            submitted_at=datetime.utcnow()
+            submitted_at=datetime.utcnow(),
+            max_score=plan.max_marks
         )
-        self.db.add(db_submission)
-        self.db.flush() # Get ID
 
         total_marks = 0
+        graded_answers = []
+        answers = []
+        descriptive = []
 
         # 4. Process Answers
-        # Fetch all questions for map lookup
-        questions_map = {q.id: q for q in assignment.questions}
+        questions_map = plan.questions
 
         for q_id, user_answer in submission_data.answers.items():
             # Ensure q_id is UUID
@@ -46,56 +75,274 @@ class SubmissionService:
 
             marks_awarded = 0
             feedback = ""
+            answer_text = str(user_answer) if user_answer else ""
             
             # AUTO GRADING LOGIC
             if question.type == QuestionType.MCQ:
-                # Assuming correct_answer is stored as JSON: {"answer": "Option A"}
-                correct_val = question.correct_answer.get('answer') if question.correct_answer else None
-                if correct_val and str(user_answer) == str(correct_val):
+                # answer_key is the plan's normalized correct_answer["answer"]
+                if question.answer_key and normalize_choice(user_answer) == question.answer_key:
                     marks_awarded = question.marks
                     feedback = "Correct"
                 else:
-                    feedback = f"Incorrect. Correct answer: {correct_val}"
+                    feedback = f"Incorrect. Correct answer: {question.answer_key}"
 
             elif question.type == QuestionType.DESCRIPTIVE:
-                # INTEGRATE AI EVALUATION
-                from app.services.ai_service import AIService
-                evaluation_result = await AIService.evaluate_answer(
-                    question.question_text, str(user_answer), question.marks
+                # Graded below, concurrently with the other descriptive answers
+                # (or later by the grading workers when deferred)
+                db_answer = Answer(
+                    submission_id=db_submission.id,
+                    question_id=q_id,
+                    answer_text=answer_text
                 )
-                marks_awarded = evaluation_result.get("marks_awarded", 0)
-                feedback = evaluation_result.get("feedback", "")
+                answers.append(db_answer)
+                descriptive.append((db_answer, question))
+                continue
             
             # Create Answer Record
             db_answer = Answer(
                 submission_id=db_submission.id,
                 question_id=q_id,
-                answer_text=str(user_answer) if user_answer else "",
+                answer_text=answer_text,
                 marks_awarded=marks_awarded,
                 feedback=feedback
             )
-            self.db.add(db_answer)
+            answers.append(db_answer)
             total_marks += marks_awarded
+            graded_answers.append((q_id, marks_awarded, question.marks))
 
-        # 5. Create final Evaluation Summary
-        from app.models.submission import Evaluation, EvaluationSource
-        db_eval = Evaluation(
+        if descriptive and defer_descriptive:
+            await self._insert_submission(db_submission, answers)
+            await self.db.commit()
+            return db_submission
+
+        # INTEGRATE AI EVALUATION
+        await self._evaluate_descriptive(descriptive)
+        for db_answer, question in descriptive:
+            total_marks += db_answer.marks_awarded
+            graded_answers.append((question.id, db_answer.marks_awarded, question.marks))
+
+        # 5. Write the submission, its answers and the Evaluation Summary
+        db_submission.status = SubmissionStatus.EVALUATED
+        _record_score(db_submission, total_marks)
+        await self._insert_submission(db_submission, answers)
+        await self.db.execute(insert(Evaluation).values(
             submission_id=db_submission.id,
             evaluated_by=EvaluationSource.AI,
             total_marks=total_marks,
             overall_feedback="Automatic evaluation completed."
+        ))
+        await AnalyticsService(self.db).record_evaluation(db_submission.assignment_id, total_marks, graded_answers)
+        await StudentSummaryService(self.db).record_evaluation(student_id, db_submission.percentage)
+        student_report_cache.invalidate_on_commit(self.db, student_id)
+
+        await self.db.commit()
+        return db_submission
+
+    async def _insert_submission(self, submission: Submission, answers: List[Answer]) -> None:
+        """
+        Write a new submission and all of its answers with one multi-row
+        INSERT ... RETURNING. The objects stay outside the session and are
+        returned as-is, so no refresh is needed. Does not commit.
+        """
+        await self.db.execute(insert(Submission).values(
+            id=submission.id,
+            assignment_id=submission.assignment_id,
+            student_id=submission.student_id,
+            status=submission.status,
+            submitted_at=submission.submitted_at,
+            total_score=submission.total_score,
+            max_score=submission.max_score,
+            percentage=submission.percentage
+        ))
+        if answers:
+            answer_ids = (await self.db.execute(
+                insert(Answer).returning(Answer.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "submission_id": submission.id,
+                        "question_id": answer.question_id,
+                        "answer_text": answer.answer_text,
+                        "marks_awarded": answer.marks_awarded,
+                        "feedback": answer.feedback
+                    }
+                    for answer in answers
+                ]
+            )).scalars().all()
+            for answer, answer_id in zip(answers, answer_ids):
+                answer.id = answer_id
+        submission.answers = answers
+
+    async def grade_pending_answers(self, submission_id: UUID) -> None:
+        """
+        Evaluate the deferred DESCRIPTIVE answers of a SUBMITTED submission
+        concurrently, then write its Evaluation and mark it EVALUATED.
+
+        The submission row stays locked (FOR UPDATE SKIP LOCKED) until the
+        evaluation commits, so concurrent runs for the same submission, e.g.
+        from two workers' recovery sweeps, return at once instead of calling
+        the model twice. Already evaluated submissions are skipped. If
+        grading fails the transaction rolls back and the row is unlocked,
+        still SUBMITTED, for the job's retry or the next recovery sweep.
+        """
+        submission = (await self.db.execute(
+            select(Submission)
+            .where(
+                Submission.id == submission_id,
+                Submission.status == SubmissionStatus.SUBMITTED
+            )
+            .with_for_update(skip_locked=True)
+        )).scalars().first()
+        if not submission:
+            return
+
+        rows = (await self.db.execute(
+            select(Answer, Question)
+            .join(Question, Question.id == Answer.question_id)
+            .where(Answer.submission_id == submission_id)
+        )).all()
+
+        await self._evaluate_descriptive(
+            [(answer, question) for answer, question in rows if answer.marks_awarded is None]
+        )
+
+        total_marks = sum(answer.marks_awarded for answer, _ in rows)
+        graded_answers = [(question.id, answer.marks_awarded, question.marks) for answer, question in rows]
+        await self._finalize_evaluation(submission, total_marks, graded_answers)
+        await self.db.commit()
+
+    async def _evaluate_descriptive(self, pending: List[Tuple[Answer, Union[Question, PlannedQuestion]]]) -> None:
+        """
+        Grade descriptive answers concurrently so they can share provider
+        batches. An answer the provider fails to grade is graded with the
+        heuristic instead, so one bad item never fails the submission.
+        """
+        results = await asyncio.gather(*[
+            AIService.evaluate_answer(question.question_text, answer.answer_text, question.marks, question.id)
+            for answer, question in pending
+        ], return_exceptions=True)
+        for (answer, question), result in zip(pending, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                print(f"AI evaluation of answer to {question.id} failed, grading with heuristic: {result}")
+                result = heuristic_evaluation(answer.answer_text or "", question.marks)
+            answer.marks_awarded = result.get("marks_awarded", 0)
+            answer.feedback = result.get("feedback", "")
+
+    async def _finalize_evaluation(
+        self,
+        submission: Submission,
+        total_marks: int,
+        graded_answers: List[Tuple[UUID, int, int]]
+    ) -> None:
+        """
+        Write the Evaluation, mark the submission EVALUATED with its score,
+        update analytics and the student's rollup and drop their cached
+        report. Does not commit.
+        """
+        db_eval = Evaluation(
+            submission_id=submission.id,
+            evaluated_by=EvaluationSource.AI,
+            total_marks=total_marks,
+            overall_feedback="Automatic evaluation completed."
         )
         self.db.add(db_eval)
-        db_submission.status = SubmissionStatus.EVALUATED
+        submission.status = SubmissionStatus.EVALUATED
+        if submission.max_score is None:
+            # Submitted before scores were stored on submissions
+            submission.max_score = (await self.db.execute(
+                select(Assignment.max_marks).where(Assignment.id == submission.assignment_id)
+            )).scalar()
+        _record_score(submission, total_marks)
 
-        # Is there a field for total_score on Submission? Not explicitly in my previous model, 
-        # but let's assume we can calculate it or store it if we added a column. 
-        # The 'Evaluation' table is meant for the final score, but for auto-grades we can populate it?
-        # For now, let's just save the answers. 
-        
-        self.db.commit()
-        self.db.refresh(db_submission)
-        return db_submission
+        # Fold the evaluation into the assignment's running analytics and
+        # the student's rollup in the same transaction.
+        await self.db.flush()
+        await AnalyticsService(self.db).record_evaluation(submission.assignment_id, total_marks, graded_answers)
+        await StudentSummaryService(self.db).record_evaluation(submission.student_id, submission.percentage)
+        student_report_cache.invalidate_on_commit(self.db, submission.student_id)
+
+    async def get_student_submissions(
+        self, student_id: UUID, limit: int = 20, cursor: Optional[Cursor] = None, with_answers: bool = True
+    ) -> Page:
+        """
+        One page of a student's submissions, newest first, starting after
+        `cursor`. Answers are loaded for the whole page in one extra query,
+        or not at all (and any access to them raises) when with_answers is False.
+        """
+        loader = selectinload(Submission.answers) if with_answers else raiseload(Submission.answers)
+        result = await self.db.execute(keyset_paginate(
+            select(Submission)
+            .options(loader)
+            .where(Submission.student_id == student_id),
+            Submission, cursor, limit
+        ))
+        return Page.from_rows(result.scalars().all(), limit)
+
+
+def _record_score(submission: Submission, total_marks: int) -> None:
+    """Store a grading result in the submission's score columns (max_score must be set)."""
+    submission.total_score = total_marks
+    submission.percentage = round(total_marks * 100 / submission.max_score, 2) if submission.max_score else 0.0
+
+
+GRADE_SUBMISSION_JOB = "grading.submission"
+
+
+async def run_grading(submission_id: str) -> None:
+    """Job handler: grade a deferred submission in a dedicated session."""
+    async with BackgroundSessionLocal() as db:
+        await SubmissionService(db).grade_pending_answers(UUID(submission_id))
+
+
+grading_queue.register(GRADE_SUBMISSION_JOB, run_grading)
+
+
+def schedule_grading(submission_id: UUID) -> str:
+    """Queue a SUBMITTED submission for evaluation by the grading workers."""
+    return grading_queue.enqueue(GRADE_SUBMISSION_JOB, str(submission_id), delay=0)
+
+
+async def schedule_pending_grading() -> int:
+    """
+    Re-queue every submission still awaiting evaluation, e.g. after a restart.
+
+    Submissions a worker is grading right now are locked and skipped.
+
+    Returns:
+        Number of submissions queued
+    """
+    async with BackgroundSessionLocal() as db:
+        submission_ids = (await db.execute(
+            select(Submission.id)
+            .where(Submission.status == SubmissionStatus.SUBMITTED)
+            .with_for_update(skip_locked=True)
+        )).scalars().all()
+    for submission_id in submission_ids:
+        schedule_grading(submission_id)
+    return len(submission_ids)
+
+
+GRADING_RECOVERY_JOB = "grading.recover"
+GRADING_RECOVERY_LEASE = "grading.recover"
+
+
+async def run_grading_recovery(key: str) -> int:
+    """
+    Job handler: run schedule_pending_grading, at most once per
+    GRADING_RECOVERY_INTERVAL_SECONDS across the workers sharing the job
+    backend. Each sweep takes a lease under its own owner id and never
+    releases it; it expires shortly before the next sweep is due.
+    """
+    lease_seconds = settings.GRADING_RECOVERY_INTERVAL_SECONDS * 0.9
+    if not job_queue.backend.acquire(GRADING_RECOVERY_LEASE, uuid7().hex, lease_seconds):
+        return 0
+    return await schedule_pending_grading()
+
+
+job_queue.register(GRADING_RECOVERY_JOB, run_grading_recovery)
 
-    def get_student_submissions(self, student_id: UUID):
-        return self.db.query(Submission).filter(Submission.student_id == student_id).all()
+# Started with the app when ASYNC_GRADING is on; the first sweep runs at startup
+grading_recovery_scheduler = PeriodicScheduler(
+    job_queue, GRADING_RECOVERY_JOB, "pending", settings.GRADING_RECOVERY_INTERVAL_SECONDS
+)
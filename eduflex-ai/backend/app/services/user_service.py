@@ -1,26 +1,47 @@
-from typing import Optional, List
-from sqlalchemy.orm import Session
+from typing import Optional, List, Union
+from uuid import UUID
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from app.models.user import User
+from app.models.user import User, UserRole
 from app.schemas.user import UserCreate
-from app.core.security import get_password_hash, verify_password
+from app.core.config import settings
+from app.core.pagination import Cursor, Page, keyset_paginate
+from app.core.security import password_hasher
+from app.core.two_tier_cache import TwoTierCache
+
+# Report cards served by GET /users/{id}/report; grading invalidates a
+# student's report when their evaluation commits
+student_report_cache = TwoTierCache(
+    "student_report",
+    local_maxsize=settings.STUDENT_REPORT_CACHE_LOCAL_SIZE,
+    local_ttl=settings.STUDENT_REPORT_CACHE_LOCAL_TTL_SECONDS,
+    redis_ttl=settings.STUDENT_REPORT_CACHE_TTL_SECONDS,
+    use_redis=settings.STUDENT_REPORT_CACHE_REDIS
+)
 
 
 class UserService:
     """Service for user management operations."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email address."""
-        return self.db.query(User).filter(User.email == email).first()
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
     
-    def get_by_id(self, user_id: str) -> Optional[User]:
+    async def get_by_id(self, user_id: Union[str, UUID]) -> Optional[User]:
         """Get user by ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        try:
+            user_id = UUID(str(user_id))
+        except ValueError:
+            return None
+        result = await self.db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
     
-    def create_user(self, user_data: UserCreate) -> User:
+    async def create_user(self, user_data: UserCreate) -> User:
         """
         Create a new user.
         
@@ -34,7 +55,7 @@ class UserService:
             HTTPException: If email already exists
         """
         # Check if user already exists
-        existing_user = self.get_by_email(user_data.email)
+        existing_user = await self.get_by_email(user_data.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -44,7 +65,7 @@ class UserService:
         # Create new user
         db_user = User(
             email=user_data.email,
-            password_hash=get_password_hash(user_data.password),
+            password_hash=await password_hasher.hash(user_data.password),
             role=user_data.role,
             first_name=user_data.first_name,
             last_name=user_data.last_name,
@@ -53,12 +74,12 @@ class UserService:
         )
         
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
         
         return db_user
     
-    def authenticate(self, email: str, password: str) -> Optional[User]:
+    async def authenticate(self, email: str, password: str) -> Optional[User]:
         """
         Authenticate user credentials.
         
@@ -69,71 +90,92 @@ class UserService:
         Returns:
             User instance if authenticated, None otherwise
         """
-        user = self.get_by_email(email)
+        user = await self.get_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.password_hash):
+        if not await password_hasher.verify(password, user.password_hash):
             return None
         if not user.is_active:
             return None
         return user
 
-    def get_users_by_role(self, role: str) -> List[User]:
+    async def get_users_by_role(self, role: str, limit: int = 20, cursor: Optional[Cursor] = None) -> Page:
         """
-        Get all users with a specific role.
+        Get one page of users with a specific role, newest first.
         """
-        return self.db.query(User).filter(User.role == role).all()
+        result = await self.db.execute(
+            keyset_paginate(select(User).where(User.role == role), User, cursor, limit)
+        )
+        return Page.from_rows(result.scalars().all(), limit)
 
-    def get_student_academic_report(self, user_id: str) -> dict:
+    async def get_student_academic_report(self, user_id: Union[str, UUID]) -> Optional[dict]:
         """
-        Calculates real academic metrics for a student.
+        Report card of a student: every evaluated assessment, the average
+        percentage and a 4.0-scale GPA. Cached per student until their next
+        evaluation commits.
+
+        Returns:
+            The report, or None if the user does not exist
+
+        Raises:
+            HTTPException: If the user is not a student
         """
+        try:
+            user_id = UUID(str(user_id))
+        except ValueError:
+            return None
+        return await student_report_cache.get_or_load(
+            user_id, lambda session: UserService(session)._build_academic_report(user_id), self.db
+        )
+
+    async def _build_academic_report(self, user_id: UUID) -> Optional[dict]:
         from app.models.submission import Submission, Evaluation, SubmissionStatus
         from app.models.assignment import Assignment
-        from sqlalchemy import func
 
-        student = self.get_by_id(user_id)
-        if not student:
-            return None
-
-        # Fetch all evaluated submissions
-        submissions = (
-            self.db.query(Submission)
-            .join(Evaluation)
-            .filter(
-                Submission.student_id == student.id,
+        # One row per evaluated submission (or a single row with NULL
+        # submission columns when there is none), reading only the columns
+        # the report shows; scores come from the submission itself.
+        rows = (await self.db.execute(
+            select(
+                User.id, User.role, User.first_name, User.last_name,
+                Submission.total_score, Submission.max_score, Submission.percentage, Submission.submitted_at,
+                Assignment.title, Assignment.description, Evaluation.overall_feedback
+            )
+            .select_from(User)
+            .outerjoin(Submission, and_(
+                Submission.student_id == User.id,
                 Submission.status == SubmissionStatus.EVALUATED
+            ))
+            .outerjoin(Assignment, Assignment.id == Submission.assignment_id)
+            .outerjoin(Evaluation, Evaluation.submission_id == Submission.id)
+            .where(User.id == user_id)
+            .order_by(Submission.submitted_at)
+        )).all()
+        if not rows:
+            return None
+        student = rows[0]
+        if student.role != UserRole.STUDENT:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User is not a student"
             )
-            .all()
-        )
 
-        assessments = []
-        total_percentage = 0
-        count = 0
+        graded = [row for row in rows if row.title is not None]
+        assessments = [
+            {
+                "name": row.title,
+                "description": row.description,
+                "score": row.total_score,
+                "total": row.max_score,
+                "percentage": round(row.percentage or 0.0, 2),
+                "feedback": row.overall_feedback,
+                "date": row.submitted_at.isoformat() if row.submitted_at else None
+            }
+            for row in graded
+        ]
+        count = len(graded)
+        avg_score = sum(row.percentage or 0.0 for row in graded) / count if count > 0 else 0
 
-        for sub in submissions:
-            assignment = sub.assignment
-            evaluation = sub.evaluation
-            
-            if not assignment or not evaluation:
-                continue
-
-            percentage = (evaluation.total_marks / assignment.max_marks) * 100 if assignment.max_marks > 0 else 0
-            total_percentage += percentage
-            count += 1
-
-            assessments.append({
-                "name": assignment.title,
-                "description": assignment.description,
-                "score": evaluation.total_marks,
-                "total": assignment.max_marks,
-                "percentage": round(percentage, 2),
-                "feedback": evaluation.overall_feedback,
-                "date": sub.submitted_at.isoformat() if sub.submitted_at else None
-            })
-
-        avg_score = total_percentage / count if count > 0 else 0
-        
         # Simple GPA calculation (4.0 scale)
         gpa = round((avg_score / 100) * 4.0, 2)
 
@@ -0,0 +1,71 @@
+"""
+Descriptive evaluation micro-batching benchmark (offline).
+
+Simulates N students answering the same descriptive question at once
+against a FakeProvider with fixed per-call overhead and a concurrency
+limit (standing in for the API rate limit), and compares one call
+per answer with the batching front end at several batch sizes / linger
+times. Reports wall time, throughput, p50/p99 caller latency and the
+number of provider calls.
+"""
+import asyncio
+import time
+import uuid
+
+import benchmarks.common  # noqa: F401 (sets default env)
+from app.services.ai_batcher import EvaluationBatcher
+from app.services.ai_providers import FakeProvider
+
+STUDENTS = 300
+CALL_LATENCY = 0.2
+ITEM_LATENCY = 0.002
+PROVIDER_CONCURRENCY = 8
+CONFIGS = [(1, 0), (8, 10), (32, 20), (64, 50)]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+async def run_config(max_batch_size: int, max_wait_ms: float):
+    provider = FakeProvider(
+        call_latency=CALL_LATENCY, item_latency=ITEM_LATENCY, error_rate=0.01,
+        max_concurrency=PROVIDER_CONCURRENCY, seed=1
+    )
+    batcher = EvaluationBatcher(lambda: provider, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    question_id = uuid.uuid4()
+    latencies, failures = [], 0
+
+    async def student(i: int):
+        nonlocal failures
+        start = time.perf_counter()
+        try:
+            await batcher.evaluate(question_id, "Explain deadlock.", f"answer number {i} " * (i % 30), 10)
+        except Exception:
+            failures += 1
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[student(i) for i in range(STUDENTS)])
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"batch={max_batch_size:>3} linger={max_wait_ms:>4}ms | "
+        f"wall {elapsed:6.2f}s | {STUDENTS / elapsed:7.1f} answers/s | "
+        f"p50 {percentile(latencies, 0.5) * 1000:6.0f}ms p99 {percentile(latencies, 0.99) * 1000:6.0f}ms | "
+        f"provider calls {provider.calls:>3} | failed items {failures}"
+    )
+
+
+def run_benchmark():
+    print(
+        f"--- Evaluation batching: {STUDENTS} answers, {CALL_LATENCY * 1000:.0f}ms per call, "
+        f"{PROVIDER_CONCURRENCY} concurrent calls ---"
+    )
+    for max_batch_size, max_wait_ms in CONFIGS:
+        asyncio.run(run_config(max_batch_size, max_wait_ms))
+
+
+if __name__ == "__main__":
+    run_benchmark()
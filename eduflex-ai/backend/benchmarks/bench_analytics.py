@@ -0,0 +1,73 @@
+"""
+Analytics aggregation benchmark.
+
+Seeds assignments of growing size and checks that
+AnalyticsService.generate_assignment_analytics issues the same number of
+SQL statements regardless of submission count, and that the aggregated
+numbers match a straightforward Python recomputation.
+"""
+import asyncio
+from collections import defaultdict
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, StatementCounter, reset_schema, seed_assignment, timed
+from app.services.analytics_service import AnalyticsService
+
+QUESTIONS = 40
+SIZES = [50, 200, 600]
+
+
+def expected_metrics(question_rows, answer_rows):
+    totals = defaultdict(int)
+    per_question = defaultdict(list)
+    for a in answer_rows:
+        totals[a["submission_id"]] += a["marks_awarded"]
+        per_question[a["question_id"]].append(a["marks_awarded"])
+
+    scores = list(totals.values())
+    questions = {}
+    for q in question_rows:
+        marks = per_question[q["id"]]
+        questions[str(q["id"])] = (
+            sum(1 for m in marks if m == q["marks"]) / len(marks),
+            sum(marks) / len(marks)
+        )
+    return sum(scores) / len(scores), max(scores), min(scores), questions
+
+
+async def generate(assignment_id):
+    async with AsyncSessionLocal() as db:
+        return await AnalyticsService(db).generate_assignment_analytics(assignment_id)
+
+
+def run_benchmark():
+    print("--- Analytics aggregation benchmark ---")
+    statement_counts = []
+
+    for students in SIZES:
+        reset_schema()
+        db = SessionLocal()
+        assignment_id, question_rows, answer_rows = seed_assignment(db, students, QUESTIONS)
+        db.close()
+
+        with StatementCounter() as counter, timed(f"{students} submissions x {QUESTIONS} questions"):
+            result = asyncio.run(generate(assignment_id))
+        print(f"  statements: {counter.count}")
+        statement_counts.append(counter.count)
+
+        avg, high, low, questions = expected_metrics(question_rows, answer_rows)
+        metrics = result["metrics"]
+        assert metrics["students"] == students
+        assert metrics["average_score"] == round(avg, 2)
+        scores = [s["score"] for s in metrics["student_scores"]]
+        assert max(scores) == high and min(scores) == low
+        for q in metrics["questions"]:
+            correct_rate, avg_marks = questions[q["question_id"]]
+            assert abs(q["correct_rate"] - correct_rate) < 1e-9
+            assert abs(q["avg_marks"] - avg_marks) < 1e-9
+
+    assert len(set(statement_counts)) == 1, f"Statement count grew with submissions: {statement_counts}"
+    print("\nStatement count is constant across sizes.")
+
+
+if __name__ == "__main__":
+    run_benchmark()
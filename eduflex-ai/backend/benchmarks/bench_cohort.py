@@ -0,0 +1,103 @@
+"""
+Cohort ranking: per-student reports vs the student_academic_summary rollup.
+
+Seeds STUDENTS students with ASSESSMENTS evaluated submissions each and
+ranks them by GPA:
+- "reports": get_student_academic_report for every student, sorted in Python
+  (what a cohort view had to do before the rollup)
+- "cohort page": one page of StudentSummaryService.get_cohort
+- "rebuild": rebuild_student_summaries, the set-based repair command
+The first page of both rankings must agree.
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, reset_schema
+from app.models.assignment import Assignment
+from app.models.submission import Evaluation, EvaluationSource, Submission, SubmissionStatus
+from app.models.user import User, UserRole
+from app.services.student_summary_service import StudentSummaryService, rebuild_student_summaries
+from app.services.user_service import UserService, student_report_cache
+
+STUDENTS = 2000
+ASSESSMENTS = 10
+PAGE = 20
+
+
+def seed():
+    faculty_id = uuid.uuid4()
+    start = datetime(2025, 1, 1)
+    users = [{"id": faculty_id, "email": "faculty@bench.local", "password_hash": "x",
+              "role": UserRole.FACULTY, "first_name": "Bench"}]
+    assignments = [
+        {"id": uuid.uuid4(), "title": f"Assessment {i}", "subject": "Bench", "faculty_id": faculty_id, "max_marks": 50}
+        for i in range(ASSESSMENTS)
+    ]
+    submissions, evaluations = [], []
+    for s in range(STUDENTS):
+        student_id = uuid.uuid4()
+        users.append({"id": student_id, "email": f"student_{s}@bench.local", "password_hash": "x",
+                      "role": UserRole.STUDENT, "first_name": "Student", "last_name": str(s)})
+        for i, assignment in enumerate(assignments):
+            submission_id = uuid.uuid4()
+            score = (s * 31 + i * 7) % 51
+            submissions.append({
+                "id": submission_id, "assignment_id": assignment["id"], "student_id": student_id,
+                "status": SubmissionStatus.EVALUATED, "submitted_at": start + timedelta(days=i),
+                "total_score": score, "max_score": 50, "percentage": round(score * 100 / 50, 2)
+            })
+            evaluations.append({
+                "id": uuid.uuid4(), "submission_id": submission_id, "evaluated_by": EvaluationSource.AI,
+                "total_marks": score
+            })
+    with SessionLocal() as db:
+        db.execute(insert(User), users)
+        db.execute(insert(Assignment), assignments)
+        db.execute(insert(Submission), submissions)
+        db.execute(insert(Evaluation), evaluations)
+        db.commit()
+
+
+async def rank_by_reports():
+    async with AsyncSessionLocal() as db:
+        student_ids = (await db.execute(select(User.id).where(User.role == UserRole.STUDENT))).scalars().all()
+        reports = [await UserService(db).get_student_academic_report(s) for s in student_ids]
+    reports.sort(key=lambda r: (r["gpa"], r["student_id"]), reverse=True)
+    return [r["gpa"] for r in reports[:PAGE]]
+
+
+async def rank_by_cohort():
+    async with AsyncSessionLocal() as db:
+        page = await StudentSummaryService(db).get_cohort("gpa", True, PAGE)
+    return [entry["gpa"] for entry in page.items]
+
+
+async def main():
+    reset_schema()
+    student_report_cache.use_redis = False
+    print(f"--- {STUDENTS} students x {ASSESSMENTS} assessments ---")
+    seed()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        rebuilt = rebuild_student_summaries(db)
+    print(f"rebuild:      {(time.perf_counter() - started) * 1000:8.1f} ms ({rebuilt} rollups)")
+
+    student_report_cache.local.clear()
+    started = time.perf_counter()
+    by_reports = await rank_by_reports()
+    print(f"reports:      {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    started = time.perf_counter()
+    by_cohort = await rank_by_cohort()
+    print(f"cohort page:  {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    assert by_reports == by_cohort, (by_reports, by_cohort)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
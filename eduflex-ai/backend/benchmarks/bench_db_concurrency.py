@@ -0,0 +1,90 @@
+"""
+Sync vs async database path under concurrent load.
+
+Each simulated client performs REQUESTS_PER_CLIENT requests that look up
+the calling user and load an assignment with its questions (the
+authentication + read path every endpoint shares):
+
+  sync   SessionLocal queries run through Starlette's threadpool, as a plain
+         `def` endpoint would (40 worker threads by default)
+  async  UserService / AssignmentService on AsyncSession, awaited directly
+         on the event loop
+
+Reports throughput and p50/p99 request latency at 50, 200 and 1000
+concurrent clients. SQLite has no network round trip to overlap, so run
+against Postgres (DATABASE_URL=postgresql://...) for representative numbers.
+"""
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, reset_schema, seed_assignment
+from app.models.assignment import Assignment
+from app.models.user import User
+from app.services.assignment_service import AssignmentService
+from app.services.user_service import UserService
+
+CLIENTS = [50, 200, 1000]
+REQUESTS_PER_CLIENT = 5
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+def sync_request(user_id, assignment_id):
+    db = SessionLocal()
+    try:
+        db.execute(select(User).where(User.id == user_id)).scalars().first()
+        assignment = db.execute(
+            select(Assignment).options(selectinload(Assignment.questions)).where(Assignment.id == assignment_id)
+        ).scalars().first()
+        return len(assignment.questions)
+    finally:
+        db.close()
+
+
+async def async_request(user_id, assignment_id):
+    async with AsyncSessionLocal() as db:
+        await UserService(db).get_by_id(user_id)
+        assignment = await AssignmentService(db).get_assignment(assignment_id)
+        return len(assignment.questions)
+
+
+async def run(label, request, clients, user_id, assignment_id):
+    latencies = []
+
+    async def client():
+        for _ in range(REQUESTS_PER_CLIENT):
+            started = time.perf_counter()
+            await request(user_id, assignment_id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(clients)])
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<6} {clients:>5} clients  {len(latencies) / elapsed:>8.0f} req/s  "
+        f"p50 {percentile(latencies, 0.5) * 1000:>7.1f} ms  p99 {percentile(latencies, 0.99) * 1000:>7.1f} ms"
+    )
+
+
+async def main():
+    reset_schema()
+    db = SessionLocal()
+    assignment_id, _, _ = seed_assignment(db, 0, 20)
+    user_id = db.execute(select(User.id)).scalar()
+    db.close()
+
+    print(f"--- DB concurrency: {REQUESTS_PER_CLIENT} requests per client ---")
+    for clients in CLIENTS:
+        await run("sync", lambda u, a: run_in_threadpool(sync_request, u, a), clients, user_id, assignment_id)
+        await run("async", async_request, clients, user_id, assignment_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+OFFSET vs keyset pagination of the assignment list on a large table.
+
+Seeds ROWS assignments, then times fetching one page at increasing depths:
+OFFSET/LIMIT (what list_assignments used to run) against the cursor query
+AssignmentService.get_assignments runs now. OFFSET latency grows with the
+depth of the page; keyset latency stays flat because it seeks straight to
+the cursor in ix_assignments_created_at_id.
+"""
+import asyncio
+import datetime
+import statistics
+import time
+import uuid
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, reset_schema
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.assignment import Assignment
+from app.models.user import User, UserRole
+from app.services.assignment_service import AssignmentService
+
+ROWS = 1_000_000
+BATCH = 50_000
+PAGE = 20
+DEPTHS = [0, 1_000, 10_000, 100_000, 500_000, ROWS - PAGE]
+REPEATS = 5
+
+
+def seed():
+    reset_schema()
+    faculty_id = uuid.uuid4()
+    start = datetime.datetime(2025, 1, 1)
+    with SessionLocal() as db:
+        db.execute(insert(User), [{
+            "id": faculty_id, "email": "faculty@bench.local", "password_hash": "x",
+            "role": UserRole.FACULTY, "first_name": "Bench"
+        }])
+        for offset in range(0, ROWS, BATCH):
+            db.execute(insert(Assignment), [
+                {
+                    "id": uuid.uuid4(), "title": f"Assignment {i}", "subject": "Bench",
+                    "faculty_id": faculty_id, "max_marks": 10,
+                    "created_at": start + datetime.timedelta(seconds=i)
+                }
+                for i in range(offset, min(offset + BATCH, ROWS))
+            ])
+        db.commit()
+
+
+async def timed_ms(make_query):
+    samples = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        await make_query()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    started = time.perf_counter()
+    seed()
+    print(f"--- {ROWS:,} assignments seeded in {time.perf_counter() - started:.1f} s, page size {PAGE} ---")
+
+    ordered = select(Assignment).options(selectinload(Assignment.questions)).order_by(
+        Assignment.created_at.desc(), Assignment.id.desc()
+    )
+    async with AsyncSessionLocal() as db:
+        service = AssignmentService(db)
+        for depth in DEPTHS:
+            async def offset_page():
+                return (await db.execute(ordered.offset(depth).limit(PAGE))).scalars().all()
+
+            # The cursor a client holds after paging down to `depth`
+            cursor = None
+            if depth:
+                anchor = (await db.execute(ordered.offset(depth - 1).limit(1))).scalars().one()
+                cursor = decode_cursor(encode_cursor(anchor.created_at, anchor.id))
+
+            async def keyset_page():
+                return (await service.get_assignments(PAGE, cursor)).items
+
+            assert [a.id for a in await offset_page()] == [a.id for a in await keyset_page()]
+            offset_ms = await timed_ms(offset_page)
+            keyset_ms = await timed_ms(keyset_page)
+            print(f"row {depth:>9,}   offset {offset_ms:8.2f} ms   keyset {keyset_ms:6.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
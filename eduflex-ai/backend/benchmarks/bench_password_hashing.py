@@ -0,0 +1,84 @@
+"""
+Login throughput of the password hashing pool.
+
+Fires a burst of concurrent password verifications (the CPU-bound part of
+a login) through PasswordHashPool at several pool sizes and reports
+logins/s and p50/p99 latency, next to the old asyncio.to_thread path.
+A final phase uses a tiny queue limit to show the burst being shed with
+503s instead of queueing.
+
+Pool sizes above the machine's core count do not add throughput.
+"""
+import asyncio
+import os
+import time
+
+import benchmarks.common  # noqa: F401 (sets default env)
+from fastapi import HTTPException
+
+from app.core.security import PasswordHashPool, get_password_hash, verify_password
+
+LOGINS = 64
+POOL_SIZES = [1, 2, 4]
+PASSWORD = "correct horse battery staple"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+async def burst(verify, hashed: str):
+    latencies = []
+    rejected = 0
+
+    async def one():
+        nonlocal rejected
+        started = time.perf_counter()
+        try:
+            assert await verify(PASSWORD, hashed)
+        except HTTPException as e:
+            assert e.status_code == 503
+            rejected += 1
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(LOGINS)])
+    return time.perf_counter() - started, latencies, rejected
+
+
+def report(label: str, wall: float, latencies, rejected: int = 0):
+    print(
+        f"{label:<22} {len(latencies) / wall:7.1f} logins/s  "
+        f"p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  "
+        f"p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  "
+        f"rejected {rejected}"
+    )
+
+
+async def main():
+    hashed = get_password_hash(PASSWORD)
+    print(f"{LOGINS} concurrent logins, {os.cpu_count()} CPUs")
+
+    async def threaded(password, hashed_password):
+        return await asyncio.to_thread(verify_password, password, hashed_password)
+
+    report("to_thread (baseline)", *(await burst(threaded, hashed))[:2])
+
+    for workers in POOL_SIZES:
+        pool = PasswordHashPool(workers=workers, queue_limit=LOGINS)
+        pool.start()
+        await pool.verify(PASSWORD, hashed)  # warm the workers up
+        report(f"pool workers={workers}", *(await burst(pool.verify, hashed)))
+        pool.shutdown()
+
+    pool = PasswordHashPool(workers=2, queue_limit=8)
+    pool.start()
+    await pool.verify(PASSWORD, hashed)
+    report("pool workers=2 queue=8", *(await burst(pool.verify, hashed)))
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""
+Load test of the pooled HTTP provider client against the mock provider.
+
+Starts benchmarks.mock_provider in-process, then fires concurrent
+single-answer calls through HTTPProvider in three phases: a healthy
+provider, a flaky one (retries absorb the errors) and a failing one (the
+circuit opens and answers fall back to the heuristic without waiting).
+Reports wall time, p50/p99 latency, calls made and fallbacks per phase.
+"""
+import asyncio
+import socket
+import threading
+import time
+
+import benchmarks.common  # noqa: F401 (sets default env)
+from benchmarks.mock_provider import create_app
+from app.services.ai_client import CircuitBreaker, HTTPProvider
+
+REQUESTS = 400
+MAX_CONCURRENCY = 16
+PHASES = [
+    ("healthy", dict(latency=0.05, jitter=0.02)),
+    ("flaky (20% 503)", dict(latency=0.05, jitter=0.02, error_rate=0.2, seed=3)),
+    ("down (100% 503)", dict(latency=0.05, error_rate=1.0)),
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+def start_server(app) -> int:
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return port
+
+
+async def run_phase(name: str, options: dict):
+    mock = create_app(**options)
+    port = start_server(mock)
+    provider = HTTPProvider(
+        f"http://127.0.0.1:{port}",
+        max_concurrency=MAX_CONCURRENCY,
+        timeout_seconds=2.0,
+        max_retries=2,
+        backoff_seconds=0.05,
+        breaker=CircuitBreaker(failure_threshold=5, reset_seconds=60)
+    )
+    latencies = []
+
+    async def one(i: int):
+        started = time.perf_counter()
+        await provider.evaluate_batch("Explain deadlock.", [f"answer {i} " * (i % 30)], 10)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(REQUESTS)])
+    elapsed = time.perf_counter() - started
+    stats = provider.stats()
+    print(
+        f"{name:<18} {elapsed:>7.2f}s {percentile(latencies, 0.5) * 1000:>8.0f}ms "
+        f"{percentile(latencies, 0.99) * 1000:>8.0f}ms {mock.state.calls:>6} {stats['retries']:>7} "
+        f"{stats['fallbacks']:>9}  {stats['circuit']}"
+    )
+
+
+async def main():
+    print(f"{REQUESTS} requests, client concurrency limit {MAX_CONCURRENCY}")
+    print(f"{'phase':<18} {'wall':>8} {'p50':>10} {'p99':>10} {'calls':>6} {'retries':>7} {'fallbacks':>9}  circuit")
+    for name, options in PHASES:
+        await run_phase(name, options)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
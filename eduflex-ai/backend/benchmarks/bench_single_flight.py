@@ -0,0 +1,58 @@
+"""
+Exam-start stampede on GET /assignments/{id}, with and without single-flight.
+
+Every burst starts from a cold assignment cache (as when a quiz opens or its
+entry was just invalidated) and has N concurrent readers, each with its
+own session, read the student or staff payload. Reports database queries
+per burst and per second for increasing N. With single-flight the queries
+stay at one load per burst however many readers pile up; without it every
+reader that misses runs its own load.
+"""
+import asyncio
+import time
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, StatementCounter, reset_schema, seed_assignment
+from app.services.assignment_cache import assignment_cache
+from app.services.assignment_service import AssignmentService
+
+READERS = [1, 10, 50, 200, 500]
+BURSTS = 5
+QUESTIONS = 20
+
+
+async def read(assignment_id, for_student: bool):
+    async with AsyncSessionLocal() as db:
+        payload = await AssignmentService(db).get_assignment_payload(assignment_id, for_student=for_student)
+    assert payload is not None
+
+
+async def run(assignment_id, readers: int, coalesce: bool):
+    assignment_cache.cache.flights.enabled = coalesce
+    elapsed = 0.0
+    with StatementCounter() as counter:
+        for _ in range(BURSTS):
+            assignment_cache.invalidate(assignment_id)
+            started = time.perf_counter()
+            await asyncio.gather(*[read(assignment_id, i % 2 == 0) for i in range(readers)])
+            elapsed += time.perf_counter() - started
+    print(
+        f"{'single-flight' if coalesce else 'uncoalesced':<14} {readers:4d} readers  "
+        f"{counter.count / BURSTS:7.1f} queries/burst  {counter.count / elapsed:8.0f} queries/s  "
+        f"{elapsed / BURSTS * 1000:7.1f} ms/burst"
+    )
+
+
+async def main():
+    reset_schema()
+    with SessionLocal() as db:
+        assignment_id, _, _ = seed_assignment(db, students=0, questions=QUESTIONS)
+
+    print(f"--- {BURSTS} cold-cache bursts per row, {QUESTIONS} questions ---")
+    for coalesce in (False, True):
+        for readers in READERS:
+            await run(assignment_id, readers, coalesce)
+    assignment_cache.cache.flights.enabled = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
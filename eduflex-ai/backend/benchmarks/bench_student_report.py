@@ -0,0 +1,126 @@
+"""
+Student report card: statements and latency for students with many assessments.
+
+Seeds one student per size in ASSESSMENTS, each with that many evaluated
+submissions, and times UserService.get_student_academic_report:
+- "previous": the ORM query the report used to run, which loads whole
+  Submission, Assignment and Evaluation entities through joinedload
+- "cold": the column-projected single query, with the report cache cleared
+- "cached": the same call served from the per-student report cache
+
+The statement count of the cold report must stay at one as the number of
+assessments grows.
+"""
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import joinedload
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, StatementCounter, reset_schema
+from app.models.assignment import Assignment
+from app.models.submission import Evaluation, EvaluationSource, Submission, SubmissionStatus
+from app.models.user import User, UserRole
+from app.services.user_service import UserService, student_report_cache
+
+ASSESSMENTS = [10, 100, 500, 2000]
+REPEATS = 5
+
+
+def seed_student(assessments: int) -> uuid.UUID:
+    faculty_id, student_id = uuid.uuid4(), uuid.uuid4()
+    start = datetime(2025, 1, 1)
+    assignments, submissions, evaluations = [], [], []
+    for i in range(assessments):
+        assignment_id, submission_id = uuid.uuid4(), uuid.uuid4()
+        score = (i * 7) % 51
+        assignments.append({
+            "id": assignment_id, "title": f"Assessment {i}", "description": "Weekly quiz",
+            "subject": "Bench", "faculty_id": faculty_id, "max_marks": 50
+        })
+        submissions.append({
+            "id": submission_id, "assignment_id": assignment_id, "student_id": student_id,
+            "status": SubmissionStatus.EVALUATED, "submitted_at": start + timedelta(hours=i),
+            "total_score": score, "max_score": 50, "percentage": round(score * 100 / 50, 2)
+        })
+        evaluations.append({
+            "id": uuid.uuid4(), "submission_id": submission_id, "evaluated_by": EvaluationSource.AI,
+            "total_marks": score, "overall_feedback": "Automatic evaluation completed."
+        })
+    with SessionLocal() as db:
+        db.execute(insert(User), [
+            {"id": faculty_id, "email": f"faculty_{faculty_id.hex[:8]}@bench.local", "password_hash": "x",
+             "role": UserRole.FACULTY, "first_name": "Bench"},
+            {"id": student_id, "email": f"student_{student_id.hex[:8]}@bench.local", "password_hash": "x",
+             "role": UserRole.STUDENT, "first_name": "Bench", "last_name": "Student"},
+        ])
+        db.execute(insert(Assignment), assignments)
+        db.execute(insert(Submission), submissions)
+        db.execute(insert(Evaluation), evaluations)
+        db.commit()
+    return student_id
+
+
+async def previous_report(db, student_id):
+    """The entity-loading query the report ran before, with its Python-side percentages."""
+    student = (await db.execute(select(User).where(User.id == student_id))).scalars().first()
+    submissions = (await db.execute(
+        select(Submission)
+        .join(Evaluation)
+        .options(joinedload(Submission.assignment), joinedload(Submission.evaluation))
+        .where(Submission.student_id == student.id, Submission.status == SubmissionStatus.EVALUATED)
+    )).scalars().all()
+    return [
+        s.evaluation.total_marks / s.assignment.max_marks * 100 if s.assignment.max_marks > 0 else 0
+        for s in submissions
+    ]
+
+
+async def measure(make_call, clear_cache: bool):
+    samples, statements = [], 0
+    for _ in range(REPEATS):
+        if clear_cache:
+            student_report_cache.local.clear()
+        async with AsyncSessionLocal() as db:
+            with StatementCounter() as counter:
+                started = time.perf_counter()
+                await make_call(db)
+                samples.append((time.perf_counter() - started) * 1000)
+            statements = counter.count
+    return statistics.median(samples), statements
+
+
+async def main():
+    reset_schema()
+    # The benchmark runs in one process, so the local tier alone is enough
+    student_report_cache.use_redis = False
+    print(f"--- Student report card (median of {REPEATS}) ---")
+    cold_statements = []
+    for assessments in ASSESSMENTS:
+        student_id = seed_student(assessments)
+        async with AsyncSessionLocal() as db:
+            report = await UserService(db).get_student_academic_report(student_id)
+        assert report["total_assignments"] == assessments
+
+        previous_ms, previous_statements = await measure(lambda db: previous_report(db, student_id), False)
+        cold_ms, statements = await measure(
+            lambda db: UserService(db).get_student_academic_report(student_id), True
+        )
+        cached_ms, cached_statements = await measure(
+            lambda db: UserService(db).get_student_academic_report(student_id), False
+        )
+        cold_statements.append(statements)
+        print(
+            f"{assessments:>5} assessments   previous {previous_ms:7.1f} ms ({previous_statements} stmts)   "
+            f"cold {cold_ms:7.1f} ms ({statements} stmt)   cached {cached_ms:6.2f} ms ({cached_statements} stmts)"
+        )
+
+    assert set(cold_statements) == {1}, f"Report statement count grew: {cold_statements}"
+    print("\nOne statement per uncached report at every size.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
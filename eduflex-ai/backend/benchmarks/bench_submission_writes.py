@@ -0,0 +1,122 @@
+"""
+Submission write path benchmark.
+
+Submits a 50-question quiz repeatedly and counts SQL statements per
+submission for two write strategies:
+
+  unit-of-work  one Answer ORM object per question, flush for the
+                submission id, Evaluation via the session, and a refresh
+                of the answers for the response (the previous path)
+  bulk          SubmissionService.submit_assignment: one INSERT for the
+                submission, one multi-row INSERT ... RETURNING for the
+                answers, one for the Evaluation, no refresh
+
+Both paths store the submission's score columns and fold the evaluation
+into the assignment analytics and the student's rollup.
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, update
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, StatementCounter, reset_schema, seed_assignment
+from app.models.user import User, UserRole
+from app.models.assignment import Question, QuestionType
+from app.models.submission import Submission, Answer, Evaluation, EvaluationSource, SubmissionStatus
+from app.schemas.submission import SubmissionCreate, SubmissionResponse
+from app.services.analytics_service import AnalyticsService
+from app.services.student_summary_service import StudentSummaryService
+from app.services.submission_service import SubmissionService
+
+QUESTIONS = 50
+SUBMISSIONS = 40
+
+
+async def unit_of_work_submit(db, student_id, submission_data, plan_questions):
+    """The per-object write path, kept here as the baseline."""
+    submission = Submission(
+        assignment_id=submission_data.assignment_id, student_id=student_id,
+        status=SubmissionStatus.SUBMITTED, submitted_at=datetime.utcnow(),
+        max_score=sum(q["marks"] for q in plan_questions.values())
+    )
+    db.add(submission)
+    await db.flush()
+    total, graded = 0, []
+    for q_id, value in submission_data.answers.items():
+        question = plan_questions[q_id]
+        marks = question["marks"] if value == "A" else 0
+        db.add(Answer(
+            submission_id=submission.id, question_id=q_id, answer_text=value,
+            marks_awarded=marks, feedback="Correct" if marks else "Incorrect"
+        ))
+        total += marks
+        graded.append((q_id, marks, question["marks"]))
+    db.add(Evaluation(submission_id=submission.id, evaluated_by=EvaluationSource.AI, total_marks=total))
+    submission.status = SubmissionStatus.EVALUATED
+    submission.total_score = total
+    submission.percentage = round(total * 100 / submission.max_score, 2) if submission.max_score else 0.0
+    await db.flush()
+    await AnalyticsService(db).record_evaluation(submission.assignment_id, total, graded)
+    await StudentSummaryService(db).record_evaluation(student_id, submission.percentage)
+    await db.commit()
+    await db.refresh(submission, attribute_names=["answers"])
+    return submission
+
+
+def make_students(db, count):
+    rows = [{
+        "id": uuid.uuid4(), "email": f"writer_{uuid.uuid4().hex[:12]}@bench.local",
+        "password_hash": "x", "role": UserRole.STUDENT, "first_name": "Student"
+    } for _ in range(count)]
+    db.execute(insert(User), rows)
+    db.commit()
+    return [row["id"] for row in rows]
+
+
+def run(label, submit):
+    reset_schema()
+    db = SessionLocal()
+    # MCQ-only quiz so both paths do identical grading work
+    assignment_id, question_rows, _ = seed_assignment(db, 0, QUESTIONS)
+    db.execute(update(Question).values(type=QuestionType.MCQ))
+    db.commit()
+
+    plan_questions = {q["id"]: q for q in question_rows}
+    students = make_students(db, SUBMISSIONS)
+    payload = {q["id"]: "A" if i % 3 else "B" for i, q in enumerate(question_rows)}
+    db.close()
+
+    async def submit_all():
+        counts = []
+        async with AsyncSessionLocal() as session:
+            for student_id in students:
+                data = SubmissionCreate(assignment_id=assignment_id, answers=payload)
+                with StatementCounter() as counter:
+                    submission = await submit(session, student_id, data, plan_questions)
+                    body = SubmissionResponse.model_validate(submission)
+                assert len(body.answers) == QUESTIONS
+                counts.append(counter.count)
+        return counts
+
+    started = time.perf_counter()
+    counts = asyncio.run(submit_all())
+    elapsed = time.perf_counter() - started
+
+    # First submission also creates the analytics record
+    steady = counts[1:]
+    print(
+        f"{label:<14} statements/submission: first {counts[0]}, then {min(steady)}-{max(steady)}   "
+        f"{elapsed / SUBMISSIONS * 1000:.1f} ms/submission"
+    )
+
+
+async def bulk_submit(db, student_id, submission_data, plan_questions):
+    return await SubmissionService(db).submit_assignment(student_id, submission_data)
+
+
+if __name__ == "__main__":
+    print(f"--- Submission writes: {QUESTIONS} MCQ questions, {SUBMISSIONS} submissions ---")
+    run("unit-of-work", unit_of_work_submit)
+    run("bulk", bulk_submit)
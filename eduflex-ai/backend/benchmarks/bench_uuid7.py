@@ -0,0 +1,107 @@
+"""
+uuid4 vs UUIDv7 primary keys on an insert-heavy table.
+
+For each key generator, starts from an empty schema and inserts ROWS
+answers (ANSWERS_PER_SUBMISSION per submission, with the submissions keyed
+the same way) in batches of BATCH, as the grading path does at a deadline.
+Reports overall insert throughput, the throughput of the last batches
+(when the index no longer fits in cache, random keys hurt most) and the
+size of the answers primary key index. Random uuid4 keys split pages all
+over the B-tree; v7 keys append to its right edge, leaving pages full.
+"""
+import time
+import uuid
+
+from sqlalchemy import insert, text
+
+from benchmarks.common import SessionLocal, engine, reset_schema
+from app.core.ids import uuid7
+from app.models.assignment import Assignment, Question, QuestionType
+from app.models.submission import Answer, Submission, SubmissionStatus
+from app.models.user import User, UserRole
+
+ROWS = 10_000_000
+ANSWERS_PER_SUBMISSION = 10
+BATCH = 50_000
+TAIL_BATCHES = 10
+
+GENERATORS = [("uuid4", uuid.uuid4), ("uuid7", uuid7)]
+
+
+def seed_parents(new_id):
+    """The student, assignment and questions every answer refers to."""
+    student_id, assignment_id = new_id(), new_id()
+    question_ids = [new_id() for _ in range(ANSWERS_PER_SUBMISSION)]
+    with SessionLocal() as db:
+        db.execute(insert(User), [{
+            "id": student_id, "email": "student@bench.local", "password_hash": "x",
+            "role": UserRole.STUDENT, "first_name": "Bench"
+        }])
+        db.execute(insert(Assignment), [{
+            "id": assignment_id, "title": "Deadline", "subject": "Bench",
+            "faculty_id": student_id, "max_marks": 5 * ANSWERS_PER_SUBMISSION
+        }])
+        db.execute(insert(Question), [
+            {"id": q, "assignment_id": assignment_id, "type": QuestionType.MCQ,
+             "question_text": "Q", "marks": 5}
+            for q in question_ids
+        ])
+        db.commit()
+    return student_id, assignment_id, question_ids
+
+
+def insert_answers(new_id):
+    """Insert ROWS answers; returns (seconds per batch)."""
+    student_id, assignment_id, question_ids = seed_parents(new_id)
+    batch_seconds = []
+    for _ in range(0, ROWS, BATCH):
+        submissions, answers = [], []
+        for _ in range(BATCH // ANSWERS_PER_SUBMISSION):
+            submission_id = new_id()
+            submissions.append({
+                "id": submission_id, "assignment_id": assignment_id, "student_id": student_id,
+                "status": SubmissionStatus.EVALUATED
+            })
+            answers += [
+                {"id": new_id(), "submission_id": submission_id, "question_id": q,
+                 "answer_text": "A", "marks_awarded": 5}
+                for q in question_ids
+            ]
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            db.execute(insert(Submission), submissions)
+            db.execute(insert(Answer), answers)
+            db.commit()
+        batch_seconds.append(time.perf_counter() - started)
+    return batch_seconds
+
+
+def primary_key_size_mb() -> float:
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            size = conn.execute(text("SELECT pg_relation_size('answers_pkey')")).scalar()
+        else:
+            size = conn.execute(text(
+                "SELECT sum(pgsize) FROM dbstat WHERE name = "
+                "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'answers' "
+                "AND name LIKE 'sqlite_autoindex_answers_%')"
+            )).scalar()
+    return size / 1024 / 1024
+
+
+def main():
+    print(f"--- {ROWS:,} answers in batches of {BATCH:,} ({engine.dialect.name}) ---")
+    for name, new_id in GENERATORS:
+        reset_schema()
+        batch_seconds = insert_answers(new_id)
+        total = sum(batch_seconds)
+        tail = batch_seconds[-TAIL_BATCHES:]
+        print(
+            f"{name}: {ROWS / total:10,.0f} rows/s overall   "
+            f"{len(tail) * BATCH / sum(tail):10,.0f} rows/s last {len(tail)} batches   "
+            f"primary key index {primary_key_size_mb():8.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
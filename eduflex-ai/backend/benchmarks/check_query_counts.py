@@ -0,0 +1,140 @@
+"""
+Query-count guard for the list endpoints.
+
+Seeds LARGE rows behind each endpoint, then requests every endpoint with
+limit=SMALL and limit=LARGE and counts the SQL statements each request
+executes. A count that grows with the page size means something is loaded
+per row (an N+1), e.g. a relationship serialized without a loader option,
+so the script exits with status 1 and lists the offending endpoints.
+
+    python -m benchmarks.check_query_counts
+
+Add an endpoint to ENDPOINTS when it starts returning lists.
+"""
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from benchmarks.common import SessionLocal, StatementCounter, reset_schema
+from app.core.security import create_access_token
+from app.main import app
+from app.models.assignment import Assignment, Question, QuestionType
+from app.models.submission import Answer, StudentAcademicSummary, Submission, SubmissionStatus
+from app.models.user import User, UserRole
+
+SMALL = 2
+LARGE = 20
+QUESTIONS = 3
+
+# (label, path, params, as_student)
+ENDPOINTS = [
+    ("assignments", "/api/v1/assignments/", {}, False),
+    ("assignments summary", "/api/v1/assignments/", {"summary": True}, False),
+    ("my submissions", "/api/v1/submissions/my", {}, True),
+    ("my submissions summary", "/api/v1/submissions/my", {"summary": True}, True),
+    ("students", "/api/v1/users/students", {}, False),
+    ("cohort", "/api/v1/users/cohort", {}, False),
+]
+
+
+def seed():
+    """
+    LARGE assignments with questions, one student's submission to each,
+    and LARGE students with an academic summary each.
+    """
+    reset_schema()
+    faculty_id, student_id = uuid.uuid4(), uuid.uuid4()
+    start = datetime(2025, 1, 1)
+    users = [
+        {"id": faculty_id, "email": "faculty@bench.example.com", "password_hash": "x",
+         "role": UserRole.FACULTY, "first_name": "Bench"},
+        {"id": student_id, "email": "student@bench.example.com", "password_hash": "x",
+         "role": UserRole.STUDENT, "first_name": "Bench"},
+    ]
+    users += [
+        {"id": uuid.uuid4(), "email": f"student_{i}@bench.example.com", "password_hash": "x",
+         "role": UserRole.STUDENT, "first_name": "Student", "created_at": start + timedelta(seconds=i)}
+        for i in range(LARGE)
+    ]
+    summaries = [
+        {"student_id": u["id"], "assessment_count": 1, "percentage_sum": 50.0 + i,
+         "average_percentage": 50.0 + i, "gpa": (50.0 + i) * 0.04}
+        for i, u in enumerate(users[2:])
+    ]
+    assignments, questions, submissions, answers = [], [], [], []
+    for i in range(LARGE):
+        assignment_id, submission_id = uuid.uuid4(), uuid.uuid4()
+        assignments.append({
+            "id": assignment_id, "title": f"Assignment {i}", "subject": "Bench",
+            "faculty_id": faculty_id, "max_marks": QUESTIONS * 5,
+            "created_at": start + timedelta(seconds=i)
+        })
+        submissions.append({
+            "id": submission_id, "assignment_id": assignment_id, "student_id": student_id,
+            "status": SubmissionStatus.EVALUATED, "submitted_at": start + timedelta(seconds=i),
+            "created_at": start + timedelta(seconds=i)
+        })
+        for q in range(QUESTIONS):
+            question_id = uuid.uuid4()
+            questions.append({
+                "id": question_id, "assignment_id": assignment_id, "type": QuestionType.MCQ,
+                "question_text": f"Question {q}", "options": ["A", "B"],
+                "correct_answer": {"answer": "A"}, "marks": 5
+            })
+            answers.append({
+                "id": uuid.uuid4(), "submission_id": submission_id, "question_id": question_id,
+                "answer_text": "A", "marks_awarded": 5
+            })
+    with SessionLocal() as db:
+        db.execute(insert(User), users)
+        db.execute(insert(Assignment), assignments)
+        db.execute(insert(Question), questions)
+        db.execute(insert(Submission), submissions)
+        db.execute(insert(Answer), answers)
+        db.execute(insert(StudentAcademicSummary), summaries)
+        db.commit()
+    return faculty_id, student_id
+
+
+def auth(user_id: uuid.UUID) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+def statements(client: TestClient, path: str, params: dict, headers: dict, limit: int) -> int:
+    with StatementCounter() as counter:
+        response = client.get(path, params={**params, "limit": limit}, headers=headers)
+    response.raise_for_status()
+    assert len(response.json()) == limit, f"{path} returned {len(response.json())} rows, expected {limit}"
+    return counter.count
+
+
+def main() -> int:
+    faculty_id, student_id = seed()
+    faculty, student = auth(faculty_id), auth(student_id)
+    client = TestClient(app)
+
+    failures = []
+    print(f"{'endpoint':<26}{'limit=' + str(SMALL):>10}{'limit=' + str(LARGE):>10}")
+    for label, path, params, as_student in ENDPOINTS:
+        headers = student if as_student else faculty
+        # Warm the principal cache so only the endpoint's own queries are counted
+        client.get(path, params={**params, "limit": 1}, headers=headers)
+        small = statements(client, path, params, headers, SMALL)
+        large = statements(client, path, params, headers, LARGE)
+        flag = "" if large <= small else "  <-- grows with page size"
+        print(f"{label:<26}{small:>10}{large:>10}{flag}")
+        if large > small:
+            failures.append(label)
+
+    if failures:
+        print(f"FAIL: statement count grows with result size: {', '.join(failures)}")
+        return 1
+    print("OK: statement counts are independent of result size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Query-plan regression check for the service queries.
+
+Seeds ASSIGNMENTS assignments of STUDENTS submissions and QUESTIONS
+answers each, refreshes the planner statistics, then runs every entry in
+CHECKS through the real service code while recording the SELECTs it
+issues. Each recorded statement is EXPLAINed with its own parameters, and
+any full table scan (Postgres "Seq Scan", SQLite "SCAN <table>" without an
+index) fails the check with exit status 1.
+
+    python -m benchmarks.check_query_plans
+
+Run it against Postgres (DATABASE_URL) before deploying index or query
+changes; on a small table Postgres may legitimately prefer a sequential
+scan, which is why the seed volumes are realistic. Add an entry to CHECKS
+for every new service query.
+"""
+import asyncio
+import json
+import re
+import sys
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from sqlalchemy import event, select, text
+
+from benchmarks.common import AsyncSessionLocal, SessionLocal, engine, reset_schema, seed_assignment
+from app.core.database import Base, async_engine, background_engine
+from app.core.pagination import decode_cursor, decode_sort_cursor
+from app.models.submission import Submission
+from app.models.user import User, UserRole
+from app.services.analytics_queries import AssignmentAggregates
+from app.services.analytics_service import AnalyticsService
+from app.services.assignment_service import AssignmentService
+from app.services.grading_plan import grading_plans
+from app.services.prewarm import cache_warmer
+from app.services.principal_cache import principal_cache
+from app.services.student_summary_service import StudentSummaryService, rebuild_student_summaries
+from app.services.submission_service import SubmissionService, schedule_pending_grading
+from app.services.user_service import UserService
+
+ASSIGNMENTS = 100
+STUDENTS = 200
+QUESTIONS = 10
+
+# SQLite: a SCAN reads the whole table (or a whole index, in index order);
+# an AUTOMATIC index is one SQLite builds for this query by scanning.
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?( USING (?:COVERING )?INDEX \w+)?")
+SQLITE_AUTOMATIC_INDEX = re.compile(r"^SEARCH (\w+)(?: AS \w+)? USING AUTOMATIC")
+
+
+def seed() -> Tuple[Any, User]:
+    """Seed the tables and return (an assignment id, one of its students)."""
+    reset_schema()
+    with SessionLocal() as db:
+        for i in range(ASSIGNMENTS):
+            assignment_id, _, _ = seed_assignment(db, STUDENTS, QUESTIONS, seed=i)
+        rebuild_student_summaries(db)
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+    with SessionLocal() as db:
+        student = db.execute(
+            select(User).join(Submission, Submission.student_id == User.id)
+            .where(Submission.assignment_id == assignment_id).limit(1)
+        ).scalar_one()
+    return assignment_id, student
+
+
+def checks(assignment_id: Any, student: User) -> List[Tuple[str, Callable[[Any], Awaitable[Any]]]]:
+    """(label, call) pairs; each call gets a fresh AsyncSession."""
+    student_id = student.id
+
+    async def second_page(db):
+        first = await AssignmentService(db).get_assignments(5)
+        return await AssignmentService(db).get_assignments(5, decode_cursor(first.next_cursor))
+
+    async def academic_report(db):
+        return await UserService(db).get_student_academic_report(str(student_id))
+
+    async def cohort_next_page(db):
+        first = await StudentSummaryService(db).get_cohort("average_percentage", False, 20, min_gpa=2.0)
+        cursor = decode_sort_cursor(first.next_cursor, "average_percentage")
+        return await StudentSummaryService(db).get_cohort("average_percentage", False, 20, cursor, min_gpa=2.0)
+
+    async def pending_grading(db):
+        return await schedule_pending_grading()
+
+    async def principal(db):
+        principal_cache.invalidate(student_id)
+        return await principal_cache.get(db, student_id)
+
+    async def analytics(db):
+        await AnalyticsService(db).rebuild_assignment_analytics(assignment_id)
+        await db.commit()
+        return await AnalyticsService(db).get_metrics(assignment_id)
+
+    return [
+        ("assignment list", lambda db: AssignmentService(db).get_assignments(20)),
+        ("assignment list, next page", second_page),
+        ("assignment list summary", lambda db: AssignmentService(db).get_assignments(20, with_questions=False)),
+        ("assignment detail", lambda db: AssignmentService(db).get_assignment(assignment_id)),
+        ("grading plan", lambda db: grading_plans.get_plan(db, assignment_id)),
+        ("student submissions", lambda db: SubmissionService(db).get_student_submissions(student_id)),
+        ("students by role", lambda db: UserService(db).get_users_by_role(UserRole.STUDENT)),
+        ("user by email", lambda db: UserService(db).get_by_email(student.email)),
+        ("principal", principal),
+        ("student academic report", academic_report),
+        ("cohort by gpa", lambda db: StudentSummaryService(db).get_cohort()),
+        ("cohort by percentage, next page", cohort_next_page),
+        ("submission scores", lambda db: AssignmentAggregates(db).submission_scores(assignment_id)),
+        ("score summary", lambda db: AssignmentAggregates(db).score_summary(assignment_id)),
+        ("question stats", lambda db: AssignmentAggregates(db).question_stats(assignment_id)),
+        ("stored analytics", analytics),
+        ("upcoming assignments", cache_warmer.upcoming),
+        ("pending grading recovery", pending_grading),
+    ]
+
+
+class StatementRecorder:
+    """Records the SELECTs executed on the service engines."""
+
+    def __init__(self, *engines):
+        self.engines = [e.sync_engine for e in engines]
+        self.statements: List[Tuple[str, Any]] = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        for e in self.engines:
+            event.listen(e, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        for e in self.engines:
+            event.remove(e, "before_cursor_execute", self._on_execute)
+
+
+async def full_scans(statement: str, parameters: Any) -> List[str]:
+    """Tables the planner would read in full to run `statement`."""
+    async with async_engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)).scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return list(_seq_scans(plan[0]["Plan"]))
+        rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+        return list(_sqlite_scans(statement, [row[-1] for row in rows]))
+
+
+def _seq_scans(node: dict):
+    if node.get("Node Type") == "Seq Scan":
+        yield node["Relation Name"]
+    for child in node.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+def _sqlite_scans(statement: str, details: List[str]):
+    # Walking an index in order under a LIMIT (a keyset page) stops early
+    limited = " LIMIT " in statement.upper()
+    for detail in details:
+        scan = SQLITE_SCAN.match(detail)
+        if scan and scan.group(1) in Base.metadata.tables and not (scan.group(2) and limited):
+            yield scan.group(1)
+        automatic = SQLITE_AUTOMATIC_INDEX.match(detail)
+        if automatic and automatic.group(1) in Base.metadata.tables:
+            yield automatic.group(1)
+
+
+async def run(assignment_id: Any, student: User) -> int:
+    failures = 0
+    for label, call in checks(assignment_id, student):
+        with StatementRecorder(async_engine, background_engine) as recorder:
+            async with AsyncSessionLocal() as db:
+                await call(db)
+        scans = []
+        for statement, parameters in recorder.statements:
+            for table in await full_scans(statement, parameters):
+                scans.append(table)
+                print(f"  {label}: full scan of {table} in\n    {' '.join(statement.split())}")
+        status = "OK" if not scans else "FAIL"
+        print(f"{status:<6}{label} ({len(recorder.statements)} statements)")
+        failures += bool(scans)
+    return failures
+
+
+def main() -> int:
+    print(f"Seeding {ASSIGNMENTS} assignments x {STUDENTS} submissions x {QUESTIONS} answers...")
+    assignment_id, student = seed()
+    failures = asyncio.run(run(assignment_id, student))
+    if failures:
+        print(f"FAIL: {failures} check(s) read a table in full")
+        return 1
+    print("OK: every service query uses an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run benchmarks from the backend directory, e.g.:
+
+    python -m benchmarks.bench_analytics
+
+They default to a throwaway SQLite file (the services use the async engine
+and seeding uses the sync one, so both must see the same database); set
+DATABASE_URL to point them at Postgres instead. Likewise the Redis-backed
+caches use an in-memory FakeRedis unless REDIS_URL is set.
+"""
+import os
+import random
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'eduflex_bench.db')}")
+USE_FAKE_REDIS = "REDIS_URL" not in os.environ
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import event, insert
+
+from app.core.database import Base, engine, SessionLocal, AsyncSessionLocal, async_engine
+from app.core.redis import FakeRedis, set_redis
+from app.models.user import User, UserRole
+from app.models.assignment import Assignment, Question, QuestionType, AssignmentAnalytics
+from app.models.submission import Submission, Answer, Evaluation, SubmissionStatus, EvaluationSource
+
+if USE_FAKE_REDIS:
+    set_redis(FakeRedis())
+
+
+class StatementCounter:
+    """Counts SQL statements executed on an engine (by default the one the services use)."""
+
+    def __init__(self, bind=async_engine.sync_engine):
+        self.bind = bind
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.bind, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.bind, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def timed(label: str):
+    start = time.perf_counter()
+    yield
+    print(f"{label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+def reset_schema():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_assignment(db, students: int, questions: int, seed: int = 0):
+    """
+    Seed one assignment with `questions` questions and `students` evaluated
+    submissions using bulk inserts.
+
+    Returns:
+        (assignment_id, question_rows, answer_rows)
+    """
+    rng = random.Random(seed)
+
+    faculty_id = uuid.uuid4()
+    db.execute(insert(User), [{
+        "id": faculty_id, "email": f"faculty_{faculty_id.hex[:8]}@bench.local",
+        "password_hash": "x", "role": UserRole.FACULTY, "first_name": "Bench"
+    }])
+
+    assignment_id = uuid.uuid4()
+    db.execute(insert(Assignment), [{
+        "id": assignment_id, "title": "Benchmark Quiz", "subject": "Bench",
+        "faculty_id": faculty_id, "max_marks": questions * 5
+    }])
+
+    question_rows = []
+    for i in range(questions):
+        question_rows.append({
+            "id": uuid.uuid4(), "assignment_id": assignment_id,
+            "type": QuestionType.MCQ if i % 4 else QuestionType.DESCRIPTIVE,
+            "question_text": f"Benchmark question {i}", "marks": 5,
+            "correct_answer": {"answer": "A"}
+        })
+    db.execute(insert(Question), question_rows)
+
+    student_rows, submission_rows, answer_rows, evaluation_rows = [], [], [], []
+    for _ in range(students):
+        student_id = uuid.uuid4()
+        submission_id = uuid.uuid4()
+        student_rows.append({
+            "id": student_id, "email": f"student_{student_id.hex[:12]}@bench.local",
+            "password_hash": "x", "role": UserRole.STUDENT, "first_name": "Student"
+        })
+        submission_rows.append({
+            "id": submission_id, "assignment_id": assignment_id, "student_id": student_id,
+            "status": SubmissionStatus.EVALUATED, "submitted_at": datetime.utcnow()
+        })
+        total = 0
+        for q in question_rows:
+            marks = rng.choice([0, 2, 5])
+            total += marks
+            answer_rows.append({
+                "id": uuid.uuid4(), "submission_id": submission_id, "question_id": q["id"],
+                "answer_text": "A", "marks_awarded": marks, "feedback": ""
+            })
+        submission_rows[-1].update(
+            total_score=total, max_score=questions * 5, percentage=round(total * 100 / (questions * 5), 2)
+        )
+        evaluation_rows.append({
+            "id": uuid.uuid4(), "submission_id": submission_id,
+            "evaluated_by": EvaluationSource.AI, "total_marks": total
+        })
+
+    if student_rows:
+        db.execute(insert(User), student_rows)
+        db.execute(insert(Submission), submission_rows)
+        db.execute(insert(Answer), answer_rows)
+        db.execute(insert(Evaluation), evaluation_rows)
+    db.commit()
+    return assignment_id, question_rows, answer_rows
@@ -0,0 +1,89 @@
+"""
+Local mock of the remote grading endpoint (see app.services.ai_client).
+
+Grades with the length heuristic after an injectable delay, and fails
+whole calls and single answers at configurable rates.
+
+Usage:
+    python -m benchmarks.mock_provider --port 8900 --latency 0.2 --error-rate 0.05
+    AI_PROVIDER=http AI_PROVIDER_URL=http://127.0.0.1:8900 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import random
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+import benchmarks.common  # noqa: F401 (sets default env)
+from app.services.ai_providers import heuristic_evaluation
+
+
+class EvaluateRequest(BaseModel):
+    question: str
+    answers: List[str]
+    max_marks: int
+
+
+def create_app(
+    latency: float = 0.2,
+    item_latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    item_error_rate: float = 0.0,
+    seed: int = 0
+) -> FastAPI:
+    """
+    Args:
+        latency: Base seconds per call
+        item_latency: Extra seconds per answer in the call
+        jitter: Up to this many extra random seconds per call
+        error_rate: Probability a call answers 503
+        item_error_rate: Probability a single answer comes back as an error
+    """
+    app = FastAPI(title="Mock grading provider")
+    app.state.calls = 0
+    rng = random.Random(seed)
+
+    @app.post("/evaluate")
+    async def evaluate(body: EvaluateRequest):
+        app.state.calls += 1
+        await asyncio.sleep(latency + item_latency * len(body.answers) + rng.uniform(0, jitter))
+        if rng.random() < error_rate:
+            return JSONResponse(status_code=503, content={"detail": "Provider overloaded"})
+        results = []
+        for answer in body.answers:
+            if rng.random() < item_error_rate:
+                results.append({"error": "Could not grade answer"})
+            else:
+                results.append(heuristic_evaluation(answer, body.max_marks))
+        return {"results": results}
+
+    @app.get("/stats")
+    def stats():
+        return {"calls": app.state.calls}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--item-latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--item-error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = create_app(args.latency, args.item_latency, args.jitter, args.error_rate, args.item_error_rate)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Repair and consistency check for incrementally maintained assignment analytics.
+
+Usage:
+    python rebuild_analytics.py                      # rebuild every assignment
+    python rebuild_analytics.py --assignment <id>    # rebuild one assignment
+    python rebuild_analytics.py --check              # report drift, exit 1 if any
+"""
+import argparse
+import asyncio
+import sys
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.database import BackgroundSessionLocal
+from app.models import user, submission
+from app.models.assignment import Assignment
+from app.services.analytics_service import AnalyticsService
+
+
+async def run(args: argparse.Namespace) -> int:
+    async with BackgroundSessionLocal() as db:
+        service = AnalyticsService(db)
+        if args.assignment:
+            assignment_ids = [args.assignment]
+        else:
+            assignment_ids = (await db.execute(select(Assignment.id))).scalars().all()
+
+        drifted = 0
+        for assignment_id in assignment_ids:
+            if args.check:
+                diffs = await service.check_assignment_analytics(assignment_id)
+                if diffs:
+                    drifted += 1
+                    print(f"✗ {assignment_id}")
+                    for field, values in diffs.items():
+                        print(f"    {field}: stored={values['stored']} expected={values['expected']}")
+            else:
+                await service.rebuild_assignment_analytics(assignment_id)
+                await db.commit()
+                print(f"✓ Rebuilt {assignment_id}")
+
+        if args.check:
+            print(f"{drifted} of {len(assignment_ids)} assignments drifted.")
+            return 1 if drifted else 0
+        return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or check assignment analytics.")
+    parser.add_argument("--assignment", type=UUID, help="Only process this assignment id")
+    parser.add_argument("--check", action="store_true", help="Diff stored state against a recomputation without writing")
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())